@@ -1,15 +1,16 @@
 # Copyright (c) Microsoft. All rights reserved.
 # Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
 
+# Only light modules are imported at load time; each subcommand imports the
+# client it needs when it runs, so e.g. "get" never loads TempFileClient.
 import argparse
 import json
+import logging
 import dataclasses
-import uuid
-import urllib3
-from datetime import datetime
-from termcolor import colored
-from microsoft_client_podcast.podcast_client import PodcastClient
-from microsoft_client_podcast.tempfile_client import TempFileClient
+import os
+import sys
+
+logger = logging.getLogger("main_podcast")
 
 ARGUMENT_HELP_CONTENT_FILE_AZURE_BLOB_URL = (
     'Input file url, supported formats are .pdf and .txt. '
@@ -75,13 +76,193 @@ ARGUMENT_HELP_STYLE = (
     'The style of the podcast. Possible values are Default/Professional/Casual.'
 )
 
+ARGUMENT_HELP_OUTPUT = (
+    'Output format. json (default) prints the first page as indented JSON; '
+    'ndjson streams every item of every page as one compact JSON object per line.'
+)
+
+ARGUMENT_HELP_FIELDS = (
+    'Comma separated item fields to output, for example id,status,output.audioFileUrl. '
+    'Dotted names select nested values. All fields are output by default.'
+)
+
+ARGUMENT_HELP_MANIFEST = (
+    'Path to a .csv (with header row) or .jsonl manifest, one generation per row. Columns: id, target_locale, '
+    'content_file_azure_blob_url, content_file_path, base64_content_file_path, content_file_temp_file_id, '
+    'upload_with_temp_file, voice_name, multi_talker_voice_speaker_names, gender_preference, length, host, '
+    'style, additional_instructions, tenant, priority (interactive or bulk, default bulk). Relative paths are '
+    'resolved against the manifest directory.'
+)
+
+ARGUMENT_HELP_RESULTS = (
+    'Path of the results JSONL file, one line per row as it finishes; "-" (default) writes to stdout.'
+)
+
+ARGUMENT_HELP_CONCURRENCY = (
+    'Maximum number of generations created but not yet finished on the service at the same time (default: 8). '
+    'Uploads for the next rows and downloads of finished ones overlap with them.'
+)
+
+ARGUMENT_HELP_OUTPUT_DIR = (
+    'Directory to download the audio of succeeded generations to, as <generation id>.<extension>. '
+    'Audio is not downloaded if not specified.'
+)
+
+ARGUMENT_HELP_RESOURCES = (
+    'Path to a JSON list of additional Speech resources, e.g. [{"region": "westus", "sub_key": "...", "name": "west"}] '
+    '(api_version defaults to --api_version). New generations go to the least loaded resource that is not being '
+    'throttled; each generation stays on the resource that created it.'
+)
+
+ARGUMENT_HELP_TENANT_CAP = (
+    'Maximum number of generations in flight per tenant (manifest tenant column, default the subscription key). '
+    'Free slots are shared fairly between tenants with rows waiting. Not limited by default.'
+)
+
+ARGUMENT_HELP_TENANT_WEIGHTS = (
+    'Fair-share weights of manifest tenants, e.g. team_a=3,team_b=1; unlisted tenants weigh 1.'
+)
+
+RESULT_CACHE_DB_ENV = "PODCAST_RESULT_CACHE_DB"
+
+ARGUMENT_HELP_NO_CACHE = (
+    'Always generate, ignoring succeeded generations with the same settings and content in the local result cache '
+    f'(${RESULT_CACHE_DB_ENV}, default ~/.cache/podcast_client/results.sqlite3). New results are not recorded either.'
+)
+
+MIRROR_DB_ENV = "PODCAST_MIRROR_DB"
+
+ARGUMENT_HELP_MIRROR_DB = (
+    'SQLite file of the local generation and temp file mirror '
+    f'(default: ${MIRROR_DB_ENV} or ~/.cache/podcast_client/mirror.sqlite3).'
+)
+
+ARGUMENT_HELP_FULL_SYNC = (
+    'Re-read every list page and drop generations no longer listed. By default only the first sync of a resource '
+    'does; later ones read the newest pages and re-check unfinished and recently changed generations.'
+)
+
+ARGUMENT_HELP_QUERY_STATUS = (
+    'Comma separated statuses to match, e.g. Running,NotStarted.'
+)
+
+ARGUMENT_HELP_QUERY_DATE = (
+    'ISO 8601 date or timestamp, e.g. 2026-01-31 or 2026-01-31T12:00:00Z.'
+)
+
+ARGUMENT_HELP_PURGE = (
+    'Delete every generation matching all of --status, --older_than_days and --name (at least one, or --all), '
+    'found with the list API or, with --use_mirror, in the local mirror.'
+)
+
+ARGUMENT_HELP_PURGE_OUTPUT_DIR = (
+    'Also delete <generation id>.* audio files in this directory (e.g. the batch --output_dir). Audio files recorded '
+    'in the local result cache are always deleted unless --keep_audio is given.'
+)
+
+ARGUMENT_HELP_WATCH_IDS = (
+    'Comma separated generation IDs to watch. Use --all_running instead to watch every generation not yet '
+    'terminal.'
+)
+
+ARGUMENT_HELP_MIN_INTERVAL = (
+    'Seconds between polls of a generation whose status just changed (default: 2). The interval grows while '
+    'its status stays the same, up to --max_interval_seconds.'
+)
+
+RATE_LIMITS_ENV = "PODCAST_RATE_LIMITS"
+RATE_LIMIT_DB_ENV = "PODCAST_RATE_LIMIT_DB"
+
+ARGUMENT_HELP_RATE_LIMITS = (
+    'Requests per second allowed per subscription key and operation type, shared by all processes using the same '
+    '--rate_limit_db, e.g. create=2,poll=10,list=1 (optionally rate:burst, e.g. poll=10:20). Operation types are '
+    f'create, poll, list and delete; unlisted types are not limited. Default: ${RATE_LIMITS_ENV}.'
+)
+
+# Clients keyed by (class, region, sub_key, api_version). None means every
+# command builds its own clients; podcast_daemon.py sets a dict to reuse warm
+# connection pools across commands.
+CLIENT_CACHE = None
+
+def _create_client(client_class, args, pool_maxsize: int = None):
+    def new_client():
+        return client_class(region=args.region, sub_key=args.sub_key, api_version=args.api_version,
+                            pool_maxsize=pool_maxsize)
+    if CLIENT_CACHE is None:
+        return new_client()
+    key = (client_class, args.region, args.sub_key, args.api_version)
+    client = CLIENT_CACHE.get(key)
+    if client is None:
+        client = CLIENT_CACHE.setdefault(key, new_client())
+    return client
+
+def create_podcast_client(args, pool_maxsize: int = None):
+    from microsoft_client_podcast.podcast_client import PodcastClient
+    return _create_client(PodcastClient, args, pool_maxsize)
+
+def create_podcast_client_pool(args, pool_maxsize: int = None):
+    """
+    Pool over the --region/--sub_key resource plus those in the --resources
+    JSON file: [{"region": ..., "sub_key": ..., "api_version": ..., "name": ...}].
+    """
+    from microsoft_client_podcast.podcast_client_pool import PodcastClientPool, PodcastResource
+    resources = [PodcastResource(region=args.region, sub_key=args.sub_key, api_version=args.api_version)]
+    with open(args.resources, "r", encoding="utf-8") as f:
+        for entry in json.load(f):
+            resources.append(PodcastResource(
+                region=entry["region"],
+                sub_key=entry["sub_key"],
+                api_version=entry.get("api_version", args.api_version),
+                name=entry.get("name")))
+    return PodcastClientPool(resources, pool_maxsize=pool_maxsize)
+
+def create_temp_file_client(args, pool_maxsize: int = None):
+    from microsoft_client_podcast.tempfile_client import TempFileClient
+    return _create_client(TempFileClient, args, pool_maxsize)
+
+def create_result_cache(args):
+    """The local result cache, or None with --no_cache."""
+    if args.no_cache:
+        return None
+    from microsoft_client_podcast.podcast_result_cache import ResultCache
+    return ResultCache(database_path=os.environ.get(RESULT_CACHE_DB_ENV))
+
+def create_generation_mirror(args):
+    from microsoft_client_podcast.podcast_mirror import GenerationMirror
+    return GenerationMirror(database_path=args.mirror_db or os.environ.get(MIRROR_DB_ENV))
+
 def handle_create_generation_and_wait_until_terminated(args):
+    tempfile_client = create_temp_file_client(args)
+    podcast_client = create_podcast_client(args)
 
-    tempfile_client = TempFileClient(
-        region=args.region,
-        sub_key=args.sub_key,
-        api_version=args.api_version,
-    )
+    # If base64_content_file_path is provided, use it as content_file_path for base64 upload
+    content_file_path = args.content_file_path
+    if args.base64_content_file_path is not None:
+        content_file_path = args.base64_content_file_path
+    options = dict(
+        voice_name=args.voice_name,
+        multi_talker_voice_speaker_names=args.multi_talker_voice_speaker_names,
+        gender_preference=args.gender_preference,
+        length=args.length,
+        host=args.host,
+        style=args.style,
+        additional_instructions=args.additional_instructions)
+
+    # Look up the cache before uploading anything; a local file is keyed by its content.
+    result_cache = create_result_cache(args)
+    cache_key = None
+    if result_cache is not None:
+        cache_key = podcast_client.generation_cache_key(
+            target_locale=args.target_locale,
+            content_file_azure_blob_url=args.content_file_azure_blob_url,
+            content_file_path=content_file_path,
+            content_file_temp_file_id=args.content_file_temp_file_id,
+            **options)
+        generation, _ = result_cache.find_generation(podcast_client, cache_key)
+        if generation is not None:
+            logger.info(f"Reusing cached generation (use --no_cache to generate again):\n"
+                        f"{json.dumps(dataclasses.asdict(generation), indent=2)}", extra={"color": "green"})
+            return
 
     content_file_temp_file_id = None
     if args.content_file_temp_file_id is not None:
@@ -92,212 +273,753 @@ def handle_create_generation_and_wait_until_terminated(args):
         success, error, temp_file = tempfile_client.request_upload_temp_file(
             file_path=args.content_file_path)
         if not success:
-            print(colored(f"Failed to upload temp file from path {args.content_file_path} with error: {error}", 'red'))
+            logger.error(f"Failed to upload temp file from path {args.content_file_path} with error: {error}")
             return False, error, None
         content_file_temp_file_id = temp_file.id
 
-    # If base64_content_file_path is provided, use it as content_file_path for base64 upload
-    content_file_path = args.content_file_path
-    if args.base64_content_file_path is not None:
-        content_file_path = args.base64_content_file_path
-
-    podcast_client = PodcastClient(
-        region=args.region,
-        sub_key=args.sub_key,
-        api_version=args.api_version,
-    )
-
     success, error, generation = podcast_client.create_generation_and_wait_until_terminated(
         target_locale=args.target_locale,
         content_file_azure_blob_url=args.content_file_azure_blob_url,
         content_file_path=content_file_path,
         content_file_temp_file_id=content_file_temp_file_id,
-        voice_name=args.voice_name,
-        multi_talker_voice_speaker_names=args.multi_talker_voice_speaker_names,
-        gender_preference=args.gender_preference,
-        length=args.length,
-        host=args.host,
-        style=args.style,
-        additional_instructions=args.additional_instructions
+        result_cache=result_cache,
+        cache_key=cache_key,
+        **options
     )
     if not success:
         return
-    print(colored("successfull generated podcast.", "green"))
+    logger.info("successfull generated podcast.", extra={"color": "green"})
     if args.upload_with_temp_file:
         tempfile_client.request_delete_temp_file(file_id=content_file_temp_file_id)
 
 def handle_request_get_generation_api(args):
-    client = PodcastClient(
-        region=args.region,
-        sub_key=args.sub_key,
-        api_version=args.api_version,
-    )
+    client = create_podcast_client(args)
 
     success, error, generation = client.request_get_generation(
         generation_id=args.id,
     )
     if not success:
-        print(colored(f"Failed to request get translation API with error: {error}", 'red'))
+        logger.error(f"Failed to request get translation API with error: {error}")
         return
     if generation is None:
-        print(colored("Generation not found", 'yellow'))
+        logger.warning("Generation not found")
     else:
-        print(colored("succesfully get generation:", 'green'))
+        logger.info("succesfully get generation:", extra={"color": "green"})
         json_formatted_str = json.dumps(dataclasses.asdict(generation), indent=2)
         print(json_formatted_str)
 
+def parse_fields(fields: str) -> list[str]:
+    if fields is None:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+def project_fields(item: dict, fields: list[str]) -> dict:
+    """Keep only the given fields of an item; dotted names select nested values."""
+    if fields is None:
+        return item
+    projected = {}
+    for field in fields:
+        value = item
+        for key in field.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        projected[field] = value
+    return projected
+
+def write_ndjson_pages(pages, fields: list[str], description: str) -> None:
+    """
+    Stream the items of (success, error, page) tuples to stdout, one compact
+    JSON object per line, flushing after each page.
+    """
+    import orjson
+    count = 0
+    for success, error, page in pages:
+        if not success:
+            logger.error(f"Failed to list {description} with error: {error}")
+            return
+        if not page.value:
+            continue
+        lines = b"\n".join(orjson.dumps(project_fields(item, fields)) for item in page.value)
+        try:
+            sys.stdout.write(lines.decode("utf-8") + "\n")
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Reader went away (e.g. "| head"); stop quietly.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return
+        count += len(page.value)
+    logger.info(f"Successfully listed {count} {description}.", extra={"color": "green"})
+
+def print_paged_json(paged, fields: list[str]) -> None:
+    paged_dict = dataclasses.asdict(paged)
+    if fields is not None:
+        paged_dict["value"] = [project_fields(item, fields) for item in paged_dict["value"]]
+    json_formatted_str = json.dumps(paged_dict, indent=2)
+    print(json_formatted_str)
+
 def handle_request_list_generations_api(args):
-    client = PodcastClient(
-        region=args.region,
-        sub_key=args.sub_key,
-        api_version=args.api_version,
-    )
+    client = create_podcast_client(args)
+    fields = parse_fields(args.fields)
+
+    if args.output == "ndjson":
+        write_ndjson_pages(client.iter_generation_pages(), fields, "generations")
+        return
 
     success, error, generations = client.request_list_generations()
     if not success:
-        print(colored(f"Failed to request list generation API with error: {error}", 'red'))
+        logger.error(f"Failed to request list generation API with error: {error}")
         return
-    print(colored("succesfully list generations:", 'green'))
-    json_formatted_str = json.dumps(dataclasses.asdict(generations), indent=2)
-    print(json_formatted_str)
+    logger.info("succesfully list generations:", extra={"color": "green"})
+    print_paged_json(generations, fields)
+
+def notify_daemon_deleted(generation_ids: list[str]) -> None:
+    """Deletes made outside the daemon must not leave it serving cached generations."""
+    if CLIENT_CACHE is None:
+        import podcast_daemon
+        podcast_daemon.notify_deleted(generation_ids)
 
 def handle_request_delete_generation_api(args):
-    client = PodcastClient(
-        region=args.region,
-        sub_key=args.sub_key,
-        api_version=args.api_version,
-    )
+    client = create_podcast_client(args)
 
     success, error = client.request_delete_generation(args.id)
     if not success:
-        print(colored(f"Failed to request delete generation API with error: {error}", 'red'))
+        logger.error(f"Failed to request delete generation API with error: {error}")
         return
-    print(colored("succesfully delete generation.", 'green'))
+    notify_daemon_deleted([args.id])
+    logger.info("succesfully delete generation.", extra={"color": "green"})
 
 def handle_upload_temp_file(args):
-    client = TempFileClient(
-        region=args.region,
-        sub_key=args.sub_key,
-        api_version=args.api_version,
-    )
+    client = create_temp_file_client(args)
 
     success, error, temp_file = client.request_upload_temp_file(
         file_path=args.file_path,
         expires_after_in_mins=args.expires_after_in_mins
     )
     if not success:
-        print(colored(f"Failed to upload temp file with error: {error}", 'red'))
+        logger.error(f"Failed to upload temp file with error: {error}")
         return
     
-    print(colored("Successfully uploaded temp file:", 'green'))
+    logger.info("Successfully uploaded temp file:", extra={"color": "green"})
     json_formatted_str = json.dumps(dataclasses.asdict(temp_file), indent=2)
     print(json_formatted_str)
 
 def handle_list_temp_files(args):
-    client = TempFileClient(
-        region=args.region,
-        sub_key=args.sub_key,
-        api_version=args.api_version,
-    )
+    client = create_temp_file_client(args)
+    fields = parse_fields(args.fields)
+
+    if args.output == "ndjson":
+        write_ndjson_pages(client.iter_temp_file_pages(), fields, "temp files")
+        return
 
     success, error, temp_files = client.request_list_temp_files()
     if not success:
-        print(colored(f"Failed to list temp files with error: {error}", 'red'))
+        logger.error(f"Failed to list temp files with error: {error}")
         return
     
-    print(colored("Successfully listed temp files:", 'green'))
-    json_formatted_str = json.dumps(dataclasses.asdict(temp_files), indent=2)
-    print(json_formatted_str)
+    logger.info("Successfully listed temp files:", extra={"color": "green"})
+    print_paged_json(temp_files, fields)
 
 def handle_get_temp_file(args):
-    client = TempFileClient(
-        region=args.region,
-        sub_key=args.sub_key,
-        api_version=args.api_version,
-    )
+    client = create_temp_file_client(args)
 
     success, error, temp_file = client.request_get_temp_file(
         file_id=args.id
     )
     if not success:
-        print(colored(f"Failed to get temp file with error: {error}", 'red'))
+        logger.error(f"Failed to get temp file with error: {error}")
         return
     if temp_file is None:
-        print(colored("Temp file not found", 'yellow'))
+        logger.warning("Temp file not found")
     else:
-        print(colored("Successfully retrieved temp file:", 'green'))
+        logger.info("Successfully retrieved temp file:", extra={"color": "green"})
         json_formatted_str = json.dumps(dataclasses.asdict(temp_file), indent=2)
         print(json_formatted_str)
 
 def handle_delete_temp_file(args):
-    client = TempFileClient(
-        region=args.region,
-        sub_key=args.sub_key,
-        api_version=args.api_version,
-    )
+    client = create_temp_file_client(args)
 
     success, error = client.request_delete_temp_file(file_id=args.id)
     if not success:
-        print(colored(f"Failed to delete temp file with error: {error}", 'red'))
+        logger.error(f"Failed to delete temp file with error: {error}")
+        return
+    logger.info("Successfully deleted temp file.", extra={"color": "green"})
+
+def handle_batch(args):
+    import podcast_batch
+    import podcast_pipeline
+    from microsoft_speech_client_common.client_common_rate_limiter import key_id
+    from microsoft_client_podcast.podcast_scheduler import (
+        GenerationScheduler,
+        parse_tenant_weights
+    )
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    # One pooled connection per worker thread that may use the client
+    pool_maxsize = (args.upload_workers + args.download_workers + podcast_pipeline.CREATE_WORKERS +
+                    podcast_pipeline.POLL_WORKERS + podcast_pipeline.CLEANUP_WORKERS)
+    if args.resources is not None:
+        podcast_client = create_podcast_client_pool(args, pool_maxsize=pool_maxsize)
+    else:
+        podcast_client = create_podcast_client(args, pool_maxsize=pool_maxsize)
+    scheduler = GenerationScheduler(
+        max_in_flight=args.concurrency,
+        tenant_cap=args.tenant_cap,
+        weights=parse_tenant_weights(args.tenant_weights) if args.tenant_weights else None)
+    pipeline = podcast_pipeline.PodcastPipeline(
+        podcast_client=podcast_client,
+        tempfile_client=create_temp_file_client(args, pool_maxsize=pool_maxsize),
+        output_dir=args.output_dir,
+        poll_interval_seconds=args.poll_interval_seconds,
+        upload_workers=args.upload_workers,
+        download_workers=args.download_workers,
+        scheduler=scheduler,
+        tenant=key_id(args.sub_key),
+        result_cache=create_result_cache(args))
+    runner = podcast_batch.BatchRunner(pipeline)
+    rows = podcast_batch.read_manifest(args.manifest)
+    if args.results == "-":
+        succeeded, failed = runner.run(rows, sys.stdout)
+    else:
+        with open(args.results, "w", encoding="utf-8") as results_stream:
+            succeeded, failed = runner.run(rows, results_stream)
+
+    logger.info("Pipeline stages:\n" + pipeline.summary_table())
+    if args.resources is not None:
+        for name, resource_stats in podcast_client.stats().items():
+            requests = sum(route["count"] for route in resource_stats["routes"].values())
+            logger.info(f"Resource {name}: {requests} requests, {resource_stats['throttled']} throttled (429).")
+    if failed:
+        logger.error(f"Batch finished: {succeeded} succeeded, {failed} failed.")
+        sys.exit(1)
+    logger.info(f"Batch finished: {succeeded} succeeded.", extra={"color": "green"})
+
+def handle_sync(args):
+    mirror = create_generation_mirror(args)
+    if args.resources is not None:
+        pool = create_podcast_client_pool(args, pool_maxsize=args.workers)
+        clients = [(state.client, state.tempfile_client) for state in pool.resources]
+    else:
+        clients = [(create_podcast_client(args, pool_maxsize=args.workers),
+                    create_temp_file_client(args, pool_maxsize=args.workers))]
+    for client, tempfile_client in clients:
+        success, error, stats = mirror.sync(
+            client,
+            tempfile_client=None if args.skip_temp_files else tempfile_client,
+            full=args.full,
+            workers=args.workers,
+            page_size=args.page_size,
+            progress=logger.info)
+        if not success:
+            logger.error(f"Failed to sync {client.root_url()} with error: {error}")
+            sys.exit(1)
+        logger.info(f"Synced {client.root_url()} in {stats.seconds:.3f}s ({'full' if stats.full else 'incremental'}).",
+                    extra={"color": "green"})
+
+def handle_query(args):
+    import orjson
+    mirror = create_generation_mirror(args)
+    fields = parse_fields(args.fields)
+    client = None if args.all_resources else create_podcast_client(args)
+    if args.temp_files:
+        items = mirror.query_temp_files(
+            name=args.name,
+            created_after=args.created_after,
+            created_before=args.created_before,
+            include_expired=args.include_expired,
+            client=client,
+            limit=args.limit)
+    else:
+        items = mirror.query(
+            status=args.status.split(",") if args.status else None,
+            locale=args.locale,
+            created_after=args.created_after,
+            created_before=args.created_before,
+            updated_after=args.updated_after,
+            updated_before=args.updated_before,
+            name=args.name,
+            client=client,
+            order_by=args.order_by,
+            descending=not args.ascending,
+            limit=args.limit)
+    items = [project_fields(item, fields) for item in items]
+    if args.output == "ndjson":
+        sys.stdout.write("".join(orjson.dumps(item).decode("utf-8") + "\n" for item in items))
+    else:
+        print(json.dumps(items, indent=2))
+    logger.info(f"Found {len(items)} {'temp files' if args.temp_files else 'generations'} in the local mirror.",
+                extra={"color": "green"})
+
+def generation_matches(item: dict, statuses: list[str], created_before: float, name: str) -> bool:
+    """Whether a listed generation passes the purge filters; name is a glob matched against displayName or id."""
+    import fnmatch
+    from microsoft_client_podcast.podcast_mirror import parse_timestamp
+    if statuses is not None and item.get("status") not in statuses:
+        return False
+    if created_before is not None:
+        created = parse_timestamp(item.get("createdDateTime"))
+        if created is None or created >= created_before:
+            return False
+    if name is not None and not (fnmatch.fnmatchcase(item.get("displayName") or "", name)
+                                 or fnmatch.fnmatchcase(item.get("id") or "", name)):
+        return False
+    return True
+
+def select_purge_candidates(args, podcast_client, clients: list) -> tuple[bool, str, list[dict]]:
+    """Generations to purge; the mirror is queried per resource client, the list API through podcast_client."""
+    import time
+    from datetime import datetime, timezone
+    statuses = args.status.split(",") if args.status else None
+    created_before = time.time() - args.older_than_days * 24 * 60 * 60 if args.older_than_days is not None else None
+    candidates = []
+    if args.use_mirror:
+        mirror = create_generation_mirror(args)
+        for client in clients:
+            candidates.extend(mirror.query(
+                status=statuses,
+                created_before=datetime.fromtimestamp(created_before, timezone.utc) if created_before else None,
+                name=args.name,
+                client=client,
+                descending=False))
+        return True, None, candidates
+    for success, error, page in podcast_client.iter_generation_pages(maxPageSize=100):
+        if not success:
+            return False, error, None
+        candidates.extend(item for item in page.value if generation_matches(item, statuses, created_before, args.name))
+    return True, None, candidates
+
+def temp_file_id_of(item: dict) -> str:
+    content = item.get("content")
+    return content.get("tempFileId") if isinstance(content, dict) else None
+
+def temp_file_ids_of(generations: list[dict]) -> set[str]:
+    return {temp_file_id_of(item) for item in generations if temp_file_id_of(item)}
+
+def temp_file_clients_of(args, podcast_client, generations: list[dict]) -> dict:
+    """
+    Temp file id -> TempFileClient of the resource that owns it, which is the
+    resource of the generation created from it.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from microsoft_client_podcast.podcast_client_pool import PodcastClientPool
+    with_temp_files = [item for item in generations if temp_file_id_of(item)]
+    if not with_temp_files:
+        return {}
+    if not isinstance(podcast_client, PodcastClientPool):
+        tempfile_client = create_temp_file_client(args, pool_maxsize=args.workers)
+        return {temp_file_id: tempfile_client for temp_file_id in temp_file_ids_of(with_temp_files)}
+    # Owners of listed generations are known; mirror results are looked up on each resource.
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="owner") as executor:
+        owners = list(executor.map(podcast_client.owner, (item["id"] for item in with_temp_files)))
+    return {temp_file_id_of(item): owner.tempfile_client
+            for item, owner in zip(with_temp_files, owners) if owner is not None}
+
+def purge_local_files(args, deleted: list[str]) -> int:
+    """Drop deleted generations from the local mirror and result cache, and delete their audio files."""
+    import glob
+    from microsoft_client_podcast import podcast_mirror, podcast_result_cache
+    mirror_db = args.mirror_db or os.environ.get(MIRROR_DB_ENV) or podcast_mirror.default_database_path()
+    mirror = create_generation_mirror(args) if os.path.exists(mirror_db) else None
+    cache_db = os.environ.get(RESULT_CACHE_DB_ENV) or podcast_result_cache.default_database_path()
+    result_cache = podcast_result_cache.ResultCache(database_path=cache_db) if os.path.exists(cache_db) else None
+    removed_files = 0
+    for generation_id in deleted:
+        audio_files = []
+        if result_cache is not None:
+            audio_files.extend(result_cache.audio_files(generation_id))
+            result_cache.invalidate_generation(generation_id)
+        if mirror is not None:
+            mirror.remove_generation(generation_id)
+        if args.keep_audio:
+            continue
+        if args.output_dir is not None:
+            audio_files.extend(glob.glob(os.path.join(glob.escape(args.output_dir), glob.escape(generation_id) + ".*")))
+        for audio_file in set(audio_files):
+            try:
+                os.remove(audio_file)
+                removed_files += 1
+            except FileNotFoundError:
+                pass
+    return removed_files
+
+def handle_purge(args):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    if args.status is None and args.older_than_days is None and args.name is None and not args.all:
+        logger.error("Refusing to purge every generation: give --status, --older_than_days or --name, or --all.")
+        sys.exit(2)
+    if args.resources is not None:
+        podcast_client = create_podcast_client_pool(args, pool_maxsize=args.workers)
+        clients = [state.client for state in podcast_client.resources]
+    else:
+        podcast_client = create_podcast_client(args, pool_maxsize=args.workers)
+        clients = [podcast_client]
+
+    success, error, candidates = select_purge_candidates(args, podcast_client, clients)
+    if not success:
+        logger.error(f"Failed to list generations with error: {error}")
+        sys.exit(1)
+    if args.dry_run:
+        for item in candidates:
+            print(json.dumps(project_fields(item, ["id", "status", "displayName", "createdDateTime"])))
+        logger.info(f"Dry run: would delete {len(candidates)} generations and {len(temp_file_ids_of(candidates))} "
+                    "temp files.",
+                    extra={"color": "green"})
         return
-    print(colored("Successfully deleted temp file.", 'green'))
-
-root_parser = argparse.ArgumentParser(
-    prog='main_podcast.py',
-    description='Generate podcast audio/video from text input using Microsoft Podcast API.',
-    epilog='Microsoft Podcast Generation Sample'
-)
-
-root_parser.add_argument("--region", required=True, help="specify speech resource region.")
-root_parser.add_argument("--sub_key", required=True, help="specify speech resource subscription key.")
-root_parser.add_argument("--api_version", required=True, help="specify API version.")
-sub_parsers = root_parser.add_subparsers(required=True, help='subcommand help')
-
-podcast_parser = sub_parsers.add_parser(
-    'create_generation_and_wait_until_terminated',
-    help='Create podcast generation with pdf/txt file blob url.')
-podcast_parser.add_argument('--content_file_azure_blob_url', required=False, type=str, help=ARGUMENT_HELP_CONTENT_FILE_AZURE_BLOB_URL)
-podcast_parser.add_argument('--content_file_path', required=False, type=str, help=ARGUMENT_HELP_CONTENT_FILE_PATH)
-podcast_parser.add_argument('--base64_content_file_path', required=False, type=str, help=ARGUMENT_HELP_BASE64_CONTENT_FILE_PATH)
-podcast_parser.add_argument('--upload_with_temp_file', required=False, type=bool, help=ARGUMENT_HELP_UPLOAD_TEMP_FILE)
-podcast_parser.add_argument('--content_file_temp_file_id', required=False, type=str, help=ARGUMENT_HELP_CONTENT_FILE_TEMP_FILE_ID)
-podcast_parser.add_argument('--target_locale', required=False, type=str, help=ARGUMENT_HELP_TARGET_LOCALE)
-podcast_parser.add_argument('--voice_name', required=False, type=str, help=ARGUMENT_HELP_VOICE_NAME)
-podcast_parser.add_argument('--multi_talker_voice_speaker_names', required=False, type=str, help=ARGUMENT_HELP_MULTI_TALKER_VOICE_SPEAKER_NAMES)
-podcast_parser.add_argument('--gender_preference', required=False, type=str, help=ARGUMENT_HELP_GENDER_PREFERENCE)
-podcast_parser.add_argument('--length', required=False, type=str, help=ARGUMENT_HELP_LENGTH)
-podcast_parser.add_argument('--host', required=False, type=str, help=ARGUMENT_HELP_HOST)
-podcast_parser.add_argument('--style', required=False, type=str, help=ARGUMENT_HELP_STYLE)
-podcast_parser.add_argument('--additional_instructions', required=False, type=str, help=ARGUMENT_HELP_ADDITIONAL_INSTRUCTIONS)
-podcast_parser.set_defaults(func=handle_create_generation_and_wait_until_terminated)
-
-podcast_parser = sub_parsers.add_parser('get', help='Request get generation API.')
-podcast_parser.add_argument('--id', required=True, type=str, help='Generation ID.')
-podcast_parser.set_defaults(func=handle_request_get_generation_api)
-
-podcast_parser = sub_parsers.add_parser('list', help='Request list generations API.')
-podcast_parser.set_defaults(func=handle_request_list_generations_api)
-
-podcast_parser = sub_parsers.add_parser('delete', help='Request delete generation API.')
-podcast_parser.add_argument('--id', required=True, type=str, help='Generation ID.')
-podcast_parser.set_defaults(func=handle_request_delete_generation_api)
-
-# Add these command parsers before "args = root_parser.parse_args()"
-podcast_parser = sub_parsers.add_parser('upload_temp_file', help='Upload a temp file.')
-podcast_parser.add_argument('--file_path', required=True, type=str, help=ARGUMENT_HELP_CONTENT_FILE_PATH)
-podcast_parser.add_argument('--expires_after_in_mins', required=False, type=int, help=ARGUMENT_HELP_EXPIRES_AFTER_IN_MINS)
-podcast_parser.set_defaults(func=handle_upload_temp_file)
-
-podcast_parser = sub_parsers.add_parser('list_temp_files', help='List all temp files.')
-podcast_parser.set_defaults(func=handle_list_temp_files)
-
-podcast_parser = sub_parsers.add_parser('get_temp_file', help='Get details of a specific temp file.')
-podcast_parser.add_argument('--id', required=True, type=str, help="Temp file ID")
-podcast_parser.set_defaults(func=handle_get_temp_file)
-
-podcast_parser = sub_parsers.add_parser('delete_temp_file', help='Delete a temp file.')
-podcast_parser.add_argument('--id', required=True, type=str, help="Temp file ID")
-podcast_parser.set_defaults(func=handle_delete_temp_file)
-
-args = root_parser.parse_args()
-args.func(args)
+
+    last_report = [time.monotonic()]
+
+    def report(done: int, total: int, failed: int) -> None:
+        now = time.monotonic()
+        if done == total or now - last_report[0] >= 2:
+            last_report[0] = now
+            logger.info(f"Deleted {done - failed}/{total} generations ({failed} failed).")
+
+    started = time.monotonic()
+    # Resolved before deleting: a pool forgets the owner of a deleted generation.
+    temp_file_clients = temp_file_clients_of(args, podcast_client, candidates)
+    deleted, failed = podcast_client.delete_many(
+        (item["id"] for item in candidates), max_workers=args.workers, progress=report)
+    for generation_id, delete_error in failed.items():
+        logger.error(f"Failed to delete generation {generation_id}: {delete_error}")
+
+    deleted_set = set(deleted)
+    temp_file_ids = [temp_file_id for temp_file_id in temp_file_ids_of(
+        [item for item in candidates if item["id"] in deleted_set]) if temp_file_id in temp_file_clients]
+    if temp_file_ids:
+        with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="delete") as executor:
+            # Temp files may already be gone (cleaned up after creation, or expired).
+            futures = [executor.submit(temp_file_clients[temp_file_id].request_delete_temp_file, temp_file_id)
+                       for temp_file_id in temp_file_ids]
+            for future in futures:
+                future.result()
+    removed_files = purge_local_files(args, deleted)
+    notify_daemon_deleted(deleted)
+
+    message = (f"Purged {len(deleted)} generations in {time.monotonic() - started:.1f}s, "
+               f"{len(temp_file_ids)} temp files and {removed_files} local audio files.")
+    if failed:
+        logger.error(f"{message} {len(failed)} generations could not be deleted.")
+        sys.exit(1)
+    logger.info(message, extra={"color": "green"})
+
+def format_elapsed(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+def render_watch_table(watcher, max_rows: int) -> list[str]:
+    """Summary line plus one row per generation (unfinished first), at most max_rows rows."""
+    import time
+    from collections import Counter
+    now = time.time()
+    monotonic_now = time.monotonic()
+    rows = watcher.snapshot()
+    counts = Counter(watched.status or "Unknown" for watched in rows)
+    lines = [f"{len(rows)} generations: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())) +
+             f" | {watcher.requests} requests"]
+    id_width = max([len("ID")] + [len(watched.id) for watched in rows[:max_rows]])
+    lines.append(f"{'ID':<{id_width}}  {'STATUS':<10} {'ELAPSED':>8} {'NEXT POLL':>9}  DETAIL")
+    for watched in rows[:max_rows]:
+        next_poll = "" if watched.terminal else format_elapsed(max(watched.next_poll - monotonic_now, 0))
+        detail = watched.error or watched.failure_reason or ""
+        lines.append(f"{watched.id:<{id_width}}  {watched.status or '?':<10} {format_elapsed(watched.elapsed(now)):>8} "
+                     f"{next_poll:>9}  {detail}"[:200])
+    if len(rows) > max_rows:
+        lines.append(f"... {len(rows) - max_rows} more")
+    return lines
+
+def handle_watch(args):
+    import shutil
+    import time
+    from microsoft_client_podcast.podcast_watcher import GenerationWatcher, STATUS_ERROR, TERMINAL_STATUSES
+    if (args.ids is None) == (not args.all_running):
+        logger.error("Give either --ids or --all_running.")
+        sys.exit(2)
+    client = create_podcast_client(args, pool_maxsize=args.workers)
+    listed = []
+    if args.all_running:
+        for success, error, page in client.iter_generation_pages(maxPageSize=100):
+            if not success:
+                logger.error(f"Failed to list generations with error: {error}")
+                sys.exit(1)
+            listed.extend(item for item in page.value if item.get("status") not in TERMINAL_STATUSES)
+        generation_ids = [item["id"] for item in listed]
+    else:
+        generation_ids = [generation_id.strip() for generation_id in args.ids.split(",") if generation_id.strip()]
+    if not generation_ids:
+        logger.info("No generations to watch.", extra={"color": "green"})
+        return
+    watcher = GenerationWatcher(
+        client,
+        generation_ids,
+        min_interval_seconds=args.min_interval_seconds,
+        max_interval_seconds=args.max_interval_seconds,
+        workers=args.workers)
+    watcher.seed(listed)
+
+    live = sys.stdout.isatty()
+    drawn = [0]
+
+    def on_update(watcher, changed) -> None:
+        if live:
+            lines = render_watch_table(watcher, max_rows=max(shutil.get_terminal_size().lines - 4, 1))
+            # Move up over the previous table and clear it before redrawing.
+            sys.stdout.write((f"\x1b[{drawn[0]}F\x1b[J" if drawn[0] else "") + "\n".join(lines) + "\n")
+            sys.stdout.flush()
+            drawn[0] = len(lines)
+            return
+        for watched in changed:
+            print(json.dumps({"id": watched.id, "status": watched.status,
+                              "elapsed_seconds": round(watched.elapsed(time.time()), 1),
+                              "failure_reason": watched.failure_reason, "error": watched.error}), flush=True)
+
+    started = time.monotonic()
+    try:
+        watcher.run(on_update=on_update)
+    except KeyboardInterrupt:
+        logger.warning(f"Stopped watching after {watcher.requests} requests.")
+        sys.exit(130)
+    unsuccessful = [watched for watched in watcher.generations.values() if watched.status != "Succeeded"]
+    errors = [watched for watched in unsuccessful if watched.status == STATUS_ERROR]
+    message = (f"All {len(generation_ids)} generations terminated after {time.monotonic() - started:.0f}s "
+               f"and {watcher.requests} requests ({watcher.list_scans} list scans).")
+    if unsuccessful:
+        logger.error(f"{message} {len(unsuccessful)} did not succeed"
+                     + (f", {len(errors)} of them could not be queried." if errors else "."))
+        sys.exit(1)
+    logger.info(message, extra={"color": "green"})
+
+def add_create_generation_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--content_file_azure_blob_url', required=False, type=str, help=ARGUMENT_HELP_CONTENT_FILE_AZURE_BLOB_URL)
+    parser.add_argument('--content_file_path', required=False, type=str, help=ARGUMENT_HELP_CONTENT_FILE_PATH)
+    parser.add_argument('--base64_content_file_path', required=False, type=str, help=ARGUMENT_HELP_BASE64_CONTENT_FILE_PATH)
+    parser.add_argument('--upload_with_temp_file', required=False, type=bool, help=ARGUMENT_HELP_UPLOAD_TEMP_FILE)
+    parser.add_argument('--content_file_temp_file_id', required=False, type=str, help=ARGUMENT_HELP_CONTENT_FILE_TEMP_FILE_ID)
+    parser.add_argument('--target_locale', required=False, type=str, help=ARGUMENT_HELP_TARGET_LOCALE)
+    parser.add_argument('--voice_name', required=False, type=str, help=ARGUMENT_HELP_VOICE_NAME)
+    parser.add_argument('--multi_talker_voice_speaker_names', required=False, type=str, help=ARGUMENT_HELP_MULTI_TALKER_VOICE_SPEAKER_NAMES)
+    parser.add_argument('--gender_preference', required=False, type=str, help=ARGUMENT_HELP_GENDER_PREFERENCE)
+    parser.add_argument('--length', required=False, type=str, help=ARGUMENT_HELP_LENGTH)
+    parser.add_argument('--host', required=False, type=str, help=ARGUMENT_HELP_HOST)
+    parser.add_argument('--style', required=False, type=str, help=ARGUMENT_HELP_STYLE)
+    parser.add_argument('--additional_instructions', required=False, type=str, help=ARGUMENT_HELP_ADDITIONAL_INSTRUCTIONS)
+    parser.add_argument('--no_cache', action='store_true', help=ARGUMENT_HELP_NO_CACHE)
+
+def add_generation_id_argument(parser: argparse.ArgumentParser):
+    parser.add_argument('--id', required=True, type=str, help='Generation ID.')
+
+def add_temp_file_id_argument(parser: argparse.ArgumentParser):
+    parser.add_argument('--id', required=True, type=str, help="Temp file ID")
+
+def add_upload_temp_file_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--file_path', required=True, type=str, help=ARGUMENT_HELP_CONTENT_FILE_PATH)
+    parser.add_argument('--expires_after_in_mins', required=False, type=int, help=ARGUMENT_HELP_EXPIRES_AFTER_IN_MINS)
+
+def add_list_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--output', required=False, choices=["json", "ndjson"], default="json", help=ARGUMENT_HELP_OUTPUT)
+    parser.add_argument('--fields', required=False, type=str, help=ARGUMENT_HELP_FIELDS)
+
+def add_batch_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--manifest', required=True, type=str, help=ARGUMENT_HELP_MANIFEST)
+    parser.add_argument('--results', required=False, type=str, default="-", help=ARGUMENT_HELP_RESULTS)
+    parser.add_argument('--concurrency', required=False, type=int, default=8, help=ARGUMENT_HELP_CONCURRENCY)
+    parser.add_argument('--output_dir', required=False, type=str, help=ARGUMENT_HELP_OUTPUT_DIR)
+    parser.add_argument('--resources', required=False, type=str, help=ARGUMENT_HELP_RESOURCES)
+    parser.add_argument('--tenant_cap', required=False, type=int, help=ARGUMENT_HELP_TENANT_CAP)
+    parser.add_argument('--tenant_weights', required=False, type=str, help=ARGUMENT_HELP_TENANT_WEIGHTS)
+    parser.add_argument('--no_cache', action='store_true', help=ARGUMENT_HELP_NO_CACHE)
+    parser.add_argument('--upload_workers', required=False, type=int, default=4,
+                        help='Threads reading and uploading content (default: 4).')
+    parser.add_argument('--download_workers', required=False, type=int, default=4,
+                        help='Threads downloading audio (default: 4).')
+    parser.add_argument('--poll_interval_seconds', required=False, type=int, default=5,
+                        help='Seconds between status polls of each running generation (default: 5).')
+
+def add_sync_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--mirror_db', required=False, type=str, help=ARGUMENT_HELP_MIRROR_DB)
+    parser.add_argument('--full', action='store_true', help=ARGUMENT_HELP_FULL_SYNC)
+    parser.add_argument('--workers', required=False, type=int, default=4,
+                        help='List pages fetched at the same time (default: 4).')
+    parser.add_argument('--page_size', required=False, type=int, default=100,
+                        help='Items per list request (default: 100).')
+    parser.add_argument('--skip_temp_files', action='store_true', help='Only sync generations.')
+    parser.add_argument('--resources', required=False, type=str, help=ARGUMENT_HELP_RESOURCES)
+
+def add_query_arguments(parser: argparse.ArgumentParser):
+    from microsoft_client_podcast.podcast_mirror import ORDER_COLUMNS
+    parser.add_argument('--output', required=False, choices=["json", "ndjson"], default="json",
+                        help='Output format: an indented JSON list (default) or one compact JSON object per line.')
+    parser.add_argument('--fields', required=False, type=str, help=ARGUMENT_HELP_FIELDS)
+    parser.add_argument('--mirror_db', required=False, type=str, help=ARGUMENT_HELP_MIRROR_DB)
+    parser.add_argument('--status', required=False, type=str, help=ARGUMENT_HELP_QUERY_STATUS)
+    parser.add_argument('--locale', required=False, type=str, help='Locale to match, case insensitive.')
+    parser.add_argument('--created_after', required=False, type=str, help=ARGUMENT_HELP_QUERY_DATE)
+    parser.add_argument('--created_before', required=False, type=str, help=ARGUMENT_HELP_QUERY_DATE)
+    parser.add_argument('--updated_after', required=False, type=str,
+                        help='Last action at or after this time. ' + ARGUMENT_HELP_QUERY_DATE)
+    parser.add_argument('--updated_before', required=False, type=str,
+                        help='Last action before this time. ' + ARGUMENT_HELP_QUERY_DATE)
+    parser.add_argument('--name', required=False, type=str,
+                        help='Glob pattern (* and ?) matched against the display name (file name for temp files) or id.')
+    parser.add_argument('--order_by', required=False, choices=list(ORDER_COLUMNS), default="created",
+                        help='Sort column, newest/largest first unless --ascending (default: created).')
+    parser.add_argument('--ascending', action='store_true', help='Sort in ascending order.')
+    parser.add_argument('--limit', required=False, type=int, help='Maximum number of items to output.')
+    parser.add_argument('--temp_files', action='store_true', help='Query temp files instead of generations.')
+    parser.add_argument('--include_expired', action='store_true', help='Also output expired temp files.')
+    parser.add_argument('--all_resources', action='store_true',
+                        help='Include every synced resource, not only the --region/--sub_key one.')
+
+def add_purge_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--status', required=False, type=str, help=ARGUMENT_HELP_QUERY_STATUS)
+    parser.add_argument('--older_than_days', required=False, type=float,
+                        help='Only generations created more than this many days ago.')
+    parser.add_argument('--name', required=False, type=str,
+                        help='Glob pattern (* and ?) matched against the display name or id.')
+    parser.add_argument('--all', action='store_true', help='Allow purging without any filter.')
+    parser.add_argument('--dry_run', action='store_true',
+                        help='Only print the matching generations (one JSON object per line) and counts.')
+    parser.add_argument('--workers', required=False, type=int, default=16,
+                        help='DELETE requests in flight at the same time (default: 16).')
+    parser.add_argument('--use_mirror', action='store_true',
+                        help='Find generations in the local mirror (see sync) instead of listing them.')
+    parser.add_argument('--mirror_db', required=False, type=str, help=ARGUMENT_HELP_MIRROR_DB)
+    parser.add_argument('--output_dir', required=False, type=str, help=ARGUMENT_HELP_PURGE_OUTPUT_DIR)
+    parser.add_argument('--keep_audio', action='store_true', help='Do not delete local audio files.')
+    parser.add_argument('--resources', required=False, type=str, help=ARGUMENT_HELP_RESOURCES)
+
+def add_watch_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--ids', required=False, type=str, help=ARGUMENT_HELP_WATCH_IDS)
+    parser.add_argument('--all_running', action='store_true', help='Watch every generation not yet terminal.')
+    parser.add_argument('--min_interval_seconds', required=False, type=float, default=2.0,
+                        help=ARGUMENT_HELP_MIN_INTERVAL)
+    parser.add_argument('--max_interval_seconds', required=False, type=float, default=30.0,
+                        help='Longest time between polls of a generation (default: 30).')
+    parser.add_argument('--workers', required=False, type=int, default=8,
+                        help='GET requests in flight at the same time (default: 8).')
+
+# (subcommand, help, function adding its arguments, handler)
+SUBCOMMANDS = [
+    ('create_generation_and_wait_until_terminated', 'Create podcast generation with pdf/txt file blob url.',
+     add_create_generation_arguments, handle_create_generation_and_wait_until_terminated),
+    ('get', 'Request get generation API.', add_generation_id_argument, handle_request_get_generation_api),
+    ('list', 'Request list generations API.', add_list_arguments, handle_request_list_generations_api),
+    ('delete', 'Request delete generation API.', add_generation_id_argument, handle_request_delete_generation_api),
+    ('upload_temp_file', 'Upload a temp file.', add_upload_temp_file_arguments, handle_upload_temp_file),
+    ('list_temp_files', 'List all temp files.', add_list_arguments, handle_list_temp_files),
+    ('get_temp_file', 'Get details of a specific temp file.', add_temp_file_id_argument, handle_get_temp_file),
+    ('delete_temp_file', 'Delete a temp file.', add_temp_file_id_argument, handle_delete_temp_file),
+    ('batch', 'Create, wait for and download generations listed in a CSV/JSONL manifest.',
+     add_batch_arguments, handle_batch),
+    ('sync', 'Update the local SQLite mirror of generations and temp files.', add_sync_arguments, handle_sync),
+    ('query', 'Find generations or temp files in the local mirror without calling the API.',
+     add_query_arguments, handle_query),
+    ('purge', ARGUMENT_HELP_PURGE, add_purge_arguments, handle_purge),
+    ('watch', 'Follow generations with one shared poller and a live status table until all are terminal.',
+     add_watch_arguments, handle_watch),
+]
+
+def build_parser(argv: list[str]) -> argparse.ArgumentParser:
+    """
+    Build the argument parser. Subcommand arguments are only added for the
+    subcommand(s) named in argv; the rest are registered for --help only.
+    """
+    root_parser = argparse.ArgumentParser(
+        prog='main_podcast.py',
+        description='Generate podcast audio/video from text input using Microsoft Podcast API.',
+        epilog='Microsoft Podcast Generation Sample'
+    )
+
+    root_parser.add_argument("--region", required=True, help="specify speech resource region.")
+    root_parser.add_argument("--sub_key", required=True, help="specify speech resource subscription key.")
+    root_parser.add_argument("--api_version", required=True, help="specify API version.")
+    root_parser.add_argument("--log_format", "--log-format", choices=["text", "json"], default="text",
+                             help="format of log messages written to stderr: colored text (default) or JSON lines.")
+    root_parser.add_argument("--quiet", action="store_true", help="only log warnings and errors.")
+    root_parser.add_argument("--verbose", action="store_true", help="also log every HTTP request and poll.")
+    root_parser.add_argument("--profile", action="store_true",
+                             help="record wall time per phase and HTTP route and print a summary table at exit.")
+    root_parser.add_argument("--profile_output", required=False, type=str,
+                             help="also run cProfile and dump pstats data to this file (implies --profile).")
+    root_parser.add_argument("--rate_limits", required=False, type=str, default=os.environ.get(RATE_LIMITS_ENV),
+                             help=ARGUMENT_HELP_RATE_LIMITS)
+    root_parser.add_argument("--rate_limit_db", required=False, type=str, default=os.environ.get(RATE_LIMIT_DB_ENV),
+                             help="SQLite file shared by the processes rate limiting one key "
+                                  f"(default: ${RATE_LIMIT_DB_ENV} or podcast_rate_limits-<uid>.sqlite3 in the temp directory).")
+    root_parser.add_argument("--no_daemon", action="store_true",
+                             help="run in this process even when podcast_daemon.py is running.")
+    sub_parsers = root_parser.add_subparsers(required=True, help='subcommand help')
+
+    requested = set(argv)
+    for name, help_text, add_arguments, handler in SUBCOMMANDS:
+        podcast_parser = sub_parsers.add_parser(name, help=help_text)
+        if name in requested:
+            add_arguments(podcast_parser)
+        podcast_parser.set_defaults(func=handler)
+    return root_parser
+
+def configure_rate_limiter(rate_limits: str, rate_limit_db: str = None):
+    if not rate_limits:
+        return
+    from microsoft_speech_client_common.client_common_client_base import SpeechLongRunningTaskClientBase
+    from microsoft_speech_client_common.client_common_rate_limiter import (
+        RateLimiter,
+        parse_rate_limits
+    )
+    SpeechLongRunningTaskClientBase.set_rate_limiter(
+        RateLimiter(parse_rate_limits(rate_limits), database_path=rate_limit_db))
+
+def run(args):
+    """Run the selected subcommand, optionally under --profile."""
+    configure_rate_limiter(args.rate_limits, args.rate_limit_db)
+    if not (args.profile or args.profile_output):
+        args.func(args)
+        return
+
+    import cProfile
+    from microsoft_speech_client_common.client_common_client_base import SpeechLongRunningTaskClientBase
+    from microsoft_speech_client_common.client_common_profiling import (
+        start_profile,
+        stop_profile
+    )
+    profile = start_profile()
+    SpeechLongRunningTaskClientBase.add_global_request_hook(profile)
+    profiler = cProfile.Profile() if args.profile_output else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        args.func(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_output)
+        stop_profile()
+        SpeechLongRunningTaskClientBase.remove_global_request_hook(profile)
+        print(profile.summary_table(), file=sys.stderr)
+        if profiler is not None:
+            print(f"cProfile stats written to {args.profile_output}", file=sys.stderr)
+
+def main(argv: list[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--no_daemon" not in argv:
+        import podcast_daemon
+        exit_code = podcast_daemon.try_forward(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from microsoft_speech_client_common.client_common_logging import (
+        LIBRARY_LOGGER_NAMES,
+        configure_logging
+    )
+    args = build_parser(argv).parse_args(argv)
+    configure_logging(
+        level=logging.WARNING if args.quiet else logging.DEBUG if args.verbose else logging.INFO,
+        json_format=args.log_format == "json",
+        logger_names=LIBRARY_LOGGER_NAMES + (logger.name,))
+    run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import time
+from urllib3.util import Url
+from microsoft_speech_client_common.client_common_util import (
+    dict_to_dataclass
+)
+from microsoft_speech_client_common.client_common_async_client_base import (
+    AsyncSpeechLongRunningTaskClientBase
+)
+from microsoft_client_podcast.podcast_client import (
+    PodcastClient,
+    decode_generation
+)
+from microsoft_client_podcast.podcast_generation_cache import (
+    GenerationCache
+)
+from microsoft_client_podcast.podcast_dataclass import (
+    PodcastGenerationDefinition, PagedGenerationDefinition
+)
+
+
+class AsyncPodcastClient(AsyncSpeechLongRunningTaskClientBase):
+    """Asyncio variant of PodcastClient; ``request_*`` methods are coroutines."""
+
+    URL_PATH_ROOT = PodcastClient.URL_PATH_ROOT
+    URL_SEGMENT_NAME_GENERATIONS = PodcastClient.URL_SEGMENT_NAME_GENERATIONS
+
+    # Request body building and generation caching do no I/O and are shared with the sync client.
+    create_generation_creation_body = PodcastClient.create_generation_creation_body
+    create_generation_config_body = PodcastClient.create_generation_config_body
+    generation_cache_key = PodcastClient.generation_cache_key
+    _cached_generation = PodcastClient._cached_generation
+    forget_generation = PodcastClient.forget_generation
+    _cache_generation_response = PodcastClient._cache_generation_response
+
+    def __init__(self, region, sub_key, api_version, max_connections: int = 100,
+                 generation_cache: GenerationCache = None):
+        super().__init__(
+            region=region,
+            sub_key=sub_key,
+            api_version=api_version,
+            service_url_segment_name=self.URL_PATH_ROOT,
+            long_running_tasks_url_segment_name=self.URL_SEGMENT_NAME_GENERATIONS,
+            max_connections=max_connections
+        )
+        self.generation_cache = generation_cache if generation_cache is not None else GenerationCache()
+
+    async def request_get_generation(self,
+                                     generation_id: str,
+                                     use_cache: bool = True) -> tuple[bool, str, PodcastGenerationDefinition]:
+        key, entry = self._cached_generation(generation_id)
+        if use_cache and entry is not None and entry.fresh(time.monotonic()):
+            self.generation_cache.hit()
+            return True, None, decode_generation(entry.body)
+        success, error, response = await self.request_get_long_running_task(
+            generation_id, etag=entry.etag if entry is not None else None)
+        if not success:
+            return False, error, None
+        if response is None:
+            self.generation_cache.invalidate(key)
+            return True, None, None
+        return True, None, self._cache_generation_response(
+            key, entry, response.status_code, response.content, response.headers.get("ETag"))
+
+    async def request_list_generations(self,
+                                       top: int = None,
+                                       skip: int = None,
+                                       maxPageSize: int = None) -> tuple[bool, str, PagedGenerationDefinition]:
+        success, error, response = await self.request_list_long_running_tasks(
+            top=top,
+            skip=skip,
+            maxPageSize=maxPageSize)
+        if not success:
+            return False, error, None
+
+        response_generations = dict_to_dataclass(
+            data=response.json(),
+            dataclass_type=PagedGenerationDefinition)
+        return True, None, response_generations
+
+    async def request_delete_generation(self,
+                                        generation_id: str) -> tuple[bool, str]:
+        try:
+            return await self.request_delete_long_running_task(generation_id)
+        finally:
+            self.forget_generation(generation_id)
+
+    async def request_create_generation(
+            self,
+            generation_id: str,
+            request_body: PodcastGenerationDefinition,
+            ) -> tuple[bool, str, PodcastGenerationDefinition, Url]:
+        if generation_id is None:
+            raise ValueError
+
+        success, error, response, operation_location_url = await self.request_create_long_running_task_with_id(
+            id=generation_id,
+            creation_body=request_body)
+        if not success:
+            return False, error, None, None
+
+        response_generation = dict_to_dataclass(
+            data=response.json(),
+            dataclass_type=PodcastGenerationDefinition)
+        return True, None, response_generation, operation_location_url
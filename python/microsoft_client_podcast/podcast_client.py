@@ -1,15 +1,12 @@
 # Copyright (c) Microsoft. All rights reserved.
 # Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
 
-import urllib3
-import orjson
-import uuid
-import requests
 import locale
 import json
 import dataclasses
-from termcolor import colored
+import logging
 from datetime import datetime
+from typing import Callable, Iterable, Iterator
 from urllib3.util import Url
 from microsoft_speech_client_common.client_common_const import (
     HTTP_HEADERS_OPERATION_LOCATION
@@ -33,6 +30,7 @@ from microsoft_client_podcast.podcast_const import (
     MAX_PLAIN_TEXT_LENGTH,
     MAX_BASE64_TEXT_LENGTH,
     MAX_CONTENT_FILE_SIZE,
+    AUDIO_DOWNLOAD_CHUNK_SIZE,
 )
 from microsoft_speech_client_common.client_common_dataclass import (
     OperationDefinition
@@ -44,26 +42,78 @@ from microsoft_speech_client_common.client_common_util import (
 from microsoft_speech_client_common.client_common_client_base import (
     SpeechLongRunningTaskClientBase
 )
+from microsoft_speech_client_common.client_common_logging import (
+    get_logger
+)
+from microsoft_speech_client_common.client_common_profiling import (
+    PHASE_DECODE_RESPONSE,
+    PHASE_READ_CONTENT,
+    phase
+)
+from microsoft_speech_client_common.client_common_rate_limiter import (
+    key_id
+)
 from microsoft_client_podcast.podcast_dataclass import (
     PodcastGenerationDefinition, PodcastContent, PodcastGenerationOutput, PodcastTtsConfig, PagedGenerationDefinition
 )
-import time
+from microsoft_client_podcast.podcast_generation_cache import (
+    GenerationCache
+)
+from microsoft_client_podcast.podcast_result_cache import (
+    ResultCache,
+    content_digest,
+    result_cache_key
+)
 import base64
 import os
+import time
+import uuid
+import orjson
+
+logger = get_logger(__name__)
+
+# Parallel DELETE requests of delete_many() by default
+DEFAULT_DELETE_WORKERS = 16
+
+# Generation states after which a generation no longer changes.
+TERMINAL_GENERATION_STATUSES = (OperationStatus.Succeeded, OperationStatus.Failed)
+
+
+def decode_generation(body: bytes) -> PodcastGenerationDefinition:
+    with phase(PHASE_DECODE_RESPONSE):
+        return dict_to_dataclass(data=orjson.loads(body), dataclass_type=PodcastGenerationDefinition)
+
+
+def build_generation_id(target_locale: str) -> str:
+    """
+    Build a new generation ID: creation time and locale for readability, plus
+    a random suffix so generations started in the same second never collide.
+    """
+    now_string = datetime.now().strftime("%m%d%Y%H%M%S")
+    return f"{now_string}_{target_locale}_{uuid.uuid4().hex[:12]}"
 
 
 class PodcastClient(SpeechLongRunningTaskClientBase):
     URL_PATH_ROOT = "podcast"
     URL_SEGMENT_NAME_GENERATIONS = "generations"
 
-    def __init__(self, region, sub_key, api_version):
+    def __init__(self, region, sub_key, api_version, pool_maxsize: int = None,
+                 generation_cache: GenerationCache = None):
+        """
+        ``generation_cache`` memoizes request_get_generation (see
+        GenerationCache); clients get their own unless one is passed, e.g. to
+        share it between short-lived clients. GenerationCache(max_bytes=0)
+        disables it.
+        """
         super().__init__(
             region=region,
             sub_key=sub_key,
             api_version=api_version,
             service_url_segment_name=self.URL_PATH_ROOT,
-            long_running_tasks_url_segment_name=self.URL_SEGMENT_NAME_GENERATIONS
+            long_running_tasks_url_segment_name=self.URL_SEGMENT_NAME_GENERATIONS,
+            pool_maxsize=pool_maxsize
         )
+        self.generation_cache = generation_cache if generation_cache is not None else GenerationCache()
 
     def create_generation_and_wait_until_terminated(
         self,
@@ -77,16 +127,43 @@ class PodcastClient(SpeechLongRunningTaskClientBase):
         length: str = None,
         host: str = None,
         style: str = None,
-        additional_instructions: str = None
+        additional_instructions: str = None,
+        generation_id: str = None,
+        result_cache: ResultCache = None,
+        cache_key: str = None
     ) -> tuple[bool, str, PodcastGenerationDefinition]:
+        """
+        With a ``result_cache``, a succeeded generation with the same settings
+        and content is returned instead of generating again, and a new one is
+        recorded. ``cache_key`` overrides the key derived from the arguments,
+        e.g. to key a temp file upload by the local file it was uploaded from.
+        """
         if target_locale is None:
             raise ValueError("Target locale must be provided")
-        if content_file_azure_blob_url is None and content_file_path is None:
+        if content_file_azure_blob_url is None and content_file_path is None and content_file_temp_file_id is None:
             raise ValueError("At least one content source must be provided")
 
-        now = datetime.now()
-        nowString = now.strftime("%m%d%Y%H%M%S")
-        generation_id = f"{nowString}_{target_locale}"
+        if result_cache is not None:
+            if cache_key is None:
+                cache_key = self.generation_cache_key(
+                    target_locale=target_locale,
+                    content_file_azure_blob_url=content_file_azure_blob_url,
+                    content_file_path=content_file_path,
+                    content_file_temp_file_id=content_file_temp_file_id,
+                    voice_name=voice_name,
+                    multi_talker_voice_speaker_names=multi_talker_voice_speaker_names,
+                    gender_preference=gender_preference,
+                    length=length,
+                    host=host,
+                    style=style,
+                    additional_instructions=additional_instructions)
+            cached_generation, _ = result_cache.find_generation(self, cache_key)
+            if cached_generation is not None:
+                logger.info("Reusing cached generation %s", cached_generation.id, extra={"color": "green"})
+                return True, None, cached_generation
+
+        if generation_id is None:
+            generation_id = build_generation_id(target_locale)
 
         request_body = self.create_generation_creation_body(
             content_file_azure_blob_url=content_file_azure_blob_url,
@@ -106,37 +183,81 @@ class PodcastClient(SpeechLongRunningTaskClientBase):
             generation_id=generation_id,
             request_body=request_body)
         if not success:
-            print(colored(f"Failed to create generation with ID {generation_id} with error: {error}",
-                          'red'))
+            logger.error("Failed to create generation with ID %s with error: %s", generation_id, error)
             return False, error, None
 
         self.request_operation_until_terminated(operation_location)
 
         success, error, response_generation = self.request_get_generation(generation_id)
         if not success:
-            print(colored(f"Failed to query generation {generation_id} with error: {error}", 'red'))
+            logger.error("Failed to query generation %s with error: %s", generation_id, error)
             return False, error, None
-        generation = json.dumps(dataclasses.asdict(response_generation), indent=2)
         if response_generation.status != OperationStatus.Succeeded:
-            print(colored(f"Generation creation failed with error: {error}", 'red'))
-            print(generation)
+            logger.error("Generation creation failed with error: %s\n%s",
+                         error, json.dumps(dataclasses.asdict(response_generation), indent=2))
             return False, response_generation.FailureReason, None
-        else:
-            print(colored(f"Succesfully generated podcast:", 'green'))
-            print(generation)
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info("Succesfully generated podcast:\n%s",
+                        json.dumps(dataclasses.asdict(response_generation), indent=2),
+                        extra={"color": "green"})
 
+        if result_cache is not None:
+            result_cache.put(self, cache_key, generation_id)
         return True, None, response_generation
 
+    def generation_cache_key(
+            self,
+            target_locale: locale,
+            content_file_azure_blob_url: Url = None,
+            content_file_path: str = None,
+            content_file_temp_file_id: str = None,
+            **options) -> str:
+        """
+        Result cache key of a generation: its settings (``options`` as for
+        create_generation_config_body) plus the digest of its content. A local
+        file is identified by its bytes, so it is preferred over a temp file id.
+        """
+        definition = self.create_generation_config_body(target_locale=target_locale, **options)
+        return result_cache_key(definition, content_digest(
+            content_file_azure_blob_url=content_file_azure_blob_url,
+            content_file_path=content_file_path,
+            content_file_temp_file_id=content_file_temp_file_id))
+
     def request_get_generation(self,
-                                generation_id: str) -> tuple[bool, str, PodcastGenerationDefinition]:
-        success, error, response = self.request_get_long_running_task(generation_id)
+                                generation_id: str,
+                                use_cache: bool = True) -> tuple[bool, str, PodcastGenerationDefinition]:
+        """
+        Get a generation, served from ``generation_cache`` while fresh. With
+        ``use_cache=False`` the service is always asked (conditionally, when
+        a cached ETag exists), e.g. to confirm it still has the generation.
+        """
+        key, entry = self._cached_generation(generation_id)
+        if use_cache and entry is not None and entry.fresh(time.monotonic()):
+            self.generation_cache.hit()
+            return True, None, decode_generation(entry.body)
+        success, error, response = self.request_get_long_running_task(
+            generation_id, etag=entry.etag if entry is not None else None)
         if not success:
             return False, error, None
-        response_translation_json = response.json()
-        response_translation = dict_to_dataclass(
-            data=response_translation_json,
-            dataclass_type=PodcastGenerationDefinition)
-        return True, None, response_translation
+        if response is None:
+            self.generation_cache.invalidate(key)
+            return True, None, None
+        return True, None, self._cache_generation_response(
+            key, entry, response.status, response.data, response.headers.get("ETag"))
+
+    def _cached_generation(self, generation_id: str):
+        # Generation IDs are only unique per resource, and a cache may be shared across clients.
+        key = f"{self._service_root}/{key_id(self.sub_key)}/{generation_id}"
+        return key, self.generation_cache.get(key)
+
+    def _cache_generation_response(self, key: str, entry, status: int, body: bytes,
+                                   etag: str) -> PodcastGenerationDefinition:
+        if status == 304:
+            self.generation_cache.not_modified(key)
+            return decode_generation(entry.body)
+        generation = decode_generation(body)
+        self.generation_cache.put(key, body, etag=etag, terminal=generation.status in TERMINAL_GENERATION_STATUSES)
+        return generation
     
     def request_list_generations(self,
                                   top: int = None,
@@ -156,16 +277,112 @@ class PodcastClient(SpeechLongRunningTaskClientBase):
             dataclass_type=PagedGenerationDefinition)
         return True, None, response_generations
 
+    def iter_generation_pages(self,
+                              top: int = None,
+                              skip: int = None,
+                              maxPageSize: int = None) -> Iterator[tuple[bool, str, PagedGenerationDefinition]]:
+        """
+        Yield (success, error, page) for every page of generations, following
+        nextLink. Page items are kept as the JSON dictionaries returned by the API.
+        """
+        url = self.build_list_long_running_tasks_url(top=top, skip=skip, maxPageSize=maxPageSize)
+        for success, error, page_json in self.iter_list_pages(url):
+            if not success:
+                yield False, error, None
+                return
+            yield True, None, dict_to_dataclass(data=page_json, dataclass_type=PagedGenerationDefinition)
+
+    def download_generation_audio(
+            self,
+            generation: PodcastGenerationDefinition,
+            file_path: str,
+            ) -> tuple[bool, str, int]:
+        """
+        Stream the audio of a succeeded generation to file_path in chunks.
+        The file only appears once complete (written as file_path + ".partial").
+
+        Returns:
+            Tuple of (success, error_message, size in bytes)
+        """
+        if generation is None or generation.output is None or not generation.output.audioFileUrl:
+            return False, "Generation has no audio output", 0
+
+        partial_path = f"{file_path}.partial"
+        size = 0
+        logger.debug("Downloading audio of generation %s to %s", generation.id, file_path)
+        response = self.request("GET", generation.output.audioFileUrl, preload_content=False)
+        try:
+            if response.status != 200:
+                return False, f"Audio download failed with HTTP {response.status}", 0
+            with open(partial_path, "wb") as f:
+                for chunk in response.stream(AUDIO_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        finally:
+            response.release_conn()
+        os.replace(partial_path, file_path)
+        return True, None, size
+
     def request_delete_generation(self,
                                    generation_id: str) -> tuple[bool, str]:
-        return self.request_delete_long_running_task(generation_id)
+        try:
+            return self.request_delete_long_running_task(generation_id)
+        finally:
+            self.forget_generation(generation_id)
 
-    def create_generation_creation_body(
+    def forget_generation(self, generation_id: str) -> None:
+        """Drop a generation from generation_cache, e.g. once another process deleted it."""
+        self.generation_cache.invalidate(self._cached_generation(generation_id)[0])
+
+    def delete_many(self,
+                    generation_ids: Iterable[str],
+                    max_workers: int = DEFAULT_DELETE_WORKERS,
+                    progress: Callable[[int, int, int], None] = None) -> tuple[list[str], dict[str, str]]:
+        """
+        Delete generations with up to ``max_workers`` DELETE requests in
+        flight; size the connection pool (pool_maxsize) to match. A failed
+        delete of a generation that no longer exists counts as deleted.
+        ``progress(done, total, failed)`` is called after each generation.
+
+        Returns (deleted ids, {failed id: error}).
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        generation_ids = list(dict.fromkeys(generation_ids))
+        deleted, failed = [], {}
+        if not generation_ids:
+            return deleted, failed
+
+        def delete(generation_id: str) -> tuple[bool, str]:
+            success, error = self.request_delete_generation(generation_id)
+            if not success:
+                found_success, _, generation = self.request_get_generation(generation_id)
+                if found_success and generation is None:
+                    return True, None
+            return success, error
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="delete") as executor:
+            futures = {executor.submit(delete, generation_id): generation_id for generation_id in generation_ids}
+            for future in as_completed(futures):
+                generation_id = futures[future]
+                try:
+                    success, error = future.result()
+                except Exception as exc:
+                    success, error = False, str(exc)
+                if success:
+                    deleted.append(generation_id)
+                else:
+                    failed[generation_id] = error
+                if progress is not None:
+                    progress(len(deleted) + len(failed), len(generation_ids), len(failed))
+        return deleted, failed
+
+    def create_generation_config_body(
             self,
             target_locale: locale,
-            content_file_azure_blob_url: Url,
-            content_file_path: str = None,
-            content_file_temp_file_id: str = None,
             voice_name: str = None,
             multi_talker_voice_speaker_names: str = None,
             gender_preference: str = None,
@@ -174,12 +391,10 @@ class PodcastClient(SpeechLongRunningTaskClientBase):
             style: str = None,
             additional_instructions: str = None,
             ) -> PodcastGenerationDefinition:
+        """Generation body with every setting but the (still empty) content."""
         if target_locale is None:
             raise ValueError
-        if content_file_azure_blob_url is None and content_file_path is None and content_file_temp_file_id is None:
-            raise ValueError("At least one content source must be provided")
-
-        create_request_body=PodcastGenerationDefinition(
+        return PodcastGenerationDefinition(
             displayName="Generation Name",
             description="Generation Description",
             locale=target_locale,
@@ -195,6 +410,33 @@ class PodcastClient(SpeechLongRunningTaskClientBase):
                 multiTalkerVoiceSpeakerNames=multi_talker_voice_speaker_names),
         )
 
+    def create_generation_creation_body(
+            self,
+            target_locale: locale,
+            content_file_azure_blob_url: Url,
+            content_file_path: str = None,
+            content_file_temp_file_id: str = None,
+            voice_name: str = None,
+            multi_talker_voice_speaker_names: str = None,
+            gender_preference: str = None,
+            length: str = None,
+            host: str = None,
+            style: str = None,
+            additional_instructions: str = None,
+            ) -> PodcastGenerationDefinition:
+        if content_file_azure_blob_url is None and content_file_path is None and content_file_temp_file_id is None:
+            raise ValueError("At least one content source must be provided")
+
+        create_request_body = self.create_generation_config_body(
+            target_locale=target_locale,
+            voice_name=voice_name,
+            multi_talker_voice_speaker_names=multi_talker_voice_speaker_names,
+            gender_preference=gender_preference,
+            length=length,
+            host=host,
+            style=style,
+            additional_instructions=additional_instructions)
+
         # API also support proivde text directly, then not specify url argument, instead using the "text" argument as below:
         #   kind=ContentSourceKind.PlainText,
         #   text="your text content"
@@ -206,7 +448,7 @@ class PodcastClient(SpeechLongRunningTaskClientBase):
         elif content_file_path is not None:
             file_extension = os.path.splitext(content_file_path)[1].lower()
             if file_extension == '.txt':
-                with open(content_file_path, 'r', encoding='utf-8') as f:
+                with phase(PHASE_READ_CONTENT), open(content_file_path, 'r', encoding='utf-8') as f:
                     text_content = f.read()
                     if (len(text_content) <= MAX_PLAIN_TEXT_LENGTH):
                         create_request_body.content.kind=ContentSourceKind.PlainText
@@ -216,7 +458,7 @@ class PodcastClient(SpeechLongRunningTaskClientBase):
                         raise ValueError("Please upload by temp file.")
             elif file_extension == '.pdf':
                 create_request_body.content.fileFormat = ContentFileFormatKind.Pdf
-                with open(content_file_path, 'rb') as f:
+                with phase(PHASE_READ_CONTENT), open(content_file_path, 'rb') as f:
                     file_binary = f.read()
                     if len(file_binary) <= MAX_BASE64_TEXT_LENGTH:
                         base64_content = base64.b64encode(file_binary).decode('utf-8')
@@ -0,0 +1,363 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator
+from urllib3.util import Url
+from microsoft_speech_client_common.client_common_enum import (
+    OperationStatus
+)
+from microsoft_speech_client_common.client_common_instrumentation import (
+    RequestHook,
+    RequestInfo
+)
+from microsoft_speech_client_common.client_common_logging import (
+    get_logger
+)
+from microsoft_client_podcast.podcast_client import (
+    PodcastClient,
+    build_generation_id
+)
+from microsoft_client_podcast.tempfile_client import (
+    TempFileClient
+)
+from microsoft_client_podcast.podcast_dataclass import (
+    PodcastGenerationDefinition,
+    PagedGenerationDefinition
+)
+from microsoft_client_podcast.podcast_result_cache import (
+    ResultCache
+)
+
+logger = get_logger(__name__)
+
+# A throttled resource gets no new generations for this long, doubling per
+# consecutive throttled request up to the maximum.
+THROTTLE_COOLDOWN_SECONDS = 5
+MAX_THROTTLE_COOLDOWN_SECONDS = 120
+
+TERMINAL_STATUSES = (OperationStatus.Succeeded, OperationStatus.Failed, OperationStatus.Canceled)
+
+
+@dataclass(kw_only=True)
+class PodcastResource:
+    """One Speech resource (region + key) a PodcastClientPool can route to."""
+    region: str
+    sub_key: str
+    api_version: str
+    name: str = None  # label in stats(); defaults to the region
+
+
+class ResourceState(RequestHook):
+    """Clients, load and throttling health of one pooled resource."""
+
+    def __init__(self, resource: PodcastResource, pool_maxsize: int = None):
+        self.resource = resource
+        self.name = resource.name or resource.region
+        self.client = PodcastClient(
+            region=resource.region,
+            sub_key=resource.sub_key,
+            api_version=resource.api_version,
+            pool_maxsize=pool_maxsize)
+        self.client.add_request_hook(self)
+        self._pool_maxsize = pool_maxsize
+        self._tempfile_client = None
+        self._lock = threading.Lock()
+        # Generations owned by this resource that have not terminated yet
+        self.active: set[str] = set()
+        self.throttled = 0
+        self.consecutive_throttled = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def tempfile_client(self) -> TempFileClient:
+        with self._lock:
+            if self._tempfile_client is None:
+                self._tempfile_client = TempFileClient(
+                    region=self.resource.region,
+                    sub_key=self.resource.sub_key,
+                    api_version=self.resource.api_version,
+                    pool_maxsize=self._pool_maxsize)
+                self._tempfile_client.add_request_hook(self)
+            return self._tempfile_client
+
+    def after_request(self, info: RequestInfo) -> None:
+        with self._lock:
+            if info.throttled:
+                self.throttled += info.throttled
+                self.consecutive_throttled += 1
+                cooldown = min(THROTTLE_COOLDOWN_SECONDS * 2 ** (self.consecutive_throttled - 1),
+                               MAX_THROTTLE_COOLDOWN_SECONDS)
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown)
+            elif info.status is not None and info.status < 500:
+                self.consecutive_throttled = 0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "region": self.resource.region,
+                "in_flight": len(self.active),
+                "throttled": self.throttled,
+                "cooling_down_seconds": round(max(self.cooldown_until - time.monotonic(), 0), 3),
+                "routes": self.client.stats(),
+            }
+
+
+class PodcastClientPool:
+    """
+    Spreads generations across several Speech resources.
+
+    New generations go to the healthy (not recently throttled) resource with
+    the fewest generations in flight. Every later call for a generation (get,
+    poll, download, delete) goes to the resource that created it; IDs this
+    pool has not seen are looked up on each resource once. The methods mirror
+    PodcastClient, so callers can use a pool wherever they use a client.
+    """
+
+    def __init__(self, resources: list[PodcastResource], pool_maxsize: int = None):
+        if not resources:
+            raise ValueError("At least one resource is required")
+        self.resources = [ResourceState(resource, pool_maxsize) for resource in resources]
+        self._lock = threading.Lock()
+        self._owners: dict[str, ResourceState] = {}
+        # Operation URL <-> generation of generations still in flight
+        self._operation_owners: dict[str, tuple[ResourceState, str]] = {}
+        self._generation_operations: dict[str, str] = {}
+
+    # Routing
+
+    def assign(self, generation_id: str) -> ResourceState:
+        """
+        Return the resource owning ``generation_id``, choosing the least loaded
+        healthy one (and counting the generation in flight) if it is new.
+        """
+        with self._lock:
+            state = self._owners.get(generation_id)
+            if state is not None:
+                return state
+            now = time.monotonic()
+            healthy = [s for s in self.resources if s.healthy(now)]
+            if healthy:
+                state = min(healthy, key=lambda s: len(s.active))
+            else:
+                state = min(self.resources, key=lambda s: s.cooldown_until)
+            self._owners[generation_id] = state
+        with state._lock:
+            state.active.add(generation_id)
+        return state
+
+    def owner(self, generation_id: str) -> ResourceState:
+        """Return the resource owning an existing generation, or None if no resource has it."""
+        with self._lock:
+            state = self._owners.get(generation_id)
+        if state is not None or len(self.resources) == 1:
+            return state or self.resources[0]
+        for candidate in self.resources:
+            success, _, generation = candidate.client.request_get_generation(generation_id)
+            if success and generation is not None:
+                with self._lock:
+                    return self._owners.setdefault(generation_id, candidate)
+        return None
+
+    def tempfile_client_for(self, generation_id: str) -> TempFileClient:
+        """Temp file client of the resource that will create ``generation_id``."""
+        return self.assign(generation_id).tempfile_client
+
+    def release(self, generation_id: str) -> None:
+        """Stop counting a generation as in flight, e.g. when its creation was abandoned."""
+        with self._lock:
+            state = self._owners.get(generation_id)
+        if state is not None:
+            self._release(state, generation_id)
+
+    def _release(self, state: ResourceState, generation_id: str) -> None:
+        with state._lock:
+            state.active.discard(generation_id)
+        with self._lock:
+            operation_url = self._generation_operations.pop(generation_id, None)
+            if operation_url is not None:
+                self._operation_owners.pop(operation_url, None)
+
+    def _forget(self, generation_id: str) -> None:
+        with self._lock:
+            state = self._owners.pop(generation_id, None)
+        if state is not None:
+            self._release(state, generation_id)
+
+    def stats(self) -> dict[str, dict]:
+        """Per resource: generations in flight, 429 count, remaining cooldown and route stats."""
+        return {state.name: state.snapshot() for state in self.resources}
+
+    # PodcastClient interface
+
+    def create_generation_creation_body(self, **kwargs) -> PodcastGenerationDefinition:
+        return self.resources[0].client.create_generation_creation_body(**kwargs)
+
+    def create_generation_config_body(self, **kwargs) -> PodcastGenerationDefinition:
+        return self.resources[0].client.create_generation_config_body(**kwargs)
+
+    def generation_cache_key(self, **kwargs) -> str:
+        return self.resources[0].client.generation_cache_key(**kwargs)
+
+    def create_generation_and_wait_until_terminated(
+            self,
+            target_locale,
+            content_file_azure_blob_url: Url,
+            generation_id: str = None,
+            result_cache: ResultCache = None,
+            cache_key: str = None,
+            **kwargs) -> tuple[bool, str, PodcastGenerationDefinition]:
+        if target_locale is None:
+            raise ValueError("Target locale must be provided")
+        # Cache hits are checked through the pool: the generation may live on any resource.
+        if result_cache is not None:
+            cache_key = cache_key or self.generation_cache_key(
+                target_locale=target_locale, content_file_azure_blob_url=content_file_azure_blob_url, **kwargs)
+            cached_generation, _ = result_cache.find_generation(self, cache_key)
+            if cached_generation is not None:
+                logger.info("Reusing cached generation %s", cached_generation.id, extra={"color": "green"})
+                return True, None, cached_generation
+        generation_id = generation_id or build_generation_id(target_locale)
+        state = self.assign(generation_id)
+        try:
+            success, error, generation = state.client.create_generation_and_wait_until_terminated(
+                target_locale=target_locale,
+                content_file_azure_blob_url=content_file_azure_blob_url,
+                generation_id=generation_id,
+                **kwargs)
+        finally:
+            self._release(state, generation_id)
+        if success and result_cache is not None:
+            result_cache.put(self, cache_key, generation_id)
+        return success, error, generation
+
+    def request_create_generation(
+            self,
+            generation_id: str,
+            request_body: PodcastGenerationDefinition,
+            ) -> tuple[bool, str, PodcastGenerationDefinition, Url]:
+        state = self.assign(generation_id)
+        success, error, generation, operation_location = state.client.request_create_generation(
+            generation_id=generation_id,
+            request_body=request_body)
+        if not success:
+            # Keep the owner: temp files uploaded for this generation live there.
+            self._release(state, generation_id)
+            return False, error, None, None
+        with self._lock:
+            self._operation_owners[operation_location.url] = (state, generation_id)
+            self._generation_operations[generation_id] = operation_location.url
+        logger.debug("Created generation %s on resource %s", generation_id, state.name)
+        return True, None, generation, operation_location
+
+    def request_get_generation(self,
+                               generation_id: str,
+                               use_cache: bool = True) -> tuple[bool, str, PodcastGenerationDefinition]:
+        state = self.owner(generation_id)
+        if state is None:
+            return True, None, None
+        success, error, generation = state.client.request_get_generation(generation_id, use_cache=use_cache)
+        if success and (generation is None or generation.status in TERMINAL_STATUSES):
+            self._release(state, generation_id)
+        return success, error, generation
+
+    def request_list_generations(self,
+                                 top: int = None,
+                                 skip: int = None,
+                                 maxPageSize: int = None) -> tuple[bool, str, PagedGenerationDefinition]:
+        """First page of every resource, merged; use iter_generation_pages() for all pages."""
+        merged = PagedGenerationDefinition(value=[])
+        for state in self.resources:
+            success, error, page = state.client.request_list_generations(top=top, skip=skip, maxPageSize=maxPageSize)
+            if not success:
+                return False, error, None
+            self._remember_page(state, page)
+            merged.value.extend(page.value)
+        return True, None, merged
+
+    def iter_generation_pages(self,
+                              top: int = None,
+                              skip: int = None,
+                              maxPageSize: int = None) -> Iterator[tuple[bool, str, PagedGenerationDefinition]]:
+        """Every page of every resource, one resource after another."""
+        for state in self.resources:
+            for success, error, page in state.client.iter_generation_pages(top=top, skip=skip, maxPageSize=maxPageSize):
+                if not success:
+                    yield False, error, None
+                    return
+                self._remember_page(state, page)
+                yield True, None, page
+
+    def request_delete_generation(self,
+                                  generation_id: str) -> tuple[bool, str]:
+        state = self.owner(generation_id)
+        if state is None:
+            return False, f"Generation {generation_id} not found on any resource"
+        success, error = state.client.request_delete_generation(generation_id)
+        if success:
+            self._forget(generation_id)
+        return success, error
+
+    # Only uses request_delete_generation and request_get_generation above.
+    delete_many = PodcastClient.delete_many
+
+    def request_get_operation(self, operation_location: Url, print_url: bool = False):
+        state, generation_id = self._operation_owner(operation_location)
+        success, error, operation = state.client.request_get_operation(operation_location, print_url=print_url)
+        if success and (operation is None or operation.status in TERMINAL_STATUSES):
+            if generation_id is not None:
+                self._release(state, generation_id)
+            else:
+                self._forget_operation(operation_location)
+        return success, error, operation
+
+    def request_operation_until_terminated(self,
+                                           operation_location: Url,
+                                           poll_interval_seconds: int = 5) -> OperationStatus:
+        state, generation_id = self._operation_owner(operation_location)
+        try:
+            return state.client.request_operation_until_terminated(
+                operation_location, poll_interval_seconds=poll_interval_seconds)
+        finally:
+            if generation_id is not None:
+                self._release(state, generation_id)
+            else:
+                self._forget_operation(operation_location)
+
+    def download_generation_audio(self,
+                                  generation: PodcastGenerationDefinition,
+                                  file_path: str) -> tuple[bool, str, int]:
+        state = self.owner(generation.id) or self.resources[0]
+        return state.client.download_generation_audio(generation, file_path)
+
+    def _operation_owner(self, operation_location: Url) -> tuple[ResourceState, str]:
+        with self._lock:
+            owner = self._operation_owners.get(operation_location.url)
+        if owner is not None:
+            return owner
+        # Operation not created through this pool: resources in the same region share a host,
+        # so ask each of them until one knows it.
+        same_host = [state for state in self.resources if state.client.root_url().host == operation_location.host]
+        if len(same_host) > 1:
+            for state in same_host:
+                success, _, operation = state.client.request_get_operation(operation_location)
+                if success and operation is not None:
+                    with self._lock:
+                        return self._operation_owners.setdefault(operation_location.url, (state, None))
+        return (same_host[0] if same_host else self.resources[0]), None
+
+    def _forget_operation(self, operation_location: Url) -> None:
+        with self._lock:
+            owner = self._operation_owners.get(operation_location.url)
+            if owner is not None and owner[1] is None:
+                del self._operation_owners[operation_location.url]
+
+    def _remember_page(self, state: ResourceState, page: PagedGenerationDefinition) -> None:
+        with self._lock:
+            for item in page.value:
+                self._owners.setdefault(item["id"], state)
@@ -4,3 +4,4 @@
 MAX_PLAIN_TEXT_LENGTH = 1024 * 1024
 MAX_BASE64_TEXT_LENGTH = 8 * 1024 * 1024
 MAX_CONTENT_FILE_SIZE = 50 * 1024 * 1024
+AUDIO_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
@@ -0,0 +1,117 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+# Generations still running are served from the cache this long before the
+# next get revalidates them with the service.
+DEFAULT_FRESH_SECONDS = 1.0
+# Succeeded and failed generations do not change, but may be deleted by other
+# processes, and their audio URL carries a SAS token that expires: they are
+# revalidated after this long, well within the token lifetime.
+DEFAULT_TERMINAL_MAX_AGE_SECONDS = 10 * 60
+
+
+@dataclass
+class CachedGeneration:
+    body: bytes
+    etag: str = None
+    terminal: bool = False
+    fresh_until: float = 0.0
+
+    def fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+
+class GenerationCache:
+    """
+    LRU cache of get generation response bodies, bounded to ``max_bytes``.
+
+    Succeeded and failed generations never change again, so they are served
+    from memory for ``terminal_max_age_seconds`` (unless evicted or
+    invalidated by a delete); other responses for ``fresh_seconds``. After
+    that the next get sends ``If-None-Match`` with the cached ``ETag`` (when
+    the service sent one) and keeps the cached body on 304 Not Modified.
+    ``max_bytes=0`` disables caching. One cache may be shared by several
+    clients and threads.
+    """
+
+    def __init__(self,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 fresh_seconds: float = DEFAULT_FRESH_SECONDS,
+                 terminal_max_age_seconds: float = DEFAULT_TERMINAL_MAX_AGE_SECONDS):
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.terminal_max_age_seconds = terminal_max_age_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedGeneration] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, key: str) -> CachedGeneration:
+        """Return the entry for ``key`` (fresh or not) and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def put(self, key: str, body: bytes, etag: str = None, terminal: bool = False) -> None:
+        """Store a full response body (a 200 response)."""
+        if len(body) > self.max_bytes:
+            self.invalidate(key)
+            return
+        entry = CachedGeneration(body=body, etag=etag, terminal=terminal)
+        entry.fresh_until = time.monotonic() + self._lifetime(entry)
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def not_modified(self, key: str) -> None:
+        """Keep serving the cached body of ``key`` after a 304 response."""
+        with self._lock:
+            self.revalidated += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.fresh_until = time.monotonic() + self._lifetime(entry)
+
+    def _lifetime(self, entry: CachedGeneration) -> float:
+        return self.terminal_max_age_seconds if entry.terminal else self.fresh_seconds
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= len(entry.body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+            }
@@ -0,0 +1,458 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable
+import orjson
+from microsoft_speech_client_common.client_common_enum import (
+    OperationStatus
+)
+from microsoft_speech_client_common.client_common_logging import (
+    get_logger
+)
+from microsoft_client_podcast.podcast_result_cache import (
+    resource_id
+)
+
+logger = get_logger(__name__)
+
+DATABASE_TIMEOUT_SECONDS = 30
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_WORKERS = 4
+# Generations whose last action was this recent before the previous sync are
+# refreshed again by an incremental sync, in case they changed since.
+DEFAULT_RECENT_SECONDS = 60 * 60
+
+TERMINAL_STATUSES = (OperationStatus.Succeeded.value, OperationStatus.Failed.value, OperationStatus.Canceled.value)
+
+KIND_GENERATIONS = "generations"
+KIND_TEMP_FILES = "temp_files"
+
+# Columns queries may sort by, as accepted by query(order_by=...)
+ORDER_COLUMNS = {
+    "created": "created",
+    "last_action": "last_action",
+    "status": "status",
+    "locale": "locale",
+    "id": "id",
+}
+
+
+def default_database_path() -> str:
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "podcast_client", "mirror.sqlite3")
+
+
+def parse_timestamp(value) -> float:
+    """Epoch seconds of an ISO 8601 timestamp (or datetime), None if missing."""
+    if value is None or value == "":
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value.timestamp()
+
+
+@dataclass
+class SyncStats:
+    resource: str
+    full: bool = False
+    listed: int = 0
+    refreshed: int = 0
+    removed: int = 0
+    temp_files: int = 0
+    seconds: float = 0.0
+
+
+class GenerationMirror:
+    """
+    Local SQLite index of the generations and temp files of one or more
+    Speech resources, so they can be filtered by status, locale and date
+    without paging through the list APIs.
+
+    ``sync()`` fills it. The first sync of a resource (or ``full=True``)
+    reads every list page, ``workers`` slices of ``page_size`` items at a
+    time, and removes rows of generations no longer listed. Later syncs read
+    pages only until a slice holds nothing new or changed (the list returns
+    the newest generations first), then re-fetch the mirrored generations
+    that were not terminal or changed within ``recent_seconds`` of the
+    previous sync. Generations deleted long after they finished are only
+    noticed by a full sync. Temp files, which expire, are re-read in full
+    every sync.
+
+    Items are stored as returned by the API; queries return those dicts.
+    """
+
+    def __init__(self, database_path: str = None):
+        self.database_path = database_path or default_database_path()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.database_path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS generations ("
+            "resource TEXT NOT NULL, id TEXT NOT NULL, status TEXT, locale TEXT, display_name TEXT, "
+            "created REAL, last_action REAL, data BLOB NOT NULL, synced REAL NOT NULL, "
+            "PRIMARY KEY (resource, id))")
+        for column in ("status", "locale", "created", "last_action"):
+            connection.execute(f"CREATE INDEX IF NOT EXISTS generations_{column} ON generations ({column})")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS temp_files ("
+            "resource TEXT NOT NULL, id TEXT NOT NULL, name TEXT, created REAL, expires REAL, size INTEGER, "
+            "data BLOB NOT NULL, synced REAL NOT NULL, PRIMARY KEY (resource, id))")
+        connection.execute("CREATE INDEX IF NOT EXISTS temp_files_created ON temp_files (created)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "resource TEXT NOT NULL, kind TEXT NOT NULL, synced REAL NOT NULL, full_synced REAL, "
+            "PRIMARY KEY (resource, kind))")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must stay on the thread that created them.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.database_path, timeout=DATABASE_TIMEOUT_SECONDS, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    # Sync
+
+    def sync(self,
+             client,
+             tempfile_client=None,
+             full: bool = False,
+             workers: int = DEFAULT_WORKERS,
+             page_size: int = DEFAULT_PAGE_SIZE,
+             recent_seconds: float = DEFAULT_RECENT_SECONDS,
+             progress: Callable[[str], None] = None) -> tuple[bool, str, SyncStats]:
+        """
+        Bring the rows of ``client``'s resource up to date (and its temp files
+        when a TempFileClient is given). ``progress`` is called with a short
+        message after each step.
+        """
+        started = time.monotonic()
+        resource = resource_id(client)
+        sync_time = time.time()
+        state = self._sync_state(resource, KIND_GENERATIONS)
+        stats = SyncStats(resource=resource, full=full or state is None)
+        report = progress or (lambda message: None)
+
+        if stats.full:
+            success, error, items = self._fetch_slices(
+                self._generation_slice_fetcher(client, page_size), page_size, workers)
+            if not success:
+                return False, error, stats
+            self._store_generations(resource, items, sync_time)
+            stats.listed = len(items)
+            stats.removed = self._delete_older(KIND_GENERATIONS, resource, sync_time)
+            report(f"Listed {stats.listed} generations, removed {stats.removed}")
+        else:
+            known = self._known_generations(resource)
+            recent_since = state[0] - recent_seconds
+
+            def settled(items: list[dict]) -> bool:
+                return all(self._unchanged(known.get(item.get("id")), item, recent_since) for item in items)
+
+            success, error, items = self._fetch_slices(
+                self._generation_slice_fetcher(client, page_size), page_size, workers, settled)
+            if not success:
+                return False, error, stats
+            self._store_generations(resource, items, sync_time)
+            stats.listed = len(items)
+            report(f"Read {stats.listed} generations from the newest list pages")
+
+            listed_ids = {item.get("id") for item in items}
+            stale = [generation_id for generation_id, (status, last_action) in known.items()
+                     if generation_id not in listed_ids
+                     and (status not in TERMINAL_STATUSES or (last_action or 0) >= recent_since)]
+            success, error = self._refresh(client, resource, stale, workers, sync_time, stats)
+            if not success:
+                return False, error, stats
+            report(f"Refreshed {stats.refreshed} unfinished generations, removed {stats.removed}")
+        self._set_sync_state(resource, KIND_GENERATIONS, sync_time, full=stats.full)
+
+        if tempfile_client is not None:
+            temp_resource = resource_id(tempfile_client)
+            success, error, items = self._fetch_slices(
+                self._temp_file_slice_fetcher(tempfile_client, page_size), page_size, workers)
+            if not success:
+                return False, error, stats
+            self._store_temp_files(temp_resource, items, sync_time)
+            self._delete_older(KIND_TEMP_FILES, temp_resource, sync_time)
+            self._set_sync_state(temp_resource, KIND_TEMP_FILES, sync_time, full=True)
+            stats.temp_files = len(items)
+            report(f"Listed {stats.temp_files} temp files")
+
+        stats.seconds = round(time.monotonic() - started, 3)
+        return True, None, stats
+
+    @staticmethod
+    def _generation_slice_fetcher(client, page_size: int):
+        def fetch(skip: int) -> tuple[bool, str, list[dict], bool]:
+            success, error, page = client.request_list_generations(top=page_size, skip=skip, maxPageSize=page_size)
+            if not success:
+                return False, error, None, False
+            return True, None, page.value or [], page.nextLink is not None
+        return fetch
+
+    @staticmethod
+    def _temp_file_slice_fetcher(tempfile_client, page_size: int):
+        def fetch(skip: int) -> tuple[bool, str, list[dict], bool]:
+            success, error, page = tempfile_client.request_list_temp_files(
+                top=page_size, skip=skip, max_page_size=page_size)
+            if not success:
+                return False, error, None, False
+            return True, None, page.value or [], page.nextLink is not None
+        return fetch
+
+    @staticmethod
+    def _fetch_slices(fetch: Callable[[int], tuple[bool, str, list[dict], bool]],
+                      page_size: int,
+                      workers: int,
+                      settled: Callable[[list[dict]], bool] = None) -> tuple[bool, str, list[dict]]:
+        """
+        Fetch consecutive ``page_size`` slices (skip = 0, page_size, ...),
+        one list request each and ``workers`` at a time, until a short slice
+        or one ``settled`` accepts. ``fetch(skip)`` returns the slice and
+        whether the service has more of it. A short slice with more to come
+        means the service caps pages below ``page_size``: the rest of that
+        round is dropped and fetching continues with the capped size.
+        """
+        items = []
+        skip = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mirror-sync") as executor:
+            while True:
+                futures = [executor.submit(fetch, skip + i * page_size) for i in range(workers)]
+                next_skip = skip + workers * page_size
+                for i, future in enumerate(futures):
+                    success, error, slice_items, more = future.result()
+                    if not success:
+                        for pending in futures:
+                            pending.cancel()
+                        return False, error, None
+                    items.extend(slice_items)
+                    if settled is not None and settled(slice_items):
+                        for pending in futures:
+                            pending.cancel()
+                        return True, None, items
+                    if len(slice_items) < page_size:
+                        for pending in futures:
+                            pending.cancel()
+                        if not more or not slice_items:
+                            return True, None, items
+                        # A short page with more to come: the service caps pages below page_size.
+                        next_skip = skip + i * page_size + len(slice_items)
+                        page_size = len(slice_items)
+                        break
+                skip = next_skip
+
+    @staticmethod
+    def _unchanged(known: tuple[str, float], item: dict, recent_since: float) -> bool:
+        if known is None:
+            return False
+        status, last_action = known
+        item_last_action = parse_timestamp(item.get("lastActionDateTime"))
+        return (status == item.get("status") and status in TERMINAL_STATUSES
+                and last_action == item_last_action and (last_action or 0) < recent_since)
+
+    def _refresh(self, client, resource: str, generation_ids: list[str], workers: int,
+                 sync_time: float, stats: SyncStats) -> tuple[bool, str]:
+        if not generation_ids:
+            return True, None
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mirror-sync") as executor:
+            results = list(executor.map(client.request_get_generation, generation_ids))
+        items = []
+        for generation_id, (success, error, generation) in zip(generation_ids, results):
+            if not success:
+                return False, error
+            if generation is None:
+                self._connection().execute(
+                    "DELETE FROM generations WHERE resource = ? AND id = ?", (resource, generation_id))
+                stats.removed += 1
+                continue
+            items.append(generation)
+        self._store_generations(resource, items, sync_time)
+        stats.refreshed = len(items)
+        return True, None
+
+    def _store_generations(self, resource: str, items: Iterable, sync_time: float) -> None:
+        rows = []
+        for item in items:
+            # Refreshed generations are dataclasses; their URLs serialize as strings.
+            data = orjson.dumps(item, default=str)
+            if not isinstance(item, dict):
+                item = orjson.loads(data)
+            rows.append((
+                resource, item["id"], item.get("status"), (item.get("locale") or "").lower() or None,
+                item.get("displayName"), parse_timestamp(item.get("createdDateTime")),
+                parse_timestamp(item.get("lastActionDateTime")), data, sync_time))
+        self._write(
+            "INSERT OR REPLACE INTO generations "
+            "(resource, id, status, locale, display_name, created, last_action, data, synced) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _store_temp_files(self, resource: str, items: list[dict], sync_time: float) -> None:
+        rows = [(resource, item["id"], item.get("name"), parse_timestamp(item.get("createdDateTime")),
+                 parse_timestamp(item.get("expiresDateTime")), item.get("sizeInBytes"), orjson.dumps(item), sync_time)
+                for item in items]
+        self._write(
+            "INSERT OR REPLACE INTO temp_files (resource, id, name, created, expires, size, data, synced) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _write(self, statement: str, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(statement, rows)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _delete_older(self, kind: str, resource: str, sync_time: float) -> int:
+        cursor = self._connection().execute(
+            f"DELETE FROM {kind} WHERE resource = ? AND synced < ?", (resource, sync_time))
+        return cursor.rowcount
+
+    def _known_generations(self, resource: str) -> dict[str, tuple[str, float]]:
+        rows = self._connection().execute(
+            "SELECT id, status, last_action FROM generations WHERE resource = ?", (resource,))
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def _sync_state(self, resource: str, kind: str) -> tuple[float, float]:
+        return self._connection().execute(
+            "SELECT synced, full_synced FROM sync_state WHERE resource = ? AND kind = ?", (resource, kind)).fetchone()
+
+    def _set_sync_state(self, resource: str, kind: str, sync_time: float, full: bool) -> None:
+        self._connection().execute(
+            "INSERT INTO sync_state (resource, kind, synced, full_synced) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (resource, kind) DO UPDATE SET synced = excluded.synced, "
+            "full_synced = COALESCE(excluded.full_synced, full_synced)",
+            (resource, kind, sync_time, sync_time if full else None))
+
+    # Local updates
+
+    def remove_generation(self, generation_id: str, client=None) -> int:
+        """Drop a generation, e.g. after deleting it; only from ``client``'s resource if given."""
+        if client is None:
+            cursor = self._connection().execute("DELETE FROM generations WHERE id = ?", (generation_id,))
+        else:
+            cursor = self._connection().execute(
+                "DELETE FROM generations WHERE resource = ? AND id = ?", (resource_id(client), generation_id))
+        return cursor.rowcount
+
+    def remove_temp_file(self, file_id: str, tempfile_client=None) -> int:
+        if tempfile_client is None:
+            cursor = self._connection().execute("DELETE FROM temp_files WHERE id = ?", (file_id,))
+        else:
+            cursor = self._connection().execute(
+                "DELETE FROM temp_files WHERE resource = ? AND id = ?", (resource_id(tempfile_client), file_id))
+        return cursor.rowcount
+
+    # Queries
+
+    def query(self,
+              status: str | Iterable[str] = None,
+              locale: str = None,
+              created_after: datetime | str = None,
+              created_before: datetime | str = None,
+              updated_after: datetime | str = None,
+              updated_before: datetime | str = None,
+              name: str = None,
+              client=None,
+              order_by: str = "created",
+              descending: bool = True,
+              limit: int = None) -> list[dict]:
+        """
+        Mirrored generations matching every given filter, newest first by
+        default. ``status`` may be several statuses, ``locale`` is case
+        insensitive, dates are datetimes or ISO 8601 strings (updated = last
+        action), ``name`` is a glob pattern (``*``, ``?``) matched against the
+        display name or id, and ``client`` restricts to its resource.
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Unknown order '{order_by}', expected one of {', '.join(ORDER_COLUMNS)}")
+        conditions, parameters = self._conditions(
+            client=client, created_after=created_after, created_before=created_before)
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            conditions.append(f"status IN ({', '.join('?' * len(statuses))})")
+            parameters.extend(getattr(s, "value", s) for s in statuses)
+        if locale is not None:
+            conditions.append("locale = ?")
+            parameters.append(locale.lower())
+        if updated_after is not None:
+            conditions.append("last_action >= ?")
+            parameters.append(parse_timestamp(updated_after))
+        if updated_before is not None:
+            conditions.append("last_action < ?")
+            parameters.append(parse_timestamp(updated_before))
+        if name is not None:
+            conditions.append("(display_name GLOB ? OR id GLOB ?)")
+            parameters.extend((name, name))
+        return self._select("generations", conditions, parameters, ORDER_COLUMNS[order_by], descending, limit)
+
+    def query_temp_files(self,
+                         name: str = None,
+                         created_after: datetime | str = None,
+                         created_before: datetime | str = None,
+                         include_expired: bool = False,
+                         client=None,
+                         limit: int = None) -> list[dict]:
+        """Mirrored temp files matching the filters (``name`` is a glob pattern), newest first."""
+        conditions, parameters = self._conditions(
+            client=client, created_after=created_after, created_before=created_before)
+        if name is not None:
+            conditions.append("(name GLOB ? OR id GLOB ?)")
+            parameters.extend((name, name))
+        if not include_expired:
+            conditions.append("(expires IS NULL OR expires > ?)")
+            parameters.append(time.time())
+        return self._select("temp_files", conditions, parameters, "created", True, limit)
+
+    @staticmethod
+    def _conditions(client, created_after, created_before) -> tuple[list[str], list]:
+        conditions, parameters = [], []
+        if client is not None:
+            conditions.append("resource = ?")
+            parameters.append(resource_id(client))
+        if created_after is not None:
+            conditions.append("created >= ?")
+            parameters.append(parse_timestamp(created_after))
+        if created_before is not None:
+            conditions.append("created < ?")
+            parameters.append(parse_timestamp(created_before))
+        return conditions, parameters
+
+    def _select(self, table: str, conditions: list[str], parameters: list, order_column: str,
+                descending: bool, limit: int) -> list[dict]:
+        statement = f"SELECT data FROM {table}"
+        if conditions:
+            statement += " WHERE " + " AND ".join(conditions)
+        statement += f" ORDER BY {order_column} {'DESC' if descending else 'ASC'}, id"
+        if limit is not None:
+            statement += " LIMIT ?"
+            parameters = parameters + [limit]
+        return [orjson.loads(row[0]) for row in self._connection().execute(statement, parameters)]
+
+    def stats(self) -> dict:
+        """Row counts per resource and status, and when each resource was last synced."""
+        connection = self._connection()
+        resources = {}
+        for resource, status, count in connection.execute(
+                "SELECT resource, status, COUNT(*) FROM generations GROUP BY resource, status"):
+            resources.setdefault(resource, {"generations": {}})["generations"][status] = count
+        for resource, count in connection.execute("SELECT resource, COUNT(*) FROM temp_files GROUP BY resource"):
+            resources.setdefault(resource, {"generations": {}})["temp_files"] = count
+        for resource, kind, synced, full_synced in connection.execute(
+                "SELECT resource, kind, synced, full_synced FROM sync_state"):
+            entry = resources.setdefault(resource, {"generations": {}})
+            entry[f"{kind}_synced"] = datetime.fromtimestamp(synced).astimezone().isoformat(timespec="seconds")
+        return {"database_path": self.database_path, "resources": resources}
@@ -0,0 +1,276 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import dataclasses
+import enum
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable
+from urllib.parse import urlsplit, urlunsplit
+import orjson
+from microsoft_speech_client_common.client_common_enum import (
+    OperationStatus
+)
+from microsoft_speech_client_common.client_common_logging import (
+    get_logger
+)
+from microsoft_speech_client_common.client_common_rate_limiter import (
+    key_id
+)
+from microsoft_client_podcast.podcast_dataclass import (
+    PodcastGenerationDefinition
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10000
+DATABASE_TIMEOUT_SECONDS = 30
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+# Definition fields that decide what gets generated; names, descriptions and
+# server-side state do not.
+KEY_FIELDS = ("locale", "host", "scriptGeneration", "tts")
+
+
+def default_database_path() -> str:
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "podcast_client", "results.sqlite3")
+
+
+def resource_id(client) -> str:
+    """Identify the Speech resource of a client (root URL and key hash) without storing its key."""
+    return f"{client.root_url()}/{key_id(client.sub_key)}"
+
+
+def resource_clients(client) -> dict:
+    """resource_id -> client for a PodcastClient (one entry) or each resource of a pool."""
+    if hasattr(client, "resources"):
+        return {resource_id(state.client): state.client for state in client.resources}
+    return {resource_id(client): client}
+
+
+def file_digest(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(DIGEST_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def content_digest(content_file_azure_blob_url: str = None,
+                   content_file_path: str = None,
+                   content_file_temp_file_id: str = None,
+                   content_sha256: str = None) -> str:
+    """
+    Identify the content of a generation: the blob URL without its (SAS)
+    query, the sha256 of a local file (or ``content_sha256``, the already
+    computed hash of its bytes), or the temp file id.
+    """
+    if content_file_azure_blob_url is not None:
+        parts = urlsplit(str(content_file_azure_blob_url))
+        return "url:" + urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, "", ""))
+    if content_file_path is not None:
+        return "sha256:" + file_digest(content_file_path)
+    if content_sha256 is not None:
+        return "sha256:" + content_sha256
+    if content_file_temp_file_id is not None:
+        return "tempfile:" + content_file_temp_file_id
+    raise ValueError("At least one content source must be provided")
+
+
+def _normalize(value):
+    if isinstance(value, enum.Enum):
+        value = value.value
+    if isinstance(value, dict):
+        normalized = {k: _normalize(v) for k, v in value.items()}
+        return {k: v for k, v in normalized.items() if v is not None and v != {}}
+    if isinstance(value, str):
+        return value.strip() or None
+    return value
+
+
+def result_cache_key(definition: PodcastGenerationDefinition, digest: str) -> str:
+    """Hash of the normalized generation settings of ``definition`` plus the content digest."""
+    fields = dataclasses.asdict(definition)
+    settings = _normalize({name: fields[name] for name in KEY_FIELDS})
+    if "locale" in settings:
+        settings["locale"] = str(settings["locale"]).lower()
+    payload = orjson.dumps({"definition": settings, "content": digest}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+@dataclass
+class CachedResult:
+    key: str
+    generation_id: str
+    resource: str = None
+    audio_file: str = None
+    created: float = None
+
+
+class ResultCache:
+    """
+    Maps generation settings plus content digest to the succeeded generation
+    and, once downloaded, its local audio file, so identical requests can
+    reuse it instead of generating again. Each entry records the Speech
+    resource (see resource_id) that owns the generation: a client only gets
+    hits from its own resources, and only a 404 from the owner drops one.
+
+    Entries are stored in SQLite (shared by processes using the same file),
+    expire ``ttl_seconds`` after they were written, and the least recently
+    used are evicted beyond ``max_entries``. Audio files are only referenced,
+    never deleted by the cache.
+    """
+
+    def __init__(self,
+                 database_path: str = None,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.database_path = database_path or default_database_path()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.database_path)), exist_ok=True)
+        connection = self._connection()
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(results)")]
+        if columns and "resource" not in columns:
+            # Entries written before results recorded their resource cannot be checked against it.
+            connection.execute("DROP TABLE results")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT NOT NULL, resource TEXT NOT NULL, generation_id TEXT NOT NULL, audio_file TEXT, "
+            "created REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (key, resource))")
+        connection.execute("CREATE INDEX IF NOT EXISTS results_generation ON results (generation_id)")
+
+    def _connection(self) -> "sqlite3.Connection":
+        # sqlite3 connections must stay on the thread that created them;
+        # imported here so loading PodcastClient does not load sqlite3.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            import sqlite3
+            connection = sqlite3.connect(
+                self.database_path, timeout=DATABASE_TIMEOUT_SECONDS, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, resources: Iterable[str]) -> CachedResult:
+        """Return the newest unexpired entry for ``key`` on one of ``resources`` (marking it used), or None."""
+        connection = self._connection()
+        now = time.time()
+        resources = list(resources)
+        placeholders = ", ".join("?" * len(resources))
+        row = connection.execute(
+            f"SELECT resource, generation_id, audio_file, created FROM results "
+            f"WHERE key = ? AND resource IN ({placeholders}) ORDER BY created DESC LIMIT 1",
+            (key, *resources)).fetchone()
+        if row is None:
+            return None
+        if now - row[3] > self.ttl_seconds:
+            connection.execute("DELETE FROM results WHERE key = ? AND resource = ?", (key, row[0]))
+            return None
+        connection.execute("UPDATE results SET last_used = ? WHERE key = ? AND resource = ?", (now, key, row[0]))
+        return CachedResult(key=key, generation_id=row[1], resource=row[0], audio_file=row[2], created=row[3])
+
+    def put(self, client, key: str, generation_id: str, audio_file: str = None) -> None:
+        """
+        Record a succeeded generation of ``client`` (a PodcastClient, or a pool
+        that knows which resource owns it); a known generation keeps its audio
+        file unless a new one is given.
+        """
+        if hasattr(client, "resources"):
+            state = client.owner(generation_id)
+            if state is None:
+                logger.warning("Not caching generation %s: no resource owns it", generation_id)
+                return
+            client = state.client
+        resource = resource_id(client)
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT generation_id, audio_file, created FROM results WHERE key = ? AND resource = ?",
+                (key, resource)).fetchone()
+            created = now
+            if row is not None and row[0] == generation_id:
+                audio_file = audio_file or row[1]
+                created = row[2]
+            connection.execute(
+                "INSERT OR REPLACE INTO results (key, resource, generation_id, audio_file, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, resource, generation_id, os.path.abspath(audio_file) if audio_file else None, created, now))
+            self._evict(connection, now)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _evict(self, connection: "sqlite3.Connection", now: float) -> None:
+        connection.execute("DELETE FROM results WHERE created < ?", (now - self.ttl_seconds,))
+        if self.max_entries is not None:
+            connection.execute(
+                "DELETE FROM results WHERE rowid NOT IN "
+                "(SELECT rowid FROM results ORDER BY last_used DESC LIMIT ?)", (self.max_entries,))
+
+    def invalidate(self, key: str, resource: str) -> None:
+        self._connection().execute("DELETE FROM results WHERE key = ? AND resource = ?", (key, resource))
+
+    def invalidate_generation(self, generation_id: str) -> int:
+        """Drop every entry pointing at ``generation_id``, e.g. after deleting it; returns the count."""
+        cursor = self._connection().execute("DELETE FROM results WHERE generation_id = ?", (generation_id,))
+        return cursor.rowcount
+
+    def audio_files(self, generation_id: str) -> list[str]:
+        """Local audio files recorded for ``generation_id``."""
+        rows = self._connection().execute(
+            "SELECT DISTINCT audio_file FROM results WHERE generation_id = ? AND audio_file IS NOT NULL",
+            (generation_id,))
+        return [row[0] for row in rows]
+
+    def stats(self) -> dict:
+        count, oldest = self._connection().execute("SELECT COUNT(*), MIN(created) FROM results").fetchone()
+        return {
+            "entries": count,
+            "oldest_age_seconds": round(time.time() - oldest, 3) if oldest is not None else None,
+            "database_path": self.database_path,
+        }
+
+    def find_generation(self, client, key: str) -> tuple[PodcastGenerationDefinition, str]:
+        """
+        Return (generation, audio_file) of a cache hit on one of ``client``'s
+        resources (a PodcastClient or pool) that still exists and succeeded,
+        checked with the client of the owning resource; stale entries are
+        dropped. Returns (None, None) on a miss.
+        """
+        clients = resource_clients(client)
+        cached = self.get(key, clients)
+        if cached is None:
+            return None, None
+        return self._verified(
+            cached, *clients[cached.resource].request_get_generation(cached.generation_id, use_cache=False))
+
+    async def find_generation_async(self, client, key: str) -> tuple[PodcastGenerationDefinition, str]:
+        """find_generation() checking the hit with an AsyncPodcastClient."""
+        cached = self.get(key, [resource_id(client)])
+        if cached is None:
+            return None, None
+        return self._verified(cached, *await client.request_get_generation(cached.generation_id, use_cache=False))
+
+    def _verified(self, cached: CachedResult, success: bool, error: str,
+                  generation: PodcastGenerationDefinition) -> tuple[PodcastGenerationDefinition, str]:
+        if not success:
+            logger.warning("Ignoring cached generation %s: %s", cached.generation_id, error)
+            return None, None
+        # The request went to the owning resource, bypassing the client's
+        # generation cache, so not found means deleted.
+        if generation is None or generation.status != OperationStatus.Succeeded:
+            self.invalidate(cached.key, cached.resource)
+            return None, None
+        audio_file = cached.audio_file if cached.audio_file and os.path.isfile(cached.audio_file) else None
+        logger.debug("Result cache hit: generation %s", generation.id)
+        return generation, audio_file
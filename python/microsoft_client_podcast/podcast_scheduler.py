@@ -0,0 +1,260 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from microsoft_speech_client_common.client_common_logging import (
+    get_logger
+)
+
+logger = get_logger(__name__)
+
+# Priority classes, highest first. Interactive requests (a user waiting in
+# the web UI) are always dispatched before bulk ones (batch rows).
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+TICKET_WAITING = "waiting"
+TICKET_RUNNING = "running"
+TICKET_DONE = "done"
+
+
+def parse_tenant_weights(spec: str) -> dict[str, float]:
+    """Parse ``tenant_a=2,tenant_b=0.5`` into fair-share weights per tenant."""
+    weights = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        tenant, _, weight = part.partition("=")
+        if not tenant or not weight:
+            raise ValueError(f"Invalid tenant weight '{part}', expected tenant=weight")
+        if float(weight) <= 0:
+            raise ValueError(f"Weight of tenant '{tenant}' must be positive")
+        weights[tenant.strip()] = float(weight)
+    return weights
+
+
+class Ticket:
+    """A generation's place in a GenerationScheduler; granted once it may be created."""
+
+    def __init__(self, scheduler: "GenerationScheduler", sequence: int, tenant: str, priority: str, item=None):
+        self.sequence = sequence
+        self.tenant = tenant
+        self.priority = priority
+        self.item = item
+        self.state = TICKET_WAITING
+        self.submitted = time.monotonic()
+        self.granted_at = None
+        self._scheduler = scheduler
+        self._granted = threading.Event()
+        self._callbacks = []
+
+    @property
+    def granted(self) -> bool:
+        return self._granted.is_set()
+
+    @property
+    def queue_seconds(self) -> float:
+        return (self.granted_at or time.monotonic()) - self.submitted
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the ticket is granted; returns False on timeout."""
+        return self._granted.wait(timeout)
+
+    async def wait_async(self) -> None:
+        """Wait for the grant without blocking the event loop."""
+        if self.granted:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake(_):
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        self.add_grant_callback(wake)
+        await future
+
+    def add_grant_callback(self, callback) -> None:
+        """Call ``callback(ticket)`` once granted (right away if it already is)."""
+        with self._scheduler._lock:
+            if not self.granted:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+
+class TenantState:
+    """Waiting tickets, in-flight count and fair-share position of one tenant."""
+
+    def __init__(self, name: str, weight: float, virtual_time: float):
+        self.name = name
+        self.weight = weight
+        self.virtual_time = virtual_time
+        self.queues: dict[str, deque[Ticket]] = {priority: deque() for priority in PRIORITIES}
+        self.in_flight = 0
+        self.dispatched = 0
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0 and self.waiting == 0
+
+
+class GenerationScheduler:
+    """
+    Decides which queued generation may be created next.
+
+    At most ``max_in_flight`` generations run at once. A free slot goes to
+    the highest priority class with an eligible ticket; within a class,
+    tenants (typically one per subscription key) share slots in proportion
+    to their weight (default 1): each dispatch advances the tenant's virtual
+    time by 1/weight, and the tenant with the lowest virtual time goes next,
+    so a tenant with 500 queued documents cannot starve one with 5. Tenants
+    becoming active start at the current minimum instead of banking credit
+    while idle. ``tenant_cap`` limits each tenant's generations in flight,
+    and ``reserved_slots`` keeps that many slots free of bulk work so
+    interactive requests do not wait for a bulk generation to finish.
+
+    Callers ``submit()`` a ticket, wait for it to be granted, and
+    ``release()`` it when the generation has terminated (or was abandoned).
+    """
+
+    def __init__(self,
+                 max_in_flight: int,
+                 tenant_cap: int = None,
+                 reserved_slots: int = 0,
+                 weights: dict[str, float] = None):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if tenant_cap is not None and tenant_cap < 1:
+            raise ValueError("tenant_cap must be at least 1")
+        if not 0 <= reserved_slots < max_in_flight:
+            raise ValueError("reserved_slots must be at least 0 and less than max_in_flight")
+        self.max_in_flight = max_in_flight
+        self.tenant_cap = tenant_cap
+        self.reserved_slots = reserved_slots
+        self.weights = dict(weights or {})
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._tenants: dict[str, TenantState] = {}
+        self._in_flight = 0
+        self._dispatched = 0
+        self._total_queue_seconds = 0.0
+
+    def submit(self, tenant: str, priority: str = PRIORITY_BULK, item=None) -> Ticket:
+        """Queue a generation of ``tenant``; the returned ticket may be granted immediately."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+        with self._lock:
+            ticket = Ticket(self, next(self._sequence), tenant, priority, item)
+            state = self._tenants.get(tenant)
+            if state is None:
+                start = min((t.virtual_time for t in self._tenants.values()), default=0.0)
+                state = self._tenants[tenant] = TenantState(tenant, self.weights.get(tenant, 1.0), start)
+            state.queues[priority].append(ticket)
+            granted = self._dispatch_locked()
+        self._notify(granted)
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """
+        Give back a granted ticket's slot, or withdraw a ticket still waiting.
+        Releasing a ticket more than once has no effect.
+        """
+        with self._lock:
+            if ticket.state == TICKET_DONE:
+                return
+            state = self._tenants[ticket.tenant]
+            if ticket.state == TICKET_WAITING:
+                state.queues[ticket.priority].remove(ticket)
+            else:
+                state.in_flight -= 1
+                self._in_flight -= 1
+            ticket.state = TICKET_DONE
+            if state.idle:
+                del self._tenants[ticket.tenant]
+            granted = self._dispatch_locked()
+        self._notify(granted)
+
+    def snapshot(self) -> dict:
+        """Slots in use, waiting tickets per priority and per-tenant queue state."""
+        now = time.monotonic()
+        with self._lock:
+            waiting = {priority: 0 for priority in PRIORITIES}
+            oldest = {priority: 0.0 for priority in PRIORITIES}
+            tenants = {}
+            for state in self._tenants.values():
+                for priority, q in state.queues.items():
+                    waiting[priority] += len(q)
+                    if q:
+                        oldest[priority] = max(oldest[priority], now - q[0].submitted)
+                tenants[state.name] = {
+                    "weight": state.weight,
+                    "in_flight": state.in_flight,
+                    "waiting": {priority: len(q) for priority, q in state.queues.items()},
+                    "dispatched": state.dispatched,
+                }
+            return {
+                "max_in_flight": self.max_in_flight,
+                "tenant_cap": self.tenant_cap,
+                "reserved_slots": self.reserved_slots,
+                "in_flight": self._in_flight,
+                "waiting": waiting,
+                "oldest_wait_seconds": {priority: round(seconds, 3) for priority, seconds in oldest.items()},
+                "dispatched": self._dispatched,
+                "avg_queue_seconds": round(self._total_queue_seconds / self._dispatched, 3) if self._dispatched else 0.0,
+                "tenants": tenants,
+            }
+
+    def _dispatch_locked(self) -> list[Ticket]:
+        granted = []
+        while self._in_flight < self.max_in_flight:
+            ticket = self._next_locked()
+            if ticket is None:
+                break
+            state = self._tenants[ticket.tenant]
+            state.queues[ticket.priority].popleft()
+            state.in_flight += 1
+            state.dispatched += 1
+            state.virtual_time += 1.0 / state.weight
+            self._in_flight += 1
+            self._dispatched += 1
+            ticket.state = TICKET_RUNNING
+            ticket.granted_at = time.monotonic()
+            self._total_queue_seconds += ticket.queue_seconds
+            ticket._granted.set()
+            granted.append(ticket)
+        return granted
+
+    def _next_locked(self) -> Ticket:
+        for priority in PRIORITIES:
+            if priority != PRIORITY_INTERACTIVE and self._in_flight >= self.max_in_flight - self.reserved_slots:
+                continue
+            best = None
+            for state in self._tenants.values():
+                q = state.queues[priority]
+                if not q or (self.tenant_cap is not None and state.in_flight >= self.tenant_cap):
+                    continue
+                if best is None or (state.virtual_time, q[0].sequence) < (best.virtual_time, best.queues[priority][0].sequence):
+                    best = state
+            if best is not None:
+                return best.queues[priority][0]
+        return None
+
+    @staticmethod
+    def _notify(granted: list[Ticket]) -> None:
+        # Callbacks run outside the lock so they may submit or release tickets.
+        for ticket in granted:
+            logger.debug("Granted %s ticket of tenant %s after %.3fs", ticket.priority, ticket.tenant,
+                         ticket.queue_seconds)
+            callbacks, ticket._callbacks = ticket._callbacks, []
+            for callback in callbacks:
+                callback(ticket)
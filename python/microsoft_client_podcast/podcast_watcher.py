@@ -0,0 +1,248 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import threading
+import time
+from http import HTTPStatus
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable
+from microsoft_speech_client_common.client_common_enum import (
+    OperationStatus
+)
+from microsoft_speech_client_common.client_common_logging import (
+    get_logger
+)
+from microsoft_client_podcast.podcast_mirror import (
+    parse_timestamp
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_MIN_INTERVAL_SECONDS = 2.0
+DEFAULT_MAX_INTERVAL_SECONDS = 30.0
+# An unchanged generation is polled this much less often each time, down to
+# the maximum interval; any change resets it to the minimum.
+INTERVAL_BACKOFF = 1.5
+DEFAULT_WORKERS = 8
+LIST_PAGE_SIZE = 100
+
+# Status of watched generations the service no longer has.
+STATUS_NOT_FOUND = "NotFound"
+# Status of watched generations given up on: their GET kept failing, or failed
+# in a way retrying cannot fix.
+STATUS_ERROR = "Error"
+TERMINAL_STATUSES = (OperationStatus.Succeeded.value, OperationStatus.Failed.value, OperationStatus.Canceled.value,
+                     STATUS_NOT_FOUND, STATUS_ERROR)
+# Each failed GET was already retried by the client; give up after this many in a row.
+DEFAULT_MAX_FAILURES = 5
+# A failed GET is reported by its HTTP reason phrase; the client does not retry these.
+NON_RETRYABLE_ERRORS = tuple(HTTPStatus(code).phrase for code in (400, 401, 403, 409))
+
+
+@dataclass
+class WatchedGeneration:
+    id: str
+    status: str = None
+    created: float = None
+    last_action: float = None
+    failure_reason: str = None
+    error: str = None
+    # Failed polls since the last successful one
+    failures: int = 0
+    polls: int = 0
+    interval: float = DEFAULT_MIN_INTERVAL_SECONDS
+    next_poll: float = 0.0
+    # Wall clock time the watch started or the status last changed
+    changed: float = None
+
+    @property
+    def terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def elapsed(self, now: float) -> float:
+        """Seconds since creation (or since watching began), up to the last action once terminal."""
+        start = self.created if self.created is not None else self.changed
+        end = self.last_action if self.terminal and self.last_action is not None else now
+        return max(end - start, 0.0)
+
+
+class GenerationWatcher:
+    """
+    Follows many generations with one poller until all are terminal.
+
+    Each generation has its own poll interval, starting at
+    ``min_interval_seconds`` and growing by INTERVAL_BACKOFF while its status
+    is unchanged, up to ``max_interval_seconds``. Every round polls the
+    generations that are due: one GET each when only a few are, or the
+    list API when more are due than the list pages the last scan needed,
+    since one page reports up to 100 generations. A scan stops once every
+    due generation was seen (or after as many pages as there were due
+    generations); the rest are fetched with GETs. Any watched generation
+    seen on a page is updated, due or not. A generation whose GET fails
+    ``max_failures`` times in a row, or with a client error such as 403,
+    gets the terminal status STATUS_ERROR.
+    """
+
+    def __init__(self,
+                 client,
+                 generation_ids: Iterable[str],
+                 min_interval_seconds: float = DEFAULT_MIN_INTERVAL_SECONDS,
+                 max_interval_seconds: float = DEFAULT_MAX_INTERVAL_SECONDS,
+                 workers: int = DEFAULT_WORKERS,
+                 max_failures: int = DEFAULT_MAX_FAILURES):
+        self.client = client
+        self.min_interval_seconds = min_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.workers = workers
+        self.max_failures = max_failures
+        now = time.time()
+        self.generations = {
+            generation_id: WatchedGeneration(id=generation_id, interval=min_interval_seconds, changed=now)
+            for generation_id in dict.fromkeys(generation_ids)}
+        self.requests = 0
+        self.list_scans = 0
+        self._list_cost = 1
+
+    def seed(self, items: Iterable[dict]) -> None:
+        """Record statuses already known from list API items, e.g. the listing that chose the ids."""
+        now = time.monotonic()
+        for item in items:
+            watched = self.generations.get(item.get("id"))
+            if watched is not None:
+                self._update(watched, item, now, due=False)
+
+    @property
+    def done(self) -> bool:
+        return all(watched.terminal for watched in self.generations.values())
+
+    def pending(self) -> list[WatchedGeneration]:
+        return [watched for watched in self.generations.values() if not watched.terminal]
+
+    def seconds_until_due(self) -> float:
+        pending = self.pending()
+        if not pending:
+            return 0.0
+        return max(min(watched.next_poll for watched in pending) - time.monotonic(), 0.0)
+
+    def poll_once(self) -> list[WatchedGeneration]:
+        """Poll the generations that are due; returns those whose status changed."""
+        now = time.monotonic()
+        due = [watched for watched in self.pending() if watched.next_poll <= now]
+        if not due:
+            return []
+        changed = []
+        remaining = due
+        if len(due) > self._list_cost:
+            remaining = self._scan_list(due, changed)
+        if remaining:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="watch") as executor:
+                results = list(executor.map(self._get_generation, [w.id for w in remaining]))
+            self.requests += len(remaining)
+            now = time.monotonic()
+            for watched, (success, error, generation) in zip(remaining, results):
+                if not success:
+                    if self._failed(watched, error, now):
+                        changed.append(watched)
+                    continue
+                item = {"status": STATUS_NOT_FOUND} if generation is None else {
+                    "status": generation.status,
+                    "createdDateTime": generation.createdDateTime,
+                    "lastActionDateTime": generation.lastActionDateTime,
+                    "failureReason": generation.failureReason,
+                }
+                if self._update(watched, item, now, due=True):
+                    changed.append(watched)
+        return changed
+
+    def _get_generation(self, generation_id: str):
+        try:
+            return self.client.request_get_generation(generation_id)
+        except Exception as ex:
+            return False, str(ex), None
+
+    def _failed(self, watched: WatchedGeneration, error: str, now: float) -> bool:
+        """Record a failed GET; returns True once the generation is given up on."""
+        watched.error = error
+        watched.failures += 1
+        if watched.failures >= self.max_failures or error in NON_RETRYABLE_ERRORS:
+            watched.status = STATUS_ERROR
+            watched.changed = time.time()
+            logger.warning("Giving up on generation %s after %d failed polls: %s",
+                           watched.id, watched.failures, error)
+            return True
+        self._schedule(watched, now, status_changed=False)
+        return False
+
+    def _scan_list(self, due: list[WatchedGeneration], changed: list[WatchedGeneration]) -> list[WatchedGeneration]:
+        wanted = {watched.id for watched in due}
+        pages = 0
+        self.list_scans += 1
+        for success, error, page in self.client.iter_generation_pages(maxPageSize=LIST_PAGE_SIZE):
+            pages += 1
+            self.requests += 1
+            if not success:
+                logger.warning("Listing generations failed, polling them one by one: %s", error)
+                break
+            now = time.monotonic()
+            for item in page.value:
+                watched = self.generations.get(item.get("id"))
+                if watched is None or watched.terminal:
+                    continue
+                if self._update(watched, item, now, due=watched.id in wanted):
+                    changed.append(watched)
+                wanted.discard(watched.id)
+            # Past this many pages, GETs for the rest are cheaper.
+            if not wanted or pages >= len(due):
+                break
+        self._list_cost = max(pages, 1)
+        return [watched for watched in due if watched.id in wanted]
+
+    def _update(self, watched: WatchedGeneration, item: dict, now: float, due: bool) -> bool:
+        status = item.get("status")
+        status = getattr(status, "value", status)
+        status_changed = status != watched.status
+        if status_changed:
+            watched.status = status
+            watched.changed = time.time()
+        watched.error = None
+        watched.failures = 0
+        watched.created = parse_timestamp(item.get("createdDateTime")) or watched.created
+        watched.last_action = parse_timestamp(item.get("lastActionDateTime")) or watched.last_action
+        watched.failure_reason = item.get("failureReason") or watched.failure_reason
+        if due or status_changed:
+            watched.polls += 1
+            self._schedule(watched, now, status_changed)
+        return status_changed
+
+    def _schedule(self, watched: WatchedGeneration, now: float, status_changed: bool) -> None:
+        if status_changed:
+            watched.interval = self.min_interval_seconds
+        else:
+            watched.interval = min(watched.interval * INTERVAL_BACKOFF, self.max_interval_seconds)
+        watched.next_poll = now + watched.interval
+
+    def run(self,
+            on_update: Callable[["GenerationWatcher", list[WatchedGeneration]], None] = None,
+            stop: threading.Event = None,
+            refresh_seconds: float = 1.0) -> bool:
+        """
+        Poll until every generation is terminal (returns True) or ``stop`` is
+        set (returns False). ``on_update(watcher, changed)`` is called after
+        each round and at least every ``refresh_seconds`` while waiting.
+        """
+        stop = stop or threading.Event()
+        while not self.done:
+            changed = self.poll_once()
+            if on_update is not None:
+                on_update(self, changed)
+            if self.done:
+                break
+            if stop.wait(min(self.seconds_until_due(), refresh_seconds)):
+                return False
+        return True
+
+    def snapshot(self) -> list[WatchedGeneration]:
+        """Watched generations, unfinished ones first, each group oldest first."""
+        return sorted(self.generations.values(),
+                      key=lambda watched: (watched.terminal, watched.created or float("inf"), watched.id))
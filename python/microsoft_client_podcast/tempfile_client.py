@@ -1,9 +1,8 @@
 # Copyright (c) Microsoft. All rights reserved.
 # Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
 
-import urllib3
 import os
-from termcolor import colored
+from typing import Iterator
 from urllib3.util import Url
 import uuid
 from microsoft_speech_client_common.client_common_client_base import (
@@ -12,10 +11,19 @@ from microsoft_speech_client_common.client_common_client_base import (
 from microsoft_speech_client_common.client_common_util import (
     dict_to_dataclass, append_url_args
 )
+from microsoft_speech_client_common.client_common_logging import (
+    get_logger
+)
+from microsoft_speech_client_common.client_common_profiling import (
+    PHASE_READ_CONTENT,
+    phase
+)
 from microsoft_client_podcast.podcast_dataclass import (
     TempFile, PagedTempFileDefinition
 )
 
+logger = get_logger(__name__)
+
 
 class TempFileClient(SpeechLongRunningTaskClientBase):
     """Client for managing temporary files in the Podcast API."""
@@ -23,13 +31,14 @@ class TempFileClient(SpeechLongRunningTaskClientBase):
     URL_PATH_ROOT = "podcast"
     URL_SEGMENT_NAME_TEMP_FILES = "tempfiles"
 
-    def __init__(self, region, sub_key, api_version):
+    def __init__(self, region, sub_key, api_version, pool_maxsize: int = None):
         super().__init__(
             region=region,
             sub_key=sub_key,
             api_version=api_version,
             service_url_segment_name=self.URL_PATH_ROOT,
-            long_running_tasks_url_segment_name=self.URL_SEGMENT_NAME_TEMP_FILES
+            long_running_tasks_url_segment_name=self.URL_SEGMENT_NAME_TEMP_FILES,
+            pool_maxsize=pool_maxsize
         )
 
     def build_temp_files_path(self) -> str:
@@ -84,7 +93,7 @@ class TempFileClient(SpeechLongRunningTaskClientBase):
         
         # Create multipart form data
         # Read file content as bytes
-        with open(file_path, 'rb') as f:
+        with phase(PHASE_READ_CONTENT), open(file_path, 'rb') as f:
             file_content = f.read()
         
         fields = {
@@ -93,8 +102,8 @@ class TempFileClient(SpeechLongRunningTaskClientBase):
         if expires_after_in_mins is not None:
             fields['expiresAfterInMins'] = str(expires_after_in_mins)
         
-        print(f"Uploading file to: {url}")
-        response = self.http.request(
+        logger.debug("Uploading file to: %s", url)
+        response = self.request(
             "POST",
             url.url,
             headers=headers,
@@ -129,20 +138,11 @@ class TempFileClient(SpeechLongRunningTaskClientBase):
         Returns:
             Tuple of (success, error_message, paged_temp_files)
         """
-        url = self.build_temp_files_url()
-        args = {}
-        if top is not None:
-            args["top"] = top
-        if skip is not None:
-            args["skip"] = skip
-        if max_page_size is not None:
-            args["maxPageSize"] = max_page_size
-        
-        url = append_url_args(url, args)
+        url = self.build_list_temp_files_url(top=top, skip=skip, max_page_size=max_page_size)
         headers = self.build_request_header()
         
-        print(f"Requesting http GET: {url}")
-        response = self.http.request("GET", url.url, headers=headers)
+        logger.debug("Requesting http GET: %s", url)
+        response = self.request("GET", url.url, headers=headers)
         
         if response.status != 200:
             error = response.data.decode('utf-8')
@@ -155,6 +155,48 @@ class TempFileClient(SpeechLongRunningTaskClientBase):
         )
         return True, None, paged_files
 
+    def build_list_temp_files_url(
+        self,
+        top: int = None,
+        skip: int = None,
+        max_page_size: int = None
+    ) -> Url:
+        """Build the URL for listing temp files with optional paging arguments."""
+        url = self.build_temp_files_url()
+        args = {}
+        if top is not None:
+            args["top"] = top
+        if skip is not None:
+            args["skip"] = skip
+        if max_page_size is not None:
+            args["maxPageSize"] = max_page_size
+        return append_url_args(url, args)
+
+    def iter_temp_file_pages(
+        self,
+        top: int = None,
+        skip: int = None,
+        max_page_size: int = None
+    ) -> Iterator[tuple[bool, str, PagedTempFileDefinition]]:
+        """
+        Yield every page of temp files, following nextLink.
+        
+        Args:
+            top: Maximum number of items to return
+            skip: Number of items to skip
+            max_page_size: Maximum page size
+            
+        Returns:
+            Iterator of (success, error_message, paged_temp_files); iteration
+            stops after the first failed page
+        """
+        url = self.build_list_temp_files_url(top=top, skip=skip, max_page_size=max_page_size)
+        for success, error, page_json in self.iter_list_pages(url):
+            if not success:
+                yield False, error, None
+                return
+            yield True, None, dict_to_dataclass(data=page_json, dataclass_type=PagedTempFileDefinition)
+
     def request_get_temp_file(
         self,
         file_id: str
@@ -174,8 +216,8 @@ class TempFileClient(SpeechLongRunningTaskClientBase):
         url = self.build_temp_file_url(file_id)
         headers = self.build_request_header()
         
-        print(f"Requesting http GET: {url}")
-        response = self.http.request("GET", url.url, headers=headers)
+        logger.debug("Requesting http GET: %s", url)
+        response = self.request("GET", url.url, headers=headers)
         
         if response.status == 200:
             response_json = response.json()
@@ -209,8 +251,8 @@ class TempFileClient(SpeechLongRunningTaskClientBase):
         url = self.build_temp_file_url(file_id)
         headers = self.build_request_header()
         
-        print(f"Requesting http DELETE: {url}")
-        response = self.http.request("DELETE", url.url, headers=headers)
+        logger.debug("Requesting http DELETE: %s", url)
+        response = self.request("DELETE", url.url, headers=headers)
         
         if response.status not in [204]:
             error = response.data.decode('utf-8')
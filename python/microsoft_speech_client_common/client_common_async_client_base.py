@@ -0,0 +1,331 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import asyncio
+import dataclasses
+import orjson
+import time
+import uuid
+import httpx
+import urllib3
+from urllib3.util import Url
+from microsoft_speech_client_common.client_common_const import (
+    HTTP_HEADERS_OPERATION_LOCATION
+)
+from microsoft_speech_client_common.client_common_enum import (
+    OperationStatus
+)
+from microsoft_speech_client_common.client_common_dataclass import (
+    OperationDefinition
+)
+from microsoft_speech_client_common.client_common_util import (
+    dict_to_dataclass,
+    append_url_args
+)
+from microsoft_speech_client_common.client_common_client_base import (
+    SpeechLongRunningTaskClientBase
+)
+from microsoft_speech_client_common.client_common_rate_limiter import (
+    operation_for
+)
+from microsoft_speech_client_common.client_common_instrumentation import (
+    RequestInfo,
+    call_hooks
+)
+from microsoft_speech_client_common.client_common_logging import (
+    get_logger
+)
+
+logger = get_logger(__name__)
+
+# Same policy as the synchronous client: retry everything except these.
+NON_RETRY_STATUSES = (200, 201, 204, 304, 400, 401, 403, 404, 409)
+MAX_RETRIES = 5
+RETRY_BACKOFF_SECONDS = 0.5
+
+
+class AsyncSpeechLongRunningTaskClientBase(SpeechLongRunningTaskClientBase):
+    """
+    Asyncio variant of SpeechLongRunningTaskClientBase built on httpx.
+
+    URL and header building is inherited; every ``request_*`` method is a
+    coroutine with the same arguments and return values as its synchronous
+    counterpart, so one event loop can drive many long-running tasks.
+    """
+
+    def __init__(self,
+                region: str,
+                sub_key: str,
+                api_version: str,
+                service_url_segment_name: str,
+                long_running_tasks_url_segment_name: str,
+                max_connections: int = 100):
+        super().__init__(
+            region=region,
+            sub_key=sub_key,
+            api_version=api_version,
+            service_url_segment_name=service_url_segment_name,
+            long_running_tasks_url_segment_name=long_running_tasks_url_segment_name)
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(10),
+            limits=httpx.Limits(max_connections=max_connections),
+            transport=httpx.AsyncHTTPTransport(retries=MAX_RETRIES))
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request, retrying transient status codes with exponential backoff,
+        and report it to the request hooks.
+        """
+        url = str(url)
+        route = self.build_route_template(url)
+        rate_limit_wait_seconds = 0.0
+        if self.rate_limiter is not None and url.startswith(self._service_root):
+            # Only the token bookkeeping blocks; the wait itself yields to the loop.
+            rate_limit_wait_seconds = self.rate_limiter.reserve(self.sub_key, operation_for(method, route))
+            if rate_limit_wait_seconds > 0:
+                await asyncio.sleep(rate_limit_wait_seconds)
+        info = RequestInfo(method=method, url=url, route=route, rate_limit_wait_seconds=rate_limit_wait_seconds)
+        hooks = self.request_hooks + self.global_request_hooks
+        call_hooks(hooks, "before_request", info)
+        connect_start = None
+
+        # httpcore trace events give us connect (TCP + TLS) time and TTFB.
+        async def trace(event_name: str, event_info: dict) -> None:
+            nonlocal connect_start
+            now = time.perf_counter()
+            if event_name == "connection.connect_tcp.started":
+                connect_start = now
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                if connect_start is not None:
+                    info.connect_seconds = now - connect_start
+            elif event_name.endswith("receive_response_headers.complete"):
+                info.ttfb_seconds = now - info.start
+
+        extensions = {**kwargs.pop("extensions", {}), "trace": trace}
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                response = await self.http.request(method, url, extensions=extensions, **kwargs)
+                info.status = response.status_code
+                info.retries = attempt
+                if response.status_code == 429:
+                    info.throttled += 1
+                info.bytes_out += len(response.request.content or b"")
+                info.bytes_in = len(response.content)
+                if response.status_code in NON_RETRY_STATUSES or attempt == MAX_RETRIES:
+                    return response
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
+            return response
+        except Exception as ex:
+            info.error = type(ex).__name__
+            raise
+        finally:
+            info.total_seconds = time.perf_counter() - info.start
+            call_hooks(hooks, "after_request", info)
+
+    async def request_create_long_running_task_until_terminated(
+            self,
+            id: str,
+            creation_body: dataclasses.dataclass,
+            operation_id: str = None,
+            ) -> tuple[bool, str, httpx.Response, Url]:
+        if id is None or creation_body is None:
+            raise ValueError
+
+        success, error, response, operation_location_url = await self.request_create_long_running_task_with_id(
+            id=id,
+            creation_body=creation_body,
+            operation_id=operation_id)
+        if not success or operation_location_url is None:
+            logger.error("Failed to create task with ID %s with error: %s", id, error)
+            return False, error, None, None
+
+        await self.request_operation_until_terminated(operation_location_url)
+        success, error, response = await self.request_get_long_running_task(id)
+        if not success:
+            logger.error("Failed to query task %s with error: %s", id, error)
+            return False, error, None, None
+        return True, None, response, operation_location_url
+
+    async def request_create_long_running_task_with_id(
+            self,
+            id: str,
+            creation_body: dataclasses.dataclass,
+            operation_id: str = None,
+            ) -> tuple[bool, str, httpx.Response, Url]:
+        if id is None or creation_body is None:
+            raise ValueError
+        url = self.build_long_running_task_url(id)
+        return await self.request_create_long_running_task_with_url(
+            url=url,
+            creation_body=creation_body,
+            operation_id=operation_id
+        )
+
+    async def request_create_long_running_task_with_url(
+            self,
+            url: Url,
+            creation_body: dataclasses.dataclass,
+            operation_id: str = None,
+            ) -> tuple[bool, str, httpx.Response, Url]:
+        if url is None or creation_body is None:
+            raise ValueError
+        encoded_creation_body = orjson.dumps(dataclasses.asdict(creation_body))
+
+        headers = self.build_request_header()
+        if operation_id is None:
+            operation_id = str(uuid.uuid4())
+        headers["Operation-Id"] = operation_id
+        headers["Content-Type"] = "application/json"
+
+        logger.debug("Requesting http PUT: %s", url)
+        response = await self.request("PUT", url.url, headers=headers, content=encoded_creation_body)
+
+        #   OK = 200,
+        #   Created = 201,
+        if response.status_code not in [200, 201]:
+            return False, response.text, None, None
+        operation_location = response.headers[HTTP_HEADERS_OPERATION_LOCATION]
+        operation_location_url = urllib3.util.parse_url(operation_location)
+        return True, None, response, operation_location_url
+
+    async def request_list_long_running_tasks(self,
+                                  top: int = None,
+                                  skip: int = None,
+                                  maxPageSize: int = None) -> tuple[bool, str, httpx.Response]:
+        url = self.build_long_running_tasks_url()
+        args = {}
+        if top is not None:
+            args["top"] = top
+        if skip is not None:
+            args["skip"] = skip
+        if maxPageSize is not None:
+            args["maxPageSize"] = maxPageSize
+
+        url = append_url_args(url, args)
+        return await self.request_list_with_url(url)
+
+    async def request_list_with_url(self,
+                              url: Url) -> tuple[bool, str, httpx.Response]:
+        headers = self.build_request_header()
+
+        logger.debug("Requesting http GET: %s", url)
+        response = await self.request("GET", url.url, headers=headers)
+
+        #   OK = 200,
+        if response.status_code not in [200]:
+            return False, response.text, None
+        return True, None, response
+
+    async def request_get_long_running_task(self,
+                                     id: str,
+                                     etag: str = None) -> tuple[bool, str, httpx.Response]:
+        if id is None:
+            raise ValueError
+
+        url = self.build_long_running_task_url(id)
+        return await self.request_get_with_url(url, etag=etag)
+
+    async def request_get_with_url(self,
+                            url: Url,
+                            etag: str = None) -> tuple[bool, str, httpx.Response]:
+        """
+        GET a resource; the response is None if it does not exist. With an
+        ``etag`` the request is conditional and a 304 response is returned
+        as is when the resource has not changed.
+        """
+        if url is None:
+            raise ValueError
+
+        headers = self.build_request_header()
+        if etag is not None:
+            headers["If-None-Match"] = etag
+
+        logger.debug("Requesting http GET: %s", url)
+        response = await self.request("GET", url.url, headers=headers)
+
+        #   OK = 200,
+        #   NotModified = 304,
+        #   NotFound = 404,
+        if response.status_code == 200 or (response.status_code == 304 and etag is not None):
+            return True, None, response
+        elif response.status_code == 404:
+            return True, None, None
+
+        return False, response.reason_phrase, None
+
+    async def request_get_operation(
+        self,
+        operation_location: Url,
+        print_url: bool = False
+    ) -> tuple[bool, str, OperationDefinition]:
+        if operation_location is None:
+            raise ValueError("Operation location is required")
+
+        headers = self.build_request_header()
+
+        if print_url:
+            logger.debug("Requesting http GET: %s", operation_location)
+
+        response = await self.request("GET", operation_location.url, headers=headers)
+
+        #   OK = 200
+        #   NotFound = 404
+        if response.status_code == 200:
+            operation = dict_to_dataclass(
+                data=response.json(),
+                dataclass_type=OperationDefinition
+            )
+            return True, None, operation
+        elif response.status_code == 404:
+            return True, None, None
+
+        return False, response.reason_phrase, None
+
+    async def request_delete_long_running_task(self,
+                                         id: str) -> tuple[bool, str]:
+        url = self.build_long_running_task_url(id)
+        headers = self.build_request_header()
+
+        logger.debug("Requesting http DELETE: %s", url)
+        response = await self.request("DELETE", url.url, headers=headers)
+
+        #   NoContent = 204,
+        if response.status_code not in [204]:
+            return False, response.text
+        return True, None
+
+    async def request_operation_until_terminated(
+        self,
+        operation_location: Url,
+        poll_interval_seconds: int = 5
+    ) -> OperationStatus:
+        """Poll a long-running operation until it reaches a terminal state without blocking the loop."""
+        if operation_location is None:
+            raise ValueError("Operation location is required")
+
+        success, error, response_operation = await self.request_get_operation(
+            operation_location=operation_location,
+            print_url=True
+        )
+        while success and response_operation is not None and \
+                response_operation.status in [OperationStatus.Running, OperationStatus.NotStarted]:
+            await asyncio.sleep(poll_interval_seconds)
+            success, error, response_operation = await self.request_get_operation(
+                operation_location=operation_location,
+                print_url=False
+            )
+
+        if not success or response_operation is None:
+            logger.error("Failed to query operation from location %s with error: %s", operation_location, error)
+            return None
+        return response_operation.status
+
@@ -6,8 +6,8 @@ import orjson
 import urllib3
 import uuid
 import time
-from termcolor import colored
 from urllib3.util import Url
+from typing import Iterator
 from urllib3 import HTTPResponse
 from microsoft_speech_client_common.client_common_const import (
     HTTP_HEADERS_OPERATION_LOCATION
@@ -22,6 +22,27 @@ from microsoft_speech_client_common.client_common_util import (
     dict_to_dataclass,
     append_url_args
 )
+from microsoft_speech_client_common.client_common_logging import (
+    get_logger
+)
+from microsoft_speech_client_common.client_common_profiling import (
+    PHASE_DECODE_RESPONSE,
+    PHASE_WAIT_FOR_SERVICE,
+    phase
+)
+from microsoft_speech_client_common.client_common_rate_limiter import (
+    operation_for
+)
+from microsoft_speech_client_common.client_common_instrumentation import (
+    RequestInfo,
+    SpanRecorder,
+    call_hooks,
+    instrument_pool_manager,
+    route_template,
+    set_current_request
+)
+
+logger = get_logger(__name__)
 
 
 class SpeechLongRunningTaskClientBase:
@@ -34,12 +55,19 @@ class SpeechLongRunningTaskClientBase:
     long_running_tasks_url_segment_name = ""
     http = None
 
+    # RequestHook instances notified for the requests of every client (e.g.
+    # process-wide metrics). Hooks run on the requesting thread and must not raise.
+    global_request_hooks: list = []
+    # RateLimiter consulted before each request to the service (None: unlimited).
+    rate_limiter = None
+
     def __init__(self,
                 region: str,
                 sub_key: str,
                 api_version: str,
                 service_url_segment_name: str,
-                long_running_tasks_url_segment_name: str):
+                long_running_tasks_url_segment_name: str,
+                pool_maxsize: int = None):
         """
         Initialize the base client with common configuration.
         
@@ -47,6 +75,8 @@ class SpeechLongRunningTaskClientBase:
             region: Azure region for the service
             sub_key: Subscription key for authentication
             api_version: API version to use
+            pool_maxsize: Connections kept per host; set to the number of
+                threads sharing this client (default: urllib3's 1)
         """
         if region is None or sub_key is None:
             raise ValueError("Region and subscription key are required")
@@ -61,11 +91,12 @@ class SpeechLongRunningTaskClientBase:
         self.long_running_tasks_url_segment_name = long_running_tasks_url_segment_name
 
         # Configure retry logic for transient failures
-        # Not retrying for: 200, 201, 204, 400, 401, 403, 404, 409
+        # Not retrying for: 200, 201, 204, 304, 400, 401, 403, 404, 409
         # not retry for below response code:
         #   OK = 200,
         #   Created = 201,
         #   NoContent = 204,
+        #   NotModified = 304,
         #   BadRequest = 400,
         #   Unauthorized = 401,
         #   Forbidden = 403,
@@ -73,11 +104,79 @@ class SpeechLongRunningTaskClientBase:
         #   Conflict = 409,
         status_forcelist = tuple(
             set(x for x in range(100, 600))
-            - set([200, 201, 204, 400, 401, 403, 404, 409])
+            - set([200, 201, 204, 304, 400, 401, 403, 404, 409])
         )
         retries = urllib3.Retry(total=5, status_forcelist=status_forcelist)
         timeout = urllib3.util.Timeout(10)
-        self.http = urllib3.PoolManager(timeout=timeout, retries=retries)
+        pool_kw = {} if pool_maxsize is None else {"maxsize": pool_maxsize}
+        self.http = urllib3.PoolManager(timeout=timeout, retries=retries, **pool_kw)
+        instrument_pool_manager(self.http)
+
+        self._service_root = str(self.root_url())
+
+        # Per-client hooks; the span recorder backs stats()
+        self.span_recorder = SpanRecorder()
+        self.request_hooks = [self.span_recorder]
+
+    @classmethod
+    def add_global_request_hook(cls, hook) -> None:
+        """Register a RequestHook for the requests of every client."""
+        if hook not in cls.global_request_hooks:
+            cls.global_request_hooks.append(hook)
+
+    @classmethod
+    def remove_global_request_hook(cls, hook) -> None:
+        if hook in cls.global_request_hooks:
+            cls.global_request_hooks.remove(hook)
+
+    @classmethod
+    def set_rate_limiter(cls, rate_limiter) -> None:
+        """Limit the requests of every client (of this class) with a RateLimiter, or None."""
+        cls.rate_limiter = rate_limiter
+
+    def wait_for_rate_limit(self, method: str, url: str, route: str) -> float:
+        """Block until the rate limiter allows this request; returns the seconds waited."""
+        if self.rate_limiter is None or not url.startswith(self._service_root):
+            return 0.0
+        return self.rate_limiter.acquire(self.sub_key, operation_for(method, route))
+
+    def add_request_hook(self, hook) -> None:
+        """Register a RequestHook for this client's requests."""
+        self.request_hooks.append(hook)
+
+    def stats(self) -> dict[str, dict]:
+        """Per-route request counts and p50/p95/p99 timings of recent requests."""
+        return self.span_recorder.stats()
+
+    def build_route_template(self, url: str) -> str:
+        return route_template(url, (self.long_running_tasks_url_segment_name,))
+
+    def request(self, method: str, url: str, **kwargs) -> HTTPResponse:
+        """Send a request through the pool, reporting it to the request hooks."""
+        route = self.build_route_template(url)
+        rate_limit_wait_seconds = self.wait_for_rate_limit(method, url, route)
+        info = RequestInfo(method=method, url=url, route=route, rate_limit_wait_seconds=rate_limit_wait_seconds)
+        hooks = self.request_hooks + self.global_request_hooks
+        call_hooks(hooks, "before_request", info)
+        set_current_request(info)
+        try:
+            response = self.http.request(method, url, **kwargs)
+            info.status = response.status
+            if response.retries is not None:
+                info.retries = len(response.retries.history)
+                info.throttled = sum(1 for attempt in response.retries.history if attempt.status == 429)
+            if response.status == 429:
+                info.throttled += 1
+            if kwargs.get("preload_content", True):
+                info.bytes_in = len(response.data or b"")
+            return response
+        except Exception as ex:
+            info.error = type(ex).__name__
+            raise
+        finally:
+            set_current_request(None)
+            info.total_seconds = time.perf_counter() - info.start
+            call_hooks(hooks, "after_request", info)
 
     def build_url(self,
                   segments: str) -> Url:
@@ -148,13 +247,13 @@ class SpeechLongRunningTaskClientBase:
             return False, error, None, None
         
         if not success or operation_location_url is None:
-            print(colored(f"Failed to create task with ID {operation_location_url} with error: {error}", 'red'))
+            logger.error("Failed to create task with ID %s with error: %s", id, error)
             return False, error, None, None
 
         self.request_operation_until_terminated(operation_location_url)
         success, error, response = self.request_get_long_running_task(id)
         if not success:
-            print(colored(f"Failed to query task {id} with error: {error}", 'red'))
+            logger.error("Failed to query task %s with error: %s", id, error)
             return False, error, None, None
         return True, None, response, operation_location_url
 
@@ -189,8 +288,8 @@ class SpeechLongRunningTaskClientBase:
         headers["Operation-Id"] = operation_id
         headers["Content-Type"] = "application/json"
 
-        print(f"Requesting http PUT: {url}")
-        response = self.http.request("PUT", url.url, headers=headers, body=encoded_creation_body)
+        logger.debug("Requesting http PUT: %s", url)
+        response = self.request("PUT", url.url, headers=headers, body=encoded_creation_body)
 
         #   OK = 200,
         #   Created = 201,
@@ -205,7 +304,13 @@ class SpeechLongRunningTaskClientBase:
                                   top: int = None,
                                   skip: int = None,
                                   maxPageSize: int = None) -> tuple[bool, str, HTTPResponse]:
+        url = self.build_list_long_running_tasks_url(top=top, skip=skip, maxPageSize=maxPageSize)
+        return self.request_list_with_url(url)
 
+    def build_list_long_running_tasks_url(self,
+                                          top: int = None,
+                                          skip: int = None,
+                                          maxPageSize: int = None) -> Url:
         url = self.build_long_running_tasks_url()
         args = {}
         if top is not None:
@@ -214,16 +319,14 @@ class SpeechLongRunningTaskClientBase:
             args["skip"] = skip
         if maxPageSize is not None:
             args["maxPageSize"] = maxPageSize
-
-        url = append_url_args(url, args)
-        return self.request_list_with_url(url)
+        return append_url_args(url, args)
 
     def request_list_with_url(self,
                               url: Url) -> tuple[bool, str, HTTPResponse]:
         headers = self.build_request_header()
 
-        print(f"Requesting http GET: {url}")
-        response = self.http.request("GET", url.url, headers=headers)
+        logger.debug("Requesting http GET: %s", url)
+        response = self.request("GET", url.url, headers=headers)
 
         #   OK = 200,
         if response.status not in [200]:
@@ -231,27 +334,55 @@ class SpeechLongRunningTaskClientBase:
             return False, error, None
         return True, None, response
 
+    def iter_list_pages(self,
+                        url: Url) -> Iterator[tuple[bool, str, dict]]:
+        """
+        Yield (success, error, page json) for each page of a list API,
+        following nextLink. Only one page is held at a time; iteration ends
+        after the last page or the first failed one.
+        """
+        while url is not None:
+            success, error, response = self.request_list_with_url(url)
+            if not success:
+                yield False, error, None
+                return
+            with phase(PHASE_DECODE_RESPONSE):
+                page = orjson.loads(response.data)
+            next_link = page.get("nextLink")
+            url = urllib3.util.parse_url(next_link) if next_link else None
+            yield True, None, page
+
     def request_get_long_running_task(self,
-                                     id: str) -> tuple[bool, str, HTTPResponse]:
+                                     id: str,
+                                     etag: str = None) -> tuple[bool, str, HTTPResponse]:
         if id is None:
             raise ValueError
 
         url = self.build_long_running_task_url(id)
-        return self.request_get_with_url(url)
+        return self.request_get_with_url(url, etag=etag)
 
     def request_get_with_url(self,
-                            url: Url) -> tuple[bool, str, HTTPResponse]:
+                            url: Url,
+                            etag: str = None) -> tuple[bool, str, HTTPResponse]:
+        """
+        GET a resource; the response is None if it does not exist. With an
+        ``etag`` the request is conditional and a 304 response is returned
+        as is when the resource has not changed.
+        """
         if url is None:
             raise ValueError
 
         headers = self.build_request_header()
+        if etag is not None:
+            headers["If-None-Match"] = etag
 
-        print(f"Requesting http GET: {url}")
-        response = self.http.request("GET", url.url, headers=headers)
+        logger.debug("Requesting http GET: %s", url)
+        response = self.request("GET", url.url, headers=headers)
 
         #   OK = 200,
+        #   NotModified = 304,
         #   NotFound = 404,
-        if response.status == 200:
+        if response.status == 200 or (response.status == 304 and etag is not None):
             return True, None, response
         elif response.status == 404:
             return True, None, None
@@ -269,7 +400,7 @@ class SpeechLongRunningTaskClientBase:
         
         Args:
             operation_location: URL of the operation to query
-            print_url: Whether to print the URL being requested
+            print_url: Whether to log the URL being requested (debug level)
             
         Returns:
             Tuple of (success, error_message, operation_definition)
@@ -280,9 +411,9 @@ class SpeechLongRunningTaskClientBase:
         headers = self.build_request_header()
 
         if print_url:
-            print(f"Requesting http GET: {operation_location}")
+            logger.debug("Requesting http GET: %s", operation_location)
         
-        response = self.http.request("GET", operation_location.url, headers=headers)
+        response = self.request("GET", operation_location.url, headers=headers)
 
         #   OK = 200
         #   NotFound = 404
@@ -303,8 +434,8 @@ class SpeechLongRunningTaskClientBase:
         url = self.build_long_running_task_url(id)
         headers = self.build_request_header()
 
-        print(f"Requesting http DELETE: {url}")
-        response = self.http.request("DELETE", url.url, headers=headers)
+        logger.debug("Requesting http DELETE: %s", url)
+        response = self.request("DELETE", url.url, headers=headers)
 
         #   NoContent = 204,
         if response.status not in [204]:
@@ -330,38 +461,34 @@ class SpeechLongRunningTaskClientBase:
         if operation_location is None:
             raise ValueError("Operation location is required")
 
-        success, error, response_operation = self.request_get_operation(
-            operation_location=operation_location,
-            print_url=True
-        )
-        
-        if not success or response_operation is None:
-            print(colored(
-                f"Failed to query operation from location {operation_location} with error: {error}",
-                'red'
-            ))
-            return None
-
-        last_status = None
-        while response_operation.status in [OperationStatus.Running, OperationStatus.NotStarted]:
+        with phase(PHASE_WAIT_FOR_SERVICE):
             success, error, response_operation = self.request_get_operation(
                 operation_location=operation_location,
-                print_url=False
+                print_url=True
             )
-            
+        
             if not success or response_operation is None:
-                print(colored(
-                    f"Failed to query operation from location {operation_location} with error: {error}",
-                    'red'
-                ))
+                logger.error("Failed to query operation from location %s with error: %s", operation_location, error)
                 return None
+
+            last_status = None
+            while response_operation.status in [OperationStatus.Running, OperationStatus.NotStarted]:
+                success, error, response_operation = self.request_get_operation(
+                    operation_location=operation_location,
+                    print_url=False
+                )
             
-            if last_status != response_operation.status:
-                print(response_operation.status)
-                last_status = response_operation.status
+                if not success or response_operation is None:
+                    logger.error("Failed to query operation from location %s with error: %s", operation_location, error)
+                    return None
             
-            print(".", end="", flush=True)
-            time.sleep(poll_interval_seconds)
+                if last_status != response_operation.status:
+                    logger.info("Operation status: %s", response_operation.status,
+                                extra={"operation_location": str(operation_location)})
+                    last_status = response_operation.status
+
+                logger.debug("Operation still %s, polling again in %s seconds",
+                             response_operation.status, poll_interval_seconds)
+                time.sleep(poll_interval_seconds)
 
-        print()  # New line after polling dots
-        return response_operation.status
\ No newline at end of file
+            return response_operation.status
@@ -0,0 +1,180 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Collection segments whose following path segment is a resource id.
+ID_COLLECTION_SEGMENTS = ("operations",)
+ROUTE_ID_PLACEHOLDER = "{id}"
+DEFAULT_SPAN_CAPACITY = 10000
+
+
+@dataclass
+class RequestInfo:
+    """
+    One HTTP request as seen by the request hooks.
+
+    Timings are in seconds from the start of the request (including retries).
+    ``connect_seconds`` is None when a pooled connection was reused, and
+    ``status`` is None when no response was received. ``throttled`` counts
+    429 responses, including retried ones. ``rate_limit_wait_seconds`` is
+    the time spent waiting for the rate limiter before the request started.
+    """
+    method: str
+    url: str
+    route: str
+    start: float = field(default_factory=time.perf_counter)
+    status: int = None
+    bytes_out: int = 0
+    bytes_in: int = 0
+    retries: int = 0
+    throttled: int = 0
+    rate_limit_wait_seconds: float = 0.0
+    connect_seconds: float = None
+    ttfb_seconds: float = None
+    total_seconds: float = None
+    error: str = None
+
+
+class RequestHook:
+    """Base class for request hooks; override either method."""
+
+    def before_request(self, info: RequestInfo) -> None:
+        pass
+
+    def after_request(self, info: RequestInfo) -> None:
+        pass
+
+
+def route_template(url: str, collections: tuple[str, ...] = ()) -> str:
+    """
+    Return the URL path with resource ids replaced by ``{id}``, e.g.
+    ``podcast/generations/{id}``, so requests can be grouped per route.
+    """
+    segments = urlsplit(url).path.strip("/").split("/")
+    id_collections = set(collections) | set(ID_COLLECTION_SEGMENTS)
+    for i in range(1, len(segments)):
+        if segments[i - 1] in id_collections:
+            segments[i] = ROUTE_ID_PLACEHOLDER
+    return "/".join(segments)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class SpanRecorder(RequestHook):
+    """Keeps the most recent requests in memory and summarizes them per route."""
+
+    def __init__(self, capacity: int = DEFAULT_SPAN_CAPACITY):
+        self._lock = threading.Lock()
+        self.spans: deque[RequestInfo] = deque(maxlen=capacity)
+
+    def after_request(self, info: RequestInfo) -> None:
+        with self._lock:
+            self.spans.append(info)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Return ``{"METHOD route": summary}`` where summary holds count, errors,
+        retries, bytes in/out and p50/p95/p99 of total, TTFB and connect time.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        by_route: dict[str, list[RequestInfo]] = {}
+        for span in spans:
+            by_route.setdefault(f"{span.method} {span.route}", []).append(span)
+
+        summary = {}
+        for key, route_spans in sorted(by_route.items()):
+            route_stats = {
+                "count": len(route_spans),
+                "errors": sum(1 for s in route_spans if s.status is None or s.status >= 400),
+                "retries": sum(s.retries for s in route_spans),
+                "bytes_out": sum(s.bytes_out for s in route_spans),
+                "bytes_in": sum(s.bytes_in for s in route_spans),
+            }
+            for name in ("total", "ttfb", "connect"):
+                values = sorted(
+                    getattr(s, f"{name}_seconds") for s in route_spans
+                    if getattr(s, f"{name}_seconds") is not None)
+                for pct in (50, 95, 99):
+                    route_stats[f"{name}_p{pct}"] = percentile(values, pct) if values else None
+            summary[key] = route_stats
+        return summary
+
+
+# The request currently being sent on this thread, for the timed connections.
+_current = threading.local()
+
+
+def set_current_request(info: RequestInfo | None) -> None:
+    _current.info = info
+
+
+class _TimedConnectionMixin:
+    """Records connect time, TTFB and bytes sent into the current RequestInfo."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            info = getattr(_current, "info", None)
+            if info is not None:
+                info.connect_seconds = (info.connect_seconds or 0) + time.perf_counter() - start
+
+    def request(self, method, url, body=None, headers=None, **kwargs):
+        info = getattr(_current, "info", None)
+        if info is not None and isinstance(body, (bytes, bytearray, str)):
+            info.bytes_out += len(body)
+        return super().request(method, url, body=body, headers=headers, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        info = getattr(_current, "info", None)
+        if info is not None:
+            info.ttfb_seconds = time.perf_counter() - info.start
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def instrument_pool_manager(pool_manager) -> None:
+    """Make a urllib3 PoolManager create connections that report their timings."""
+    pool_manager.pool_classes_by_scheme = {
+        "http": TimedHTTPConnectionPool,
+        "https": TimedHTTPSConnectionPool,
+    }
+
+
+def call_hooks(hooks, method_name: str, info: RequestInfo) -> None:
+    for hook in hooks:
+        getattr(hook, method_name)(info)
@@ -0,0 +1,98 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import orjson
+from termcolor import colored
+
+# Top-level loggers of the client libraries. Library code never configures
+# handlers beyond a NullHandler, so it stays silent unless an application
+# calls configure_logging() (or sets up logging itself).
+LIBRARY_LOGGER_NAMES = ("microsoft_speech_client_common", "microsoft_client_podcast")
+
+LEVEL_COLORS = {
+    logging.DEBUG: "dark_grey",
+    logging.WARNING: "yellow",
+    logging.ERROR: "red",
+    logging.CRITICAL: "red",
+}
+
+# LogRecord attributes that are not user supplied ``extra`` fields.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "color"}
+
+for _name in LIBRARY_LOGGER_NAMES:
+    logging.getLogger(_name).addHandler(logging.NullHandler())
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the module logger; library modules call ``get_logger(__name__)``."""
+    return logging.getLogger(name)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with time, level, logger, message and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class ConsoleFormatter(logging.Formatter):
+    """
+    Plain message text, colored by level (or by an explicit ``color`` extra).
+
+    ``color`` forces colors on or off; by default termcolor decides from the
+    output stream and environment.
+    """
+
+    def __init__(self, fmt: str = None, color: bool = None):
+        super().__init__(fmt)
+        self.color_options = {} if color is None else {"force_color": True} if color else {"no_color": True}
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        color = getattr(record, "color", None) or LEVEL_COLORS.get(record.levelno)
+        return colored(message, color, **self.color_options) if color else message
+
+
+def configure_logging(
+        level: int = logging.INFO,
+        json_format: bool = False,
+        logger_names: tuple[str, ...] = LIBRARY_LOGGER_NAMES,
+        stream=None) -> logging.handlers.QueueListener:
+    """
+    Route the given loggers through a non-blocking QueueHandler to a stream.
+
+    Formatting and console I/O happen on the listener thread, so logging calls
+    on request paths only enqueue the record. The listener is stopped (and
+    the queue flushed) at interpreter exit.
+    """
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if json_format else ConsoleFormatter("%(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        logger.addHandler(queue_handler)
+        logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,113 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import contextlib
+import threading
+import time
+from microsoft_speech_client_common.client_common_instrumentation import (
+    RequestHook,
+    RequestInfo
+)
+
+# Phase names used by the client libraries.
+PHASE_READ_CONTENT = "read and encode content"
+PHASE_WAIT_FOR_SERVICE = "wait for service"
+PHASE_DECODE_RESPONSE = "decode response"
+
+_NO_PHASE = contextlib.nullcontext()
+_active_profile = None
+# Names of the phases currently open on each thread, to ignore re-entry.
+_local = threading.local()
+
+
+class PhaseProfile(RequestHook):
+    """Wall time and call count per phase, plus one phase per HTTP route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.end = None
+        # name -> [calls, seconds], in first-seen order
+        self.phases: dict[str, list] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.phases.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def after_request(self, info: RequestInfo) -> None:
+        self.add(f"http {info.method} {info.route}", info.total_seconds)
+
+    def wall_seconds(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def summary_table(self) -> str:
+        """Render the phases as a fixed-width table; phases may overlap."""
+        wall = self.wall_seconds()
+        with self._lock:
+            rows = list(self.phases.items())
+        width = max([len(name) for name, _ in rows] + [len("wall time")])
+        lines = [f"{'Phase':<{width}}  {'Calls':>6}  {'Total (s)':>10}  {'% of wall':>9}"]
+        for name, (calls, seconds) in rows:
+            share = 100 * seconds / wall if wall else 0
+            lines.append(f"{name:<{width}}  {calls:>6}  {seconds:>10.3f}  {share:>8.1f}%")
+        lines.append(f"{'wall time':<{width}}  {'':>6}  {wall:>10.3f}  {100:>8.1f}%")
+        return "\n".join(lines)
+
+
+class _TimedPhase:
+    __slots__ = ("profile", "name", "start", "stack")
+
+    def __init__(self, profile: PhaseProfile, name: str, stack: list):
+        self.profile = profile
+        self.name = name
+        self.stack = stack
+
+    def __enter__(self):
+        self.stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.add(self.name, time.perf_counter() - self.start)
+        self.stack.pop()
+        return False
+
+
+def phase(name: str):
+    """
+    Context manager timing a named phase of the active profile.
+
+    A shared no-op context is returned when no profile is active, and when the
+    same phase is already open on this thread (so recursion is counted once).
+    """
+    profile = _active_profile
+    if profile is None:
+        return _NO_PHASE
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    if name in stack:
+        return _NO_PHASE
+    return _TimedPhase(profile, name, stack)
+
+
+def start_profile() -> PhaseProfile:
+    """
+    Start recording phases. Register the returned profile as a global request
+    hook of the clients to also record time per HTTP route.
+    """
+    global _active_profile
+    stop_profile()
+    _active_profile = PhaseProfile()
+    return _active_profile
+
+
+def stop_profile() -> PhaseProfile:
+    """Stop recording and return the finished profile, if any."""
+    global _active_profile
+    profile, _active_profile = _active_profile, None
+    if profile is not None:
+        profile.end = time.perf_counter()
+    return profile
@@ -0,0 +1,143 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+# sqlite3 is imported when a RateLimiter first connects: every client
+# imports this module, most never rate limit.
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+# Operation types requests are limited by; see operation_for().
+OPERATION_CREATE = "create"
+OPERATION_POLL = "poll"
+OPERATION_LIST = "list"
+OPERATION_DELETE = "delete"
+OPERATION_OTHER = "other"
+
+# Seconds to wait for another process holding the database lock.
+DATABASE_TIMEOUT_SECONDS = 30
+
+
+def default_database_path() -> str:
+    import getpass
+    import tempfile
+    user = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+    return os.path.join(tempfile.gettempdir(), f"podcast_rate_limits-{user}.sqlite3")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Sustained requests per second, plus how many may be sent at once after idling."""
+    rate: float
+    burst: float = None
+
+    def __post_init__(self):
+        if self.rate <= 0:
+            raise ValueError("Rate must be positive")
+        if self.burst is None:
+            object.__setattr__(self, "burst", max(self.rate, 1.0))
+
+
+def parse_rate_limits(spec: str) -> dict[str, RateLimit]:
+    """
+    Parse ``create=2,poll=10:20,list=1`` (operation=rate[:burst], rates in
+    requests per second) into rate limits per operation type.
+    """
+    limits = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        operation, _, value = part.partition("=")
+        rate, _, burst = value.partition(":")
+        if not operation or not rate:
+            raise ValueError(f"Invalid rate limit '{part}', expected operation=rate[:burst]")
+        limits[operation.strip()] = RateLimit(rate=float(rate), burst=float(burst) if burst else None)
+    return limits
+
+
+def operation_for(method: str, route: str) -> str:
+    """
+    Classify a request by its route template: creates (PUT/POST of a
+    resource), polls (GET of a resource or operation), lists (GET of a
+    collection) and deletes.
+    """
+    is_resource = route.endswith("{id}")
+    if method in ("PUT", "POST"):
+        return OPERATION_CREATE
+    if method == "DELETE":
+        return OPERATION_DELETE
+    if method == "GET":
+        return OPERATION_POLL if is_resource else OPERATION_LIST
+    return OPERATION_OTHER
+
+
+def key_id(sub_key: str) -> str:
+    """Identify a subscription key in the shared database without storing it."""
+    return hashlib.sha256(sub_key.encode("utf-8")).hexdigest()[:16]
+
+
+class RateLimiter:
+    """
+    Token buckets per (subscription key, operation type), shared by every
+    process using the same SQLite database file.
+
+    Each request takes one token inside a ``BEGIN IMMEDIATE`` transaction. A
+    bucket may go negative: the caller is told how long to wait for its
+    token, so concurrent callers are spaced out at the configured rate in
+    arrival order instead of all retrying when a token frees up.
+    Operation types without a configured limit are not limited.
+    """
+
+    def __init__(self, limits: dict[str, RateLimit], database_path: str = None):
+        self.limits = dict(limits)
+        self.database_path = database_path or default_database_path()
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT NOT NULL, operation TEXT NOT NULL, tokens REAL NOT NULL, updated REAL NOT NULL, "
+                "PRIMARY KEY (key, operation))")
+
+    def _connection(self) -> "sqlite3.Connection":
+        # sqlite3 connections must stay on the thread that created them.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            import sqlite3
+            connection = sqlite3.connect(
+                self.database_path, timeout=DATABASE_TIMEOUT_SECONDS, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def reserve(self, sub_key: str, operation: str) -> float:
+        """Take a token and return the seconds to wait before sending (0 if none)."""
+        limit = self.limits.get(operation)
+        if limit is None:
+            return 0.0
+        key = key_id(sub_key)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = connection.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ? AND operation = ?", (key, operation)).fetchone()
+            tokens = limit.burst if row is None else min(limit.burst, row[0] + (now - row[1]) * limit.rate)
+            tokens -= 1
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets (key, operation, tokens, updated) VALUES (?, ?, ?, ?)",
+                (key, operation, tokens, now))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return -tokens / limit.rate if tokens < 0 else 0.0
+
+    def acquire(self, sub_key: str, operation: str) -> float:
+        """Block until a request may be sent; returns the seconds waited."""
+        wait = self.reserve(sub_key, operation)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
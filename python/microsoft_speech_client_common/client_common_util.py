@@ -1,32 +1,46 @@
 # Copyright (c) Microsoft. All rights reserved.
 # Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
 
+import functools
 from dataclasses import fields, is_dataclass
 from typing import Any, Type
 from urllib3.util import Url
 from urllib.parse import urlencode
 import urllib3
+from microsoft_speech_client_common.client_common_profiling import (
+    PHASE_DECODE_RESPONSE,
+    phase
+)
 
 
 def dict_to_dataclass(data: dict, dataclass_type: Type[Any]) -> Any:
-    if not is_dataclass(dataclass_type):
-        raise ValueError(f"{dataclass_type} is not a dataclass")
+    with phase(PHASE_DECODE_RESPONSE):
+        return _dict_to_dataclass(data, dataclass_type)
 
-    # Retrieve the dataclass fields
-    field_names = {field.name: field.type for field in fields(dataclass_type)}
+
+def _dict_to_dataclass(data: dict, dataclass_type: Type[Any]) -> Any:
+    field_types = _dataclass_field_types(dataclass_type)
     filtered_data = {}
 
     for key, value in data.items():
-        if key in field_names:
-            field_type = field_names[key]
-            if is_dataclass(field_type):  # Check for nested dataclass
-                filtered_data[key] = dict_to_dataclass(value, field_type)
+        if key in field_types:
+            field_type, nested = field_types[key]
+            if nested:  # Nested dataclass
+                filtered_data[key] = _dict_to_dataclass(value, field_type)
             else:
                 filtered_data[key] = value
 
     return dataclass_type(**filtered_data)
 
 
+@functools.lru_cache(maxsize=None)
+def _dataclass_field_types(dataclass_type: Type[Any]) -> dict[str, tuple[Any, bool]]:
+    """Field name -> (type, is nested dataclass), computed once per dataclass type."""
+    if not is_dataclass(dataclass_type):
+        raise ValueError(f"{dataclass_type} is not a dataclass")
+    return {field.name: (field.type, is_dataclass(field.type)) for field in fields(dataclass_type)}
+
+
 def append_url_args(url: Url, args: dict) -> Url:
     if not args:
         return url
@@ -0,0 +1,104 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+# Manifest-driven batch generation for the "batch" subcommand of main_podcast.py.
+#
+# Each manifest row describes one generation with the same options as
+# create_generation_and_wait_until_terminated. Rows run through the staged
+# PodcastPipeline sharing one client (and its connection pool); one result
+# line per row is written as soon as the row finishes.
+
+import csv
+import logging
+import os
+import threading
+from typing import Iterator
+import orjson
+from microsoft_speech_client_common.client_common_enum import (
+    OperationStatus
+)
+from podcast_pipeline import (
+    PodcastPipeline
+)
+
+logger = logging.getLogger("main_podcast")
+
+# Manifest columns; all optional except target_locale and one content source.
+MANIFEST_COLUMNS = (
+    "id",
+    "target_locale",
+    "content_file_azure_blob_url",
+    "content_file_path",
+    "base64_content_file_path",
+    "content_file_temp_file_id",
+    "upload_with_temp_file",
+    "voice_name",
+    "multi_talker_voice_speaker_names",
+    "gender_preference",
+    "length",
+    "host",
+    "style",
+    "additional_instructions",
+    "tenant",
+    "priority",
+)
+PATH_COLUMNS = ("content_file_path", "base64_content_file_path")
+
+
+def read_manifest(manifest_path: str) -> Iterator[dict]:
+    """
+    Yield the rows of a .csv (with header) or .jsonl manifest as dictionaries.
+    Empty values become None and relative file paths are resolved against the
+    manifest's directory.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    is_jsonl = os.path.splitext(manifest_path)[1].lower() in (".jsonl", ".ndjson")
+    with open(manifest_path, "r", encoding="utf-8", newline="") as f:
+        records = (orjson.loads(line) for line in f if line.strip()) if is_jsonl else csv.DictReader(f)
+        for record in records:
+            unknown = set(record) - set(MANIFEST_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown manifest column(s): {', '.join(sorted(unknown))}")
+            row = {column: _normalize(record.get(column)) for column in MANIFEST_COLUMNS}
+            for column in PATH_COLUMNS:
+                if row[column] is not None:
+                    row[column] = os.path.join(base_dir, row[column])
+            yield row
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        value = value.strip()
+    return None if value == "" else value
+
+
+def _succeeded(result: dict) -> bool:
+    # A generation that succeeded but failed to download still counts as failed.
+    return result["status"] == OperationStatus.Succeeded and result["error"] is None
+
+
+class BatchRunner:
+    """Runs manifest rows through a PodcastPipeline and writes one JSON result line per row."""
+
+    def __init__(self, pipeline: PodcastPipeline):
+        self.pipeline = pipeline
+        self._write_lock = threading.Lock()
+
+    def run(self, rows, results_stream) -> tuple[int, int]:
+        """Run all rows and return (succeeded, failed) counts."""
+        counts = {True: 0, False: 0}
+
+        def write_result(result: dict) -> None:
+            succeeded = _succeeded(result)
+            if succeeded:
+                logger.info(f"[{result['row']}] {result['id']}: Succeeded", extra={"color": "green"})
+            else:
+                logger.error(f"[{result['row']}] {result['id']}: {result['status']} {result['error']}")
+            line = orjson.dumps(result).decode("utf-8") + "\n"
+            with self._write_lock:
+                counts[succeeded] += 1
+                results_stream.write(line)
+                results_stream.flush()
+
+        self.pipeline.run(rows, write_result)
+        return counts[True], counts[False]
@@ -0,0 +1,312 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+# Optional local daemon for main_podcast.py (POSIX only).
+#
+# The daemon keeps clients, and with them their warm connection pools, alive
+# across CLI invocations. While it is running, main_podcast.py forwards the
+# quick subcommands (get/list/delete and the temp file equivalents) over a
+# Unix socket instead of importing the client libraries and opening new TLS
+# connections; output and exit code are relayed back unchanged.
+#
+#   python podcast_daemon.py                 # serve in the foreground
+#   python podcast_daemon.py status          # in-flight commands and per-route stats
+#   python podcast_daemon.py stop
+
+import json
+import os
+import socket
+import stat
+import sys
+
+# Subcommands without local file arguments or long waits.
+FORWARDED_SUBCOMMANDS = ("get", "list", "delete", "list_temp_files", "get_temp_file", "delete_temp_file")
+# Global flags that depend on process-wide state and so always run locally.
+# (The daemon applies $PODCAST_RATE_LIMITS itself.)
+LOCAL_ONLY_FLAGS = ("--profile", "--profile_output", "--rate_limits", "--rate_limit_db")
+SOCKET_PATH_ENV = "PODCAST_DAEMON_SOCKET"
+CONNECT_TIMEOUT_SECONDS = 0.5
+
+
+def default_socket_path() -> str:
+    path = os.environ.get(SOCKET_PATH_ENV)
+    if path:
+        return path
+    # $XDG_RUNTIME_DIR is private to the user; otherwise use a 0700 directory
+    # of our own rather than the shared /tmp.
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/podcast_client-{os.getuid()}"
+    return os.path.join(runtime_dir, "podcast_client.sock")
+
+
+def is_private_socket(socket_path: str) -> bool:
+    """
+    True if ``socket_path`` is a socket owned by this user that nobody else
+    can access. Commands carry the subscription key, so they are only sent
+    to a daemon this user started.
+    """
+    try:
+        st = os.lstat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def _connect(socket_path: str) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT_SECONDS)
+        sock.connect(socket_path)
+        sock.settimeout(None)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _exchange(sock: socket.socket, message: dict) -> dict:
+    with sock:
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def try_forward(argv: list[str]) -> int:
+    """
+    Run a main_podcast.py command line on the daemon if one is listening.
+
+    Returns the command's exit code, or None when the command should run in
+    this process (not forwardable, not POSIX, or no daemon reachable).
+    """
+    if not hasattr(socket, "AF_UNIX") or not any(arg in FORWARDED_SUBCOMMANDS for arg in argv):
+        return None
+    if any(arg.split("=", 1)[0] in LOCAL_ONLY_FLAGS for arg in argv):
+        return None
+    if "ndjson" in argv or "--output=ndjson" in argv:
+        return None  # streamed output would be buffered whole by the daemon
+    socket_path = default_socket_path()
+    if not is_private_socket(socket_path):
+        if os.path.lexists(socket_path):
+            print(f"Ignoring {socket_path}: not a socket of this user only accessible by it", file=sys.stderr)
+        return None
+    try:
+        sock = _connect(socket_path)
+    except OSError:
+        return None
+
+    # Past this point the daemon may have run the command, so never retry locally.
+    try:
+        response = _exchange(sock, {"command": "run", "argv": argv, "color": sys.stderr.isatty()})
+    except (OSError, ValueError) as ex:
+        print(f"Podcast client daemon failed: {ex}", file=sys.stderr)
+        return 1
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
+
+
+def notify_deleted(generation_ids: list[str]) -> None:
+    """Tell a running daemon to drop deleted generations its warm clients may have cached."""
+    if not hasattr(socket, "AF_UNIX") or not generation_ids:
+        return
+    socket_path = default_socket_path()
+    if not is_private_socket(socket_path):
+        return
+    try:
+        _exchange(_connect(socket_path), {"command": "invalidate", "generation_ids": list(generation_ids)})
+    except (OSError, ValueError):
+        pass  # the daemon's cached entries expire on their own
+
+
+def serve(socket_path: str) -> None:
+    import io
+    import logging
+    import socketserver
+    import threading
+    import time
+    import main_podcast
+    from microsoft_speech_client_common.client_common_logging import (
+        LIBRARY_LOGGER_NAMES,
+        ConsoleFormatter,
+        JsonFormatter
+    )
+
+    # Output of the command running on each handler thread
+    local = threading.local()
+
+    class CapturedStream(io.TextIOBase):
+        """sys.stdout/sys.stderr replacement writing to the current command's buffer."""
+
+        def __init__(self, name: str, fallback):
+            self.name = name
+            self.fallback = fallback
+
+        def write(self, text: str) -> int:
+            buffer = getattr(local, self.name, None)
+            return (buffer if buffer is not None else self.fallback).write(text)
+
+        def flush(self) -> None:
+            if getattr(local, self.name, None) is None:
+                self.fallback.flush()
+
+    class CommandLogHandler(logging.Handler):
+        """Formats records at the current command's level and format into its stderr."""
+
+        def emit(self, record: logging.LogRecord) -> None:
+            settings = getattr(local, "log", None)
+            if settings is None or record.levelno < settings[0]:
+                return
+            local.stderr.write(settings[1].format(record) + "\n")
+
+    def log_settings(args, color: bool) -> tuple:
+        level = logging.WARNING if args.quiet else logging.DEBUG if args.verbose else logging.INFO
+        if args.log_format == "json":
+            return level, JsonFormatter()
+        return level, ConsoleFormatter("%(message)s", color=color)
+
+    started = time.time()
+    in_flight: dict[int, dict] = {}
+    served = [0]
+    lock = threading.Lock()
+
+    def run_command(argv: list[str], color: bool) -> dict:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        local.stdout, local.stderr = stdout, stderr
+        local.log = (logging.INFO, ConsoleFormatter("%(message)s", color=color))
+        ident = threading.get_ident()
+        subcommand = next((arg for arg in argv if arg in FORWARDED_SUBCOMMANDS), None)
+        with lock:
+            in_flight[ident] = {"subcommand": subcommand, "started": time.time()}
+        exit_code = 0
+        try:
+            if subcommand is None:
+                raise ValueError("Subcommand is not supported by the daemon")
+            args = main_podcast.build_parser(argv).parse_args(argv)
+            local.log = log_settings(args, color)
+            args.func(args)
+        except SystemExit as ex:
+            exit_code = ex.code if isinstance(ex.code, int) else (0 if ex.code is None else 1)
+        except Exception:
+            main_podcast.logger.exception("Command failed")
+            exit_code = 1
+        finally:
+            local.stdout = local.stderr = local.log = None
+            with lock:
+                in_flight.pop(ident, None)
+                served[0] += 1
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit_code": exit_code}
+
+    def status() -> dict:
+        now = time.time()
+        with lock:
+            commands = [
+                {"subcommand": c["subcommand"], "running_seconds": round(now - c["started"], 3)}
+                for c in in_flight.values()
+            ]
+            count = served[0]
+        clients = [
+            {"client": cls.__name__, "region": region, "api_version": api_version, "routes": client.stats()}
+            for (cls, region, _, api_version), client in list(main_podcast.CLIENT_CACHE.items())
+        ]
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(now - started, 3),
+            "commands_served": count,
+            "in_flight": commands,
+            "clients": clients,
+        }
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            message = json.loads(self.rfile.readline())
+            command = message.get("command")
+            if command == "run":
+                response = run_command(list(message["argv"]), bool(message.get("color")))
+            elif command == "status":
+                response = status()
+            elif command == "invalidate":
+                clients = [client for client in list(main_podcast.CLIENT_CACHE.values())
+                           if hasattr(client, "forget_generation")]
+                for client in clients:
+                    for generation_id in message["generation_ids"]:
+                        client.forget_generation(generation_id)
+                response = {"clients": len(clients)}
+            elif command == "stop":
+                response = {"stopping": True}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                response = {"error": f"Unknown command: {command}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+    # Reuse clients across commands and route all output per command.
+    main_podcast.CLIENT_CACHE = {}
+    main_podcast.configure_rate_limiter(
+        os.environ.get(main_podcast.RATE_LIMITS_ENV), os.environ.get(main_podcast.RATE_LIMIT_DB_ENV))
+    sys.stdout = CapturedStream("stdout", sys.stdout)
+    sys.stderr = CapturedStream("stderr", sys.stderr)
+    log_handler = CommandLogHandler()
+    for name in LIBRARY_LOGGER_NAMES + (main_podcast.logger.name,):
+        logger = logging.getLogger(name)
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(log_handler)
+        logger.propagate = False
+
+    if os.path.lexists(socket_path):
+        if not is_private_socket(socket_path):
+            print(f"Refusing to serve on {socket_path}: it exists and is not a socket of this user only",
+                  file=sys.__stderr__)
+            sys.exit(1)
+        try:
+            _connect(socket_path).close()
+            print(f"Podcast client daemon already running on {socket_path}", file=sys.__stderr__)
+            return
+        except OSError:
+            os.unlink(socket_path)  # stale socket from a previous run
+
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), mode=0o700, exist_ok=True)
+    old_umask = os.umask(0o177)  # socket only accessible by this user
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+    print(f"Podcast client daemon listening on {socket_path}", file=sys.__stderr__)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='podcast_daemon.py',
+        description='Local daemon that keeps podcast clients warm for main_podcast.py.')
+    parser.add_argument("--socket", default=default_socket_path(),
+                        help=f"Unix socket path (default: ${SOCKET_PATH_ENV}, else podcast_client.sock in "
+                             "$XDG_RUNTIME_DIR or /tmp/podcast_client-<uid>).")
+    parser.add_argument("action", nargs="?", choices=["serve", "status", "stop"], default="serve")
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        sys.exit("The podcast client daemon requires Unix domain sockets (POSIX).")
+    if args.action == "serve":
+        serve(args.socket)
+        return
+    if not is_private_socket(args.socket):
+        sys.exit(f"No podcast client daemon of this user listening on {args.socket}")
+    try:
+        response = _exchange(_connect(args.socket), {"command": args.action})
+    except OSError:
+        sys.exit(f"No podcast client daemon listening on {args.socket}")
+    print(json.dumps(response, indent=2))
+
+
+if __name__ == "__main__":
+    main()
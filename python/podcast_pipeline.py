@@ -0,0 +1,556 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+# Staged generation pipeline: upload -> create -> poll -> download -> cleanup.
+#
+# Every stage owns a bounded queue and a fixed pool of worker threads, so
+# uploading document N+1 overlaps with polling document N and downloads and
+# temp file cleanup never hold up new creates. Full queues block the stage
+# before them, which bounds memory and makes throughput follow the slowest
+# stage instead of the sum of all stages. Polling is scheduled per
+# operation rather than blocking a worker per generation. Rows enter the
+# create stage through a GenerationScheduler, so rows of several tenants
+# (or several pipelines sharing one scheduler) get fair shares of the
+# generations in flight.
+
+import heapq
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+from microsoft_speech_client_common.client_common_enum import (
+    OperationStatus
+)
+from microsoft_client_podcast.podcast_client import (
+    PodcastClient,
+    build_generation_id
+)
+from microsoft_client_podcast.tempfile_client import (
+    TempFileClient
+)
+from microsoft_client_podcast.podcast_client_pool import (
+    PodcastClientPool
+)
+from microsoft_client_podcast.podcast_result_cache import (
+    ResultCache
+)
+from microsoft_client_podcast.podcast_scheduler import (
+    GenerationScheduler,
+    PRIORITIES,
+    PRIORITY_BULK,
+    Ticket
+)
+
+logger = logging.getLogger("main_podcast")
+
+STAGE_UPLOAD = "upload"
+STAGE_CREATE = "create"
+STAGE_POLL = "poll"
+STAGE_DOWNLOAD = "download"
+STAGE_CLEANUP = "cleanup"
+
+TRUE_VALUES = ("1", "true", "yes", "y")
+DEFAULT_AUDIO_EXTENSION = ".wav"
+DEFAULT_TENANT = "default"
+PROGRESS_INTERVAL_SECONDS = 10
+# Workers of the stages that only make short control-plane requests
+CREATE_WORKERS = 2
+POLL_WORKERS = 2
+CLEANUP_WORKERS = 2
+
+_STOP = object()
+
+
+@dataclass
+class PipelineItem:
+    """One manifest row travelling through the stages."""
+    row_number: int
+    row: dict
+    result: dict = field(default_factory=dict)
+    generation_id: str = None
+    uploaded_temp_file_id: str = None
+    operation_location: object = None
+    generation: object = None
+    tenant: str = None
+    priority: str = None
+    ticket: Ticket = None
+    cache_key: str = None
+    cached_audio_file: str = None
+    enqueued: float = 0.0
+
+
+class StageMetrics:
+    """Counters and timings of one stage; snapshot() is safe from any thread."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.queue_wait_seconds = 0.0
+
+    def started(self, queue_wait: float) -> None:
+        with self._lock:
+            self.busy += 1
+            self.queue_wait_seconds += queue_wait
+
+    def finished(self, seconds: float, succeeded: bool) -> None:
+        with self._lock:
+            self.busy -= 1
+            self.busy_seconds += seconds
+            self.processed += 1
+            if not succeeded:
+                self.failed += 1
+
+    def forwarded(self, blocked: float) -> None:
+        with self._lock:
+            self.blocked_seconds += blocked
+
+    def snapshot(self, queued: int, wall_seconds: float) -> dict:
+        with self._lock:
+            processed = self.processed
+            return {
+                "workers": self.workers,
+                "queued": queued,
+                "busy": self.busy,
+                "processed": processed,
+                "failed": self.failed,
+                "avg_seconds": self.busy_seconds / processed if processed else 0.0,
+                "avg_queue_wait_seconds": self.queue_wait_seconds / processed if processed else 0.0,
+                # Time spent waiting for room in the next stage, which is that stage's backlog, not this one's work.
+                "avg_blocked_seconds": self.blocked_seconds / processed if processed else 0.0,
+                # Share of worker time spent working; the stage near 1.0 is the bottleneck.
+                "utilization": self.busy_seconds / (self.workers * wall_seconds) if wall_seconds else 0.0,
+            }
+
+
+class Stage:
+    """
+    A bounded queue drained by a fixed pool of worker threads. The handler
+    returns the stage the item goes to next (or None); the item is queued
+    there after the handler's work is timed, so a full next stage shows up
+    as blocked time rather than as work.
+    """
+
+    def __init__(self, name: str, handler, workers: int, on_error, queue_size: int = None):
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker")
+        self.name = name
+        self.handler = handler
+        self.on_error = on_error
+        self.metrics = StageMetrics(name, workers)
+        self.queue = queue.Queue(maxsize=queue_size or 2 * workers)
+        self._threads = [
+            threading.Thread(target=self._work, name=f"podcast_pipeline_{name}_{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def put(self, item: PipelineItem) -> None:
+        """Queue an item, blocking while the stage is full."""
+        item.enqueued = time.perf_counter()
+        self.queue.put(item)
+
+    def queued(self) -> int:
+        return self.queue.qsize()
+
+    def _next(self):
+        return self.queue.get()
+
+    def _work(self) -> None:
+        while True:
+            item = self._next()
+            if item is _STOP:
+                return
+            start = time.perf_counter()
+            self.metrics.started(start - item.enqueued)
+            succeeded = True
+            next_stage = None
+            try:
+                next_stage = self.handler(item)
+            except Exception as ex:
+                succeeded = False
+                next_stage = self.on_error(self.name, item, ex)
+            finally:
+                self.metrics.finished(time.perf_counter() - start, succeeded)
+            if next_stage is not None:
+                self._forward(next_stage, item)
+
+    def _forward(self, next_stage: "Stage", item: PipelineItem) -> None:
+        start = time.perf_counter()
+        try:
+            next_stage.put(item)
+        except Exception as ex:
+            next_stage = self.on_error(self.name, item, ex)
+            if next_stage is not None:
+                next_stage.put(item)
+        finally:
+            self.metrics.forwarded(time.perf_counter() - start)
+
+
+class PollStage(Stage):
+    """
+    Stage whose items come back after a delay: the handler makes one status
+    request and returns this stage to be called again ``interval_seconds``
+    later.
+    Waiting items are held in a time-ordered heap, not by worker threads.
+    """
+
+    def __init__(self, name: str, handler, workers: int, on_error, interval_seconds: float):
+        super().__init__(name, handler, workers, on_error)
+        self.interval_seconds = interval_seconds
+        self._heap = []
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._wrapped_handler = handler
+        self.handler = self._poll_once
+
+    def put(self, item: PipelineItem, delay: float = 0.0) -> None:
+        now = time.perf_counter()
+        item.enqueued = now + delay
+        with self._condition:
+            self._sequence += 1
+            heapq.heappush(self._heap, (now + delay, self._sequence, item))
+            self._condition.notify()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def queued(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def _next(self):
+        with self._condition:
+            while True:
+                if self._stopping:
+                    return _STOP
+                if self._heap:
+                    delay = self._heap[0][0] - time.perf_counter()
+                    if delay <= 0:
+                        return heapq.heappop(self._heap)[2]
+                    self._condition.wait(delay)
+                else:
+                    self._condition.wait()
+
+    def _poll_once(self, item: PipelineItem) -> "Stage":
+        next_stage = self._wrapped_handler(item)
+        if next_stage is self:
+            self.put(item, self.interval_seconds)
+            return None
+        return next_stage
+
+
+class ScheduledStage(Stage):
+    """
+    Stage whose items wait in a GenerationScheduler (by the item's tenant and
+    priority) and reach the workers once their ticket is granted. At most
+    ``queue_size`` items wait in the scheduler, which bounds how far the
+    stage before runs ahead.
+    """
+
+    def __init__(self, name: str, handler, workers: int, on_error, scheduler: GenerationScheduler,
+                 queue_size: int = None):
+        super().__init__(name, handler, workers, on_error)
+        self.scheduler = scheduler
+        # Granted items never exceed the scheduler's slots, so this queue needs no bound.
+        self.queue = queue.SimpleQueue()
+        self._waiting = threading.BoundedSemaphore(queue_size or 2 * workers)
+
+    def put(self, item: PipelineItem) -> None:
+        self._waiting.acquire()
+        item.enqueued = time.perf_counter()
+        try:
+            item.ticket = self.scheduler.submit(item.tenant, item.priority, item)
+        except BaseException:
+            self._waiting.release()
+            raise
+        item.ticket.add_grant_callback(self._granted)
+
+    def _granted(self, ticket: Ticket) -> None:
+        self._waiting.release()
+        self.queue.put(ticket.item)
+
+
+class PodcastPipeline:
+    """
+    Runs manifest rows through upload, create, poll, download and cleanup
+    stages. ``max_in_flight`` bounds the generations created but not yet
+    terminated, which is what the service limits; pipelines sharing a
+    ``scheduler`` are bounded by it instead. Rows are scheduled as their
+    manifest ``tenant`` and ``priority`` columns say, defaulting to
+    ``tenant`` and bulk priority. With a ``result_cache``, rows matching a
+    cached succeeded generation skip upload, create and poll.
+    """
+
+    def __init__(self,
+                 podcast_client: PodcastClient,
+                 tempfile_client: TempFileClient,
+                 max_in_flight: int = 8,
+                 output_dir: str = None,
+                 poll_interval_seconds: float = 5,
+                 upload_workers: int = 4,
+                 create_workers: int = CREATE_WORKERS,
+                 poll_workers: int = POLL_WORKERS,
+                 download_workers: int = 4,
+                 cleanup_workers: int = CLEANUP_WORKERS,
+                 scheduler: GenerationScheduler = None,
+                 tenant: str = DEFAULT_TENANT,
+                 result_cache: ResultCache = None):
+        self.podcast_client = podcast_client
+        self.result_cache = result_cache
+        self.tempfile_client = tempfile_client
+        self.output_dir = output_dir
+        self.scheduler = scheduler or GenerationScheduler(max_in_flight)
+        self.tenant = tenant
+        self._done = threading.Condition()
+        self._submitted = 0
+        self._finished = 0
+        self._on_result = None
+        self._start = None
+
+        self.upload = Stage(STAGE_UPLOAD, self._upload, upload_workers, self._fail)
+        self.create = ScheduledStage(STAGE_CREATE, self._create, create_workers, self._fail, self.scheduler)
+        self.poll = PollStage(STAGE_POLL, self._poll, poll_workers, self._fail, poll_interval_seconds)
+        self.download = Stage(STAGE_DOWNLOAD, self._download, download_workers, self._fail)
+        self.cleanup = Stage(STAGE_CLEANUP, self._cleanup, cleanup_workers, self._fail)
+        self.stages = [self.upload, self.create, self.poll, self.download, self.cleanup]
+
+    @property
+    def total_workers(self) -> int:
+        return sum(stage.metrics.workers for stage in self.stages)
+
+    def run(self, rows, on_result) -> None:
+        """
+        Feed rows (read lazily; blocks while the upload stage is full) and
+        return once every row has finished. ``on_result`` receives each row's
+        result dictionary from a pipeline thread.
+        """
+        self._on_result = on_result
+        self._start = time.perf_counter()
+        for stage in self.stages:
+            stage.start()
+        try:
+            for row_number, row in enumerate(rows, start=1):
+                with self._done:
+                    self._submitted += 1
+                self.upload.put(PipelineItem(row_number=row_number, row=row))
+            next_progress = time.perf_counter() + PROGRESS_INTERVAL_SECONDS
+            with self._done:
+                while self._finished < self._submitted:
+                    self._done.wait(max(next_progress - time.perf_counter(), 0))
+                    if time.perf_counter() >= next_progress:
+                        logger.info(self.progress_line())
+                        next_progress += PROGRESS_INTERVAL_SECONDS
+        finally:
+            for stage in self.stages:
+                stage.stop()
+
+    def metrics(self) -> dict[str, dict]:
+        """Per-stage snapshot: workers, queued, busy, processed, failed, timings, utilization."""
+        wall = time.perf_counter() - self._start if self._start else 0.0
+        return {stage.name: stage.metrics.snapshot(stage.queued(), wall) for stage in self.stages}
+
+    def progress_line(self) -> str:
+        with self._done:
+            finished, submitted = self._finished, self._submitted
+        stages = ", ".join(
+            f"{name} {m['busy']} busy/{m['queued']} queued"
+            for name, m in self.metrics().items())
+        scheduler = self.scheduler.snapshot()
+        waiting = sum(scheduler["waiting"].values())
+        return (f"{finished}/{submitted} rows finished; {stages}; "
+                f"scheduler {scheduler['in_flight']}/{scheduler['max_in_flight']} in flight, "
+                f"{waiting} waiting across {len(scheduler['tenants'])} tenant(s)")
+
+    def summary_table(self) -> str:
+        lines = [f"{'Stage':<9} {'Workers':>7} {'Done':>6} {'Failed':>6} {'Avg (s)':>8} {'Wait (s)':>8} "
+                 f"{'Blocked (s)':>11} {'Util':>6}"]
+        for name, m in self.metrics().items():
+            lines.append(
+                f"{name:<9} {m['workers']:>7} {m['processed']:>6} {m['failed']:>6} "
+                f"{m['avg_seconds']:>8.3f} {m['avg_queue_wait_seconds']:>8.3f} {m['avg_blocked_seconds']:>11.3f} "
+                f"{m['utilization']:>6.1%}")
+        return "\n".join(lines)
+
+    # Stage handlers; each returns the stage the item goes to next.
+
+    def _upload(self, item: PipelineItem) -> Stage:
+        row = item.row
+        item.result = _new_result(item)
+        if row["target_locale"] is None:
+            raise ValueError("target_locale is required")
+        if self.result_cache is not None:
+            next_stage = self._reuse_cached(item)
+            if next_stage is not None:
+                return next_stage
+        item.generation_id = row["id"] or build_generation_id(row["target_locale"])
+        item.result["id"] = item.generation_id
+        item.tenant = row["tenant"] or self.tenant
+        item.priority = row["priority"] or PRIORITY_BULK
+        if item.priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        if row["content_file_temp_file_id"] is None and _is_true(row["upload_with_temp_file"]):
+            if row["content_file_path"] is None:
+                raise ValueError("content_file_path is required when uploading with temp file")
+            success, error, temp_file = self._tempfile_client(item).request_upload_temp_file(
+                file_path=row["content_file_path"])
+            if not success:
+                raise RuntimeError(f"Failed to upload temp file: {error}")
+            item.uploaded_temp_file_id = temp_file.id
+        return self.create
+
+    def _reuse_cached(self, item: PipelineItem) -> Stage:
+        """Look the row up in the result cache; a hit goes straight to download or cleanup, a miss returns None."""
+        row = item.row
+        item.cache_key = self.podcast_client.generation_cache_key(
+            target_locale=row["target_locale"],
+            content_file_azure_blob_url=row["content_file_azure_blob_url"],
+            content_file_path=row["base64_content_file_path"] or row["content_file_path"],
+            content_file_temp_file_id=row["content_file_temp_file_id"],
+            **_generation_options(row))
+        generation, audio_file = self.result_cache.find_generation(self.podcast_client, item.cache_key)
+        if generation is None:
+            return None
+        item.generation = generation
+        item.cached_audio_file = audio_file
+        item.result.update(id=generation.id, status=generation.status, cached=True)
+        return self.download if self.output_dir is not None else self.cleanup
+
+    def _create(self, item: PipelineItem) -> Stage:
+        row = item.row
+        request_body = self.podcast_client.create_generation_creation_body(
+            target_locale=row["target_locale"],
+            content_file_azure_blob_url=row["content_file_azure_blob_url"],
+            content_file_path=row["base64_content_file_path"] or row["content_file_path"],
+            content_file_temp_file_id=row["content_file_temp_file_id"] or item.uploaded_temp_file_id,
+            **_generation_options(row))
+        success, error, _, operation_location = self.podcast_client.request_create_generation(
+            generation_id=item.generation_id,
+            request_body=request_body)
+        if not success:
+            raise RuntimeError(f"Failed to create generation: {error}")
+        item.operation_location = operation_location
+        return self.poll
+
+    def _poll(self, item: PipelineItem) -> Stage:
+        success, error, operation = self.podcast_client.request_get_operation(item.operation_location)
+        if not success or operation is None:
+            raise RuntimeError(f"Failed to query operation: {error}")
+        if operation.status in [OperationStatus.Running, OperationStatus.NotStarted]:
+            return self.poll
+
+        self._release_slot(item)
+        success, error, generation = self.podcast_client.request_get_generation(item.generation_id)
+        if not success or generation is None:
+            raise RuntimeError(f"Failed to query generation: {error}")
+        item.generation = generation
+        item.result["status"] = generation.status
+        if generation.status != OperationStatus.Succeeded:
+            item.result["error"] = generation.failureReason
+            return self.cleanup
+        if item.cache_key is not None:
+            self.result_cache.put(self.podcast_client, item.cache_key, generation.id)
+        return self.download if self.output_dir is not None else self.cleanup
+
+    def _download(self, item: PipelineItem) -> Stage:
+        generation = item.generation
+        extension = os.path.splitext(urlparse(generation.output.audioFileUrl).path)[1] or DEFAULT_AUDIO_EXTENSION
+        file_path = os.path.join(self.output_dir, f"{generation.id}{extension}")
+        if item.cached_audio_file is not None:
+            # Audio of a cached generation is copied from where it was downloaded before.
+            if not os.path.exists(file_path) or not os.path.samefile(item.cached_audio_file, file_path):
+                partial_path = f"{file_path}.{item.row_number}.partial"
+                shutil.copyfile(item.cached_audio_file, partial_path)
+                os.replace(partial_path, file_path)
+        else:
+            success, error, _ = self.podcast_client.download_generation_audio(generation, file_path)
+            if not success:
+                raise RuntimeError(error)
+        if item.cache_key is not None:
+            self.result_cache.put(self.podcast_client, item.cache_key, generation.id, file_path)
+        item.result["audio_file"] = file_path
+        return self.cleanup
+
+    def _cleanup(self, item: PipelineItem) -> None:
+        try:
+            if item.uploaded_temp_file_id is not None:
+                success, error = self._tempfile_client(item).request_delete_temp_file(
+                    file_id=item.uploaded_temp_file_id)
+                if not success:
+                    logger.warning(f"Failed to delete temp file {item.uploaded_temp_file_id} with error: {error}")
+        finally:
+            self._finish(item)
+
+    def _fail(self, stage_name: str, item: PipelineItem, ex: Exception) -> Stage:
+        """Record a stage failure; the row still goes through cleanup."""
+        if stage_name == STAGE_CLEANUP:
+            # The row was already reported by _cleanup; a leftover temp file expires on its own.
+            logger.warning(f"Cleanup of row {item.row_number} failed: {ex}")
+            return None
+        self._release_slot(item)
+        if isinstance(self.podcast_client, PodcastClientPool) and item.generation_id is not None:
+            self.podcast_client.release(item.generation_id)
+        if not item.result:
+            item.result = _new_result(item)
+        item.result["status"] = item.result["status"] or OperationStatus.Failed.value
+        item.result["error"] = item.result["error"] or f"{stage_name}: {ex}"
+        return self.cleanup
+
+    def _tempfile_client(self, item: PipelineItem) -> TempFileClient:
+        # Temp files must live on the resource that creates the generation.
+        if isinstance(self.podcast_client, PodcastClientPool):
+            return self.podcast_client.tempfile_client_for(item.generation_id)
+        return self.tempfile_client
+
+    def _release_slot(self, item: PipelineItem) -> None:
+        if item.ticket is not None:
+            self.scheduler.release(item.ticket)
+            item.ticket = None
+
+    def _finish(self, item: PipelineItem) -> None:
+        result = item.result
+        result["elapsed_seconds"] = round(time.perf_counter() - result.pop("start"), 3)
+        try:
+            self._on_result(result)
+        finally:
+            with self._done:
+                self._finished += 1
+                self._done.notify_all()
+
+
+def _new_result(item: PipelineItem) -> dict:
+    return {"row": item.row_number, "id": item.generation_id, "status": None, "error": None,
+            "audio_file": None, "cached": False, "start": time.perf_counter()}
+
+
+def _generation_options(row: dict) -> dict:
+    return {name: row[name] for name in (
+        "voice_name", "multi_talker_voice_speaker_names", "gender_preference", "length", "host", "style",
+        "additional_instructions")}
+
+
+def _is_true(value) -> bool:
+    return value is True or (isinstance(value, str) and value.lower() in TRUE_VALUES)
@@ -6,74 +6,98 @@ for creating podcasts from local TXT/PDF files.
 """
 
 import os
-import sys
-import json
-import uuid
-import base64
 import threading
-import dataclasses
-from pathlib import Path
-from datetime import datetime
 
-from flask import Flask, render_template, request, jsonify, send_file
-from dotenv import dotenv_values
-
-# ---------------------------------------------------------------------------
-# Path setup — allow importing the existing podcast client libraries
-# located one level up in the ``python/`` directory.
-# ---------------------------------------------------------------------------
-PYTHON_ROOT = Path(__file__).resolve().parent.parent
-sys.path.insert(0, str(PYTHON_ROOT))
-
-from microsoft_client_podcast.podcast_client import PodcastClient
-from microsoft_client_podcast.podcast_const import MAX_PLAIN_TEXT_LENGTH, MAX_BASE64_TEXT_LENGTH
-from microsoft_client_podcast.podcast_enum import ContentSourceKind, ContentFileFormatKind, PodcastHostKind, PodcastLengthKind, PodcastStyleKind, PodcastGenderPreferenceKind
-from microsoft_client_podcast.podcast_dataclass import (
-    PodcastGenerationDefinition,
-    PodcastContent,
-    PodcastScriptGenerationConfig,
-    PodcastTtsConfig,
+from flask import Flask, Request, Response, render_template, request, jsonify, send_file
+
+from web_common import (
+    INPUT_FILES_DIR,
+    PODCASTS_DIR,
+    AUDIO_MAX_AGE_SECONDS,
+    ENV_PATH,
+    ENV_DEFAULTS,
+    JOB_TTL_SECONDS,
+    JOB_MAX_TERMINAL,
+    AUDIO_CACHE_MAX_BYTES,
+    configure_rate_limiter,
+    create_scheduler,
+    create_result_cache,
+    create_generation_cache,
+    cache_key_for,
+    scheduling_from_form,
+    use_cache_from_form,
+    load_locales,
+    parse_page_args,
+    new_job_id,
+    podcast_options_from_form,
+    build_generation_body,
+    safe_gen_dict,
 )
+from microsoft_client_podcast.podcast_client import PodcastClient
+from microsoft_client_podcast.podcast_const import MAX_CONTENT_FILE_SIZE
+from microsoft_client_podcast.podcast_dataclass import PodcastContent
+from microsoft_client_podcast.podcast_scheduler import Ticket
 from microsoft_speech_client_common.client_common_enum import OperationStatus
 
+from audio_cache import AudioCache, AudioDownload
+from content_encoder import ContentEncoder, encoder_stream_factory, encode_file
+from input_index import InputFileIndex
+from job_store import JobStore, TERMINAL_STATUSES
+from metrics import WebMetrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from static_assets import StaticAssets, CachedPage, CompressedBody, IMMUTABLE_CACHE_CONTROL
+
+
+class StreamingUploadRequest(Request):
+    """Request whose uploaded files are encoded on the fly instead of spooled."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return encoder_stream_factory(total_content_length, content_type, filename, content_length)
+
+
 # ---------------------------------------------------------------------------
 # App initialisation
 # ---------------------------------------------------------------------------
 app = Flask(__name__)
+# Uploaded files are hashed and encoded while they stream in (no temp file).
+app.request_class = StreamingUploadRequest
+app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_FILE_SIZE
 
-INPUT_FILES_DIR = Path(__file__).resolve().parent / "input_files"
-LOCALES_CSV = Path(__file__).resolve().parent / "locales.csv"
-PODCASTS_DIR = Path(__file__).resolve().parent / "podcasts"
-PODCASTS_DIR.mkdir(exist_ok=True)
+# Prometheus-style counters fed by the job store, audio cache and client hooks
+metrics = WebMetrics()
+PodcastClient.add_global_request_hook(metrics)
+configure_rate_limiter()
 
-# In-memory job store  {job_id: {status, error, audio_path, generation, cancel_event, client_info}}
-jobs: dict[str, dict] = {}
+# In-memory job store  {job_id: {status, error, audio_url, generation, cancel_event, client_info}}
+jobs = JobStore(ttl_seconds=JOB_TTL_SECONDS, max_terminal_jobs=JOB_MAX_TERMINAL, on_transition=metrics.on_transition)
 
-# ---------------------------------------------------------------------------
-# .env loading — look for a .env in the parent ``python/`` directory.
-# Each variable is optional; missing values become empty strings.
-# ---------------------------------------------------------------------------
-_env_path = PYTHON_ROOT / ".env"
-_env: dict[str, str] = {}
-if _env_path.is_file():
-    _env = dotenv_values(_env_path)
+# Jobs stay "Queued" until the scheduler grants them one of its slots.
+scheduler = create_scheduler()
+# Succeeded generations reused for identical settings and content (None if disabled)
+result_cache = create_result_cache()
+# Get generation responses shared by the per-job clients; terminal ones are
+# served from memory, and deletes invalidate them.
+generation_cache = create_generation_cache()
+
+# Downloaded podcasts in PODCASTS_DIR, bounded to AUDIO_CACHE_MAX_BYTES on
+# disk. Evicted audio is re-fetched from the job's audio_url on demand.
+audio_cache = AudioCache(PODCASTS_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES, on_download=metrics.on_download)
 
-ENV_DEFAULTS = {
-    "REGION": _env.get("REGION", "") or "eastus",
-    "SUB_KEY": _env.get("SUB_KEY", ""),
-    "API_VERSION": _env.get("API_VERSION", "") or "2026-01-01-preview",
-}
+# Listing of input_files/, rebuilt only when the folder changes.
+input_index = InputFileIndex(INPUT_FILES_DIR)
 
+# Fingerprinted, precompressed copies of static/ served from /assets/, and the
+# rendered index page (its inputs only change on restart).
+static_assets = StaticAssets(app.static_folder)
+app.add_template_global(static_assets.url, "asset_url")
+index_pages = CachedPage()
 
-def _load_locales() -> list[str]:
-    """Read locale codes from locales.csv (one per line)."""
-    locales: list[str] = []
-    if LOCALES_CSV.is_file():
-        for line in LOCALES_CSV.read_text(encoding="utf-8").splitlines():
-            code = line.strip()
-            if code:
-                locales.append(code)
-    return locales
+
+def _compressed_response(body: CompressedBody, cache_control: str) -> Response:
+    """Serve the best precompressed variant the client accepts, with 304 support."""
+    payload, encoding = body.negotiate(request.headers.get("Accept-Encoding"))
+    response = Response(payload, content_type=body.mimetype, headers=body.headers(encoding))
+    response.headers["Cache-Control"] = cache_control
+    return response.make_conditional(request)
 
 
 # ---------------------------------------------------------------------------
@@ -83,19 +107,39 @@ def _load_locales() -> list[str]:
 @app.route("/")
 def index():
     """Serve the single-page UI."""
-    locales = _load_locales()
-    return render_template("index.html", env=ENV_DEFAULTS, locales=locales)
+    locales = load_locales()
+    key = (tuple(ENV_DEFAULTS.items()), locales)
+    page = index_pages.get(key)
+    if page is None:
+        page = index_pages.put(key, render_template("index.html", env=ENV_DEFAULTS, locales=locales))
+    # The page embeds the .env subscription key, so only the browser may cache it.
+    return _compressed_response(page, "private, no-cache")
+
+
+@app.route("/assets/<path:hashed_name>")
+def asset(hashed_name: str):
+    """Serve a fingerprinted static file; its URL changes whenever it does."""
+    body = static_assets.get(hashed_name)
+    if body is None:
+        return jsonify(error="Asset not found"), 404
+    return _compressed_response(body, IMMUTABLE_CACHE_CONTROL)
 
 
 @app.route("/api/input-files")
 def list_input_files():
-    """Return PDF/TXT files discovered in the ``input_files/`` folder."""
-    files: list[str] = []
-    if INPUT_FILES_DIR.is_dir():
-        for f in sorted(INPUT_FILES_DIR.iterdir()):
-            if f.is_file() and f.suffix.lower() in (".txt", ".pdf"):
-                files.append(f.name)
-    return jsonify(files=files, preselected="")
+    """
+    Return PDF/TXT files discovered in the ``input_files/`` folder.
+
+    Supports ``offset``/``limit`` paging (``DEFAULT_PAGE_LIMIT`` files when
+    no limit is given); ``entries`` carries the size, type and sha256 of each
+    file in the page, or no sha256 with ``hashes=0``.
+    """
+    try:
+        offset, limit = parse_page_args(request.args)
+    except ValueError:
+        return jsonify(error="offset and limit must be integers"), 400
+    entries, total = input_index.page(offset, limit, with_hashes=request.args.get("hashes") != "0")
+    return jsonify(files=[e["name"] for e in entries], entries=entries, total=total, preselected="")
 
 
 @app.route("/api/generate", methods=["POST"])
@@ -108,6 +152,8 @@ def generate():
         file_source  — "upload" | "server"
         server_file  — filename inside input_files/ (when file_source=server)
         file         — uploaded file (when file_source=upload)
+        priority     — "interactive" (default) | "bulk"
+        no_cache     — set to generate even if an identical podcast is cached
     """
     region = request.form.get("region", "").strip()
     sub_key = request.form.get("sub_key", "").strip()
@@ -116,21 +162,21 @@ def generate():
     file_source = request.form.get("file_source", "server")
 
     # Optional podcast options
-    voice_name = request.form.get("voice_name", "").strip() or None
-    multi_talker = request.form.get("multi_talker_voice_speaker_names", "").strip() or None
-    gender_preference = request.form.get("gender_preference", "").strip() or None
-    length = request.form.get("length", "").strip() or None
-    host = request.form.get("host", "").strip() or None
-    style = request.form.get("style", "").strip() or None
-    additional_instructions = request.form.get("additional_instructions", "").strip() or None
+    podcast_options = podcast_options_from_form(request.form)
 
     # --- Validation ----------------------------------------------------------
     if not region or not sub_key or not api_version or not target_locale:
         return jsonify(error="Region, API Key, API Version and Target Locale are all required."), 400
+    try:
+        tenant, priority = scheduling_from_form(request.form, sub_key)
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
 
     # Resolve the file content ------------------------------------------------
-    file_path: Path | None = None
-    file_ext: str = ""
+    # Uploads have already been encoded while the request body streamed in;
+    # server files are encoded by the background thread.
+    content_source: PodcastContent | str
+    content_info: dict = {}
 
     if file_source == "upload":
         uploaded = request.files.get("file")
@@ -139,48 +185,41 @@ def generate():
         file_ext = os.path.splitext(uploaded.filename)[1].lower()
         if file_ext not in (".txt", ".pdf"):
             return jsonify(error="Only .txt and .pdf files are supported."), 400
-        # Save to a temp location inside input_files/
-        safe_name = f"upload_{uuid.uuid4().hex[:8]}{file_ext}"
-        file_path = INPUT_FILES_DIR / safe_name
-        uploaded.save(str(file_path))
+        encoder: ContentEncoder = uploaded.stream
+        try:
+            content_source = encoder.content()
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+        content_info = {"content_sha256": encoder.sha256, "content_size": encoder.size}
     else:
         server_file = request.form.get("server_file", "").strip()
         if not server_file:
             return jsonify(error="Please select a server file."), 400
-        file_path = INPUT_FILES_DIR / server_file
-        if not file_path.is_file():
+        if input_index.get(server_file) is None:
             return jsonify(error=f"File not found: {server_file}"), 404
-        file_ext = file_path.suffix.lower()
+        content_source = str(INPUT_FILES_DIR / server_file)
 
-    job_id = f"{datetime.now().strftime('%m%d%Y%H%M%S')}_{target_locale}"
+    job_id = new_job_id(target_locale)
     cancel_event = threading.Event()
-    jobs[job_id] = {
-        "status": "Starting",
-        "error": None,
-        "audio_path": None,
-        "generation": None,
-        "cancel_event": cancel_event,
-        "client_info": {"region": region, "sub_key": sub_key, "api_version": api_version},
-    }
-
-    # Collect optional podcast options into a dict
-    podcast_options = {
-        "voice_name": voice_name,
-        "multi_talker": multi_talker,
-        "gender_preference": gender_preference,
-        "length": length,
-        "host": host,
-        "style": style,
-        "additional_instructions": additional_instructions,
-    }
-
-    # Track whether the file was uploaded so we can clean it up later
-    is_uploaded_file = file_source == "upload"
+    jobs.create(
+        job_id,
+        status="Queued",
+        error=None,
+        audio_url=None,
+        generation=None,
+        cancel_event=cancel_event,
+        client_info={"region": region, "sub_key": sub_key, "api_version": api_version},
+        tenant=tenant,
+        priority=priority,
+        **content_info,
+    )
+    ticket = scheduler.submit(tenant, priority, job_id)
 
     # Fire off background thread ----------------------------------------------
     thread = threading.Thread(
         target=_run_generation,
-        args=(job_id, region, sub_key, api_version, target_locale, str(file_path), file_ext, podcast_options, is_uploaded_file),
+        args=(job_id, region, sub_key, api_version, target_locale, content_source, podcast_options, cancel_event,
+              ticket, use_cache_from_form(request.form)),
         daemon=True,
     )
     thread.start()
@@ -197,7 +236,7 @@ def job_status(job_id: str):
     return jsonify(
         status=job["status"],
         error=job["error"],
-        has_audio=job["audio_path"] is not None,
+        has_audio=job["audio_url"] is not None,
     )
 
 
@@ -208,35 +247,111 @@ def cancel_job(job_id: str):
     if job is None:
         return jsonify(error="Job not found"), 404
 
+    # A finished job keeps its outcome (and its generation).
+    if job["status"] in TERMINAL_STATUSES:
+        return jsonify(status=job["status"])
+
     # Signal the background thread to stop
     cancel_event = job.get("cancel_event")
     if cancel_event:
         cancel_event.set()
 
-    # Attempt to delete the generation via the API (best-effort)
+    # Attempt to delete the generation via the API (best-effort); queued jobs
+    # were never created.
     info = job.get("client_info", {})
-    if info.get("region") and info.get("sub_key") and info.get("api_version"):
+    if job["status"] != "Queued" and info.get("region") and info.get("sub_key") and info.get("api_version"):
         try:
             client = PodcastClient(
                 region=info["region"],
                 sub_key=info["sub_key"],
                 api_version=info["api_version"],
+                generation_cache=generation_cache,
             )
             client.request_delete_generation(job_id)
         except Exception:
             pass  # best-effort
 
-    job["status"] = "Cancelled"
+    jobs.update(job_id, status="Cancelled")
     return jsonify(status="Cancelled")
 
 
 @app.route("/api/download/<job_id>")
 def download(job_id: str):
-    """Serve the completed podcast audio file."""
+    """
+    Serve the completed podcast audio file.
+
+    Cached audio is sent from disk. Otherwise the audio is proxied from its
+    ``audioFileUrl`` while being tee'd into the cache; concurrent requests
+    share the same upstream download.
+    """
+    job = jobs.get(job_id)
+    audio = audio_cache.open(job_id, job["audio_url"] if job else None)
+    if audio is None:
+        return jsonify(error="Audio not available"), 404
+    if not isinstance(audio, AudioDownload):
+        return send_file(audio, as_attachment=True, download_name=f"{job_id}.mp3", conditional=True)
+    if not audio.wait_started(timeout=30):
+        return jsonify(error="Audio not available"), 404
+    return _stream_download(audio, {"Content-Disposition": f'attachment; filename="{job_id}.mp3"'})
+
+
+@app.route("/api/play/<job_id>")
+def play(job_id: str):
+    """
+    Serve podcast audio inline for the browser player.
+
+    Cached audio supports byte ranges (206), ``ETag``/``If-None-Match`` and
+    ``Last-Modified``/``If-Modified-Since``, and may be cached by the browser
+    for a long time since a finished podcast never changes. While the audio is
+    still downloading it is streamed in full without range support.
+    """
     job = jobs.get(job_id)
-    if job is None or job["audio_path"] is None:
+    audio = audio_cache.open(job_id, job["audio_url"] if job else None)
+    if audio is None:
         return jsonify(error="Audio not available"), 404
-    return send_file(job["audio_path"], as_attachment=True, download_name=f"{job_id}.mp3")
+    if not isinstance(audio, AudioDownload):
+        response = send_file(
+            audio,
+            mimetype="audio/mpeg",
+            conditional=True,
+            etag=f"podcast-{job_id}",
+            max_age=AUDIO_MAX_AGE_SECONDS,
+        )
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.immutable = True
+        return response
+    if not audio.wait_started(timeout=30):
+        return jsonify(error="Audio not available"), 404
+    return _stream_download(audio, {"Accept-Ranges": "none", "Cache-Control": "no-cache"})
+
+
+def _stream_download(audio: AudioDownload, headers: dict) -> Response:
+    """Proxy an in-flight audio download to the client."""
+    if audio.content_length is not None:
+        headers["Content-Length"] = str(audio.content_length)
+    return Response(audio.iter_chunks(), mimetype="audio/mpeg", headers=headers)
+
+
+@app.route("/api/jobs/stats")
+def job_stats():
+    """Return the size of the in-memory job store and the audio cache."""
+    return jsonify(jobs=jobs.stats(), audio_cache=audio_cache.stats())
+
+
+@app.route("/api/queue")
+def queue_state():
+    """Return the scheduler state: slots in use and waiting jobs per priority and tenant."""
+    return jsonify(scheduler.snapshot())
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Expose job, HTTP client and audio cache metrics in Prometheus text format."""
+    # Queue depth counts every active job, whether still "Queued" for a scheduler
+    # slot or holding one; the scheduler gauges tell the two apart.
+    body = metrics.render(jobs, audio_cache, queue_depth=jobs.stats()["active"], scheduler=scheduler.snapshot())
+    return Response(body, content_type=METRICS_CONTENT_TYPE)
 
 
 @app.route("/api/delete-generation/<job_id>", methods=["POST"])
@@ -255,6 +370,7 @@ def delete_generation(job_id: str):
             region=info["region"],
             sub_key=info["sub_key"],
             api_version=info["api_version"],
+            generation_cache=generation_cache,
         )
         success, error = client.request_delete_generation(job_id)
         if not success:
@@ -274,75 +390,49 @@ def _run_generation(
     sub_key: str,
     api_version: str,
     target_locale: str,
-    file_path: str,
-    file_ext: str,
+    content_source: PodcastContent | str,
     podcast_options: dict | None = None,
-    is_uploaded_file: bool = False,
+    cancel_event: threading.Event | None = None,
+    ticket: Ticket | None = None,
+    use_cache: bool = True,
 ):
     """Run the full generation lifecycle in a background thread."""
     try:
-        jobs[job_id]["status"] = "Creating"
-
         client = PodcastClient(
             region=region,
             sub_key=sub_key,
             api_version=api_version,
+            generation_cache=generation_cache,
         )
 
         # Build the request body manually (mirrors PodcastClient logic but
-        # we already have the file on disk and need to read it ourselves).
-        content = PodcastContent()
-        if file_ext == ".txt":
-            text = Path(file_path).read_text(encoding="utf-8")
-            if len(text) > MAX_PLAIN_TEXT_LENGTH:
-                raise ValueError(
-                    f"Text file exceeds the {MAX_PLAIN_TEXT_LENGTH // 1024}KB limit. "
-                    "Please use a shorter file."
-                )
-            content.kind = ContentSourceKind.PlainText
-            content.fileFormat = ContentFileFormatKind.Txt
-            content.text = text
-        elif file_ext == ".pdf":
-            raw = Path(file_path).read_bytes()
-            b64 = base64.b64encode(raw).decode("utf-8")
-            if len(b64) > MAX_BASE64_TEXT_LENGTH:
-                raise ValueError(
-                    f"PDF file exceeds the {MAX_BASE64_TEXT_LENGTH // (1024*1024)}MB base64 limit. "
-                    "Please use a smaller file."
-                )
-            content.kind = ContentSourceKind.FileBase64
-            content.fileFormat = ContentFileFormatKind.Pdf
-            content.base64Text = b64
+        # the content is either pre-encoded from an upload or read from
+        # a file in input_files/).
+        if isinstance(content_source, PodcastContent):
+            content = content_source
+            content_sha256 = jobs.get(job_id)["content_sha256"]
         else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
-
-        # Build optional config objects from podcast_options
-        opts = podcast_options or {}
-
-        script_cfg = PodcastScriptGenerationConfig(
-            additionalInstructions=opts.get("additional_instructions"),
-            length=PodcastLengthKind(opts["length"]) if opts.get("length") else None,
-            style=PodcastStyleKind(opts["style"]) if opts.get("style") else None,
-        )
-
-        tts_cfg = PodcastTtsConfig(
-            voiceName=opts.get("voice_name"),
-            genderPreference=(
-                PodcastGenderPreferenceKind(opts["gender_preference"])
-                if opts.get("gender_preference") else None
-            ),
-            multiTalkerVoiceSpeakerNames=opts.get("multi_talker"),
-        )
+            encoder = encode_file(content_source)
+            content = encoder.content()
+            content_sha256 = encoder.sha256
+            jobs.update(job_id, content_sha256=encoder.sha256, content_size=encoder.size)
+
+        body = build_generation_body(target_locale, content, podcast_options)
+
+        # An identical podcast generated before needs no scheduler slot.
+        cache_key = None
+        if result_cache is not None and use_cache:
+            cache_key = cache_key_for(body, content_sha256)
+            cached, _ = result_cache.find_generation(client, cache_key)
+            if cached is not None:
+                _finish_generation(job_id, cached, cached_generation_id=cached.id)
+                return
 
-        body = PodcastGenerationDefinition(
-            displayName="Web UI Generation",
-            description=f"Generated via Web UI at {datetime.now().isoformat()}",
-            locale=target_locale,
-            host=PodcastHostKind(opts["host"]) if opts.get("host") else None,
-            content=content,
-            scriptGeneration=script_cfg,
-            tts=tts_cfg,
-        )
+        # Wait for a scheduler slot, checking for cancellation every second
+        while ticket is not None and not ticket.wait(timeout=1):
+            if cancel_event and cancel_event.is_set():
+                return
+        jobs.update(job_id, status="Creating")
 
         # PUT — create the generation
         success, error, response_gen, operation_location = client.request_create_generation(
@@ -350,19 +440,17 @@ def _run_generation(
             request_body=body,
         )
         if not success:
-            jobs[job_id]["status"] = "Failed"
-            jobs[job_id]["error"] = error
+            jobs.update(job_id, status="Failed", error=error)
             return
 
         # Poll until terminated (check cancellation between polls)
-        jobs[job_id]["status"] = "Running"
-        cancel_event = jobs[job_id].get("cancel_event")
+        jobs.update(job_id, status="Running")
 
         # Use a simple polling loop that checks cancellation
         import time
         while True:
             if cancel_event and cancel_event.is_set():
-                jobs[job_id]["status"] = "Cancelled"
+                jobs.update(job_id, status="Cancelled")
                 return
             try:
                 success_poll, error_poll, op = client.request_get_generation(job_id)
@@ -375,65 +463,56 @@ def _run_generation(
             # Wait 5 seconds between polls, but check cancel every second
             for _ in range(5):
                 if cancel_event and cancel_event.is_set():
-                    jobs[job_id]["status"] = "Cancelled"
+                    jobs.update(job_id, status="Cancelled")
                     return
                 time.sleep(1)
 
         # Check cancellation before fetching result
         if cancel_event and cancel_event.is_set():
-            jobs[job_id]["status"] = "Cancelled"
+            jobs.update(job_id, status="Cancelled")
             return
 
         # Fetch the completed generation
         success, error, generation = client.request_get_generation(job_id)
         if not success:
-            jobs[job_id]["status"] = "Failed"
-            jobs[job_id]["error"] = error
+            jobs.update(job_id, status="Failed", error=error)
             return
 
         if generation.status != OperationStatus.Succeeded:
-            jobs[job_id]["status"] = "Failed"
-            jobs[job_id]["error"] = generation.failureReason or "Generation did not succeed."
-            jobs[job_id]["generation"] = _safe_gen_dict(generation)
+            jobs.update(
+                job_id,
+                status="Failed",
+                error=generation.failureReason or "Generation did not succeed.",
+                generation=safe_gen_dict(generation),
+            )
             return
 
-        # Download the audio file
-        audio_url = None
-        if generation.output and generation.output.audioFileUrl:
-            audio_url = generation.output.audioFileUrl
-
-        if audio_url:
-            import urllib3
-            http = urllib3.PoolManager()
-            resp = http.request("GET", audio_url)
-            if resp.status == 200:
-                audio_path = PODCASTS_DIR / f"{job_id}.mp3"
-                audio_path.write_bytes(resp.data)
-                jobs[job_id]["audio_path"] = str(audio_path)
-
-        jobs[job_id]["status"] = "Succeeded"
-        jobs[job_id]["generation"] = _safe_gen_dict(generation)
+        if cache_key is not None:
+            result_cache.put(client, cache_key, generation.id)
+        _finish_generation(job_id, generation)
 
     except Exception as exc:
-        jobs[job_id]["status"] = "Failed"
-        jobs[job_id]["error"] = str(exc)
+        jobs.update(job_id, status="Failed", error=str(exc))
     finally:
-        # Clean up uploaded temp files — server-side files are left untouched
-        if is_uploaded_file:
-            try:
-                p = Path(file_path)
-                if p.is_file():
-                    p.unlink()
-            except Exception:
-                pass  # best-effort cleanup
+        if ticket is not None:
+            scheduler.release(ticket)
 
 
-def _safe_gen_dict(gen: PodcastGenerationDefinition) -> dict | None:
-    """Convert a generation dataclass to a JSON-safe dict, swallowing errors."""
-    try:
-        return dataclasses.asdict(gen)
-    except Exception:
-        return None
+def _finish_generation(job_id: str, generation, **fields) -> None:
+    """Start downloading the audio of a succeeded generation and mark the job Succeeded."""
+    # Download the audio file
+    audio_url = None
+    if generation.output and generation.output.audioFileUrl:
+        audio_url = generation.output.audioFileUrl
+
+    # Start the download in the background and report success as soon as
+    # the upstream responds; /api/download streams while it is written.
+    if audio_url:
+        audio = audio_cache.open(job_id, audio_url)
+        if not isinstance(audio, AudioDownload) or audio.wait_started(timeout=30):
+            jobs.update(job_id, audio_url=audio_url)
+
+    jobs.update(job_id, status="Succeeded", generation=safe_gen_dict(generation), **fields)
 
 
 # ---------------------------------------------------------------------------
@@ -441,6 +520,6 @@ def _safe_gen_dict(gen: PodcastGenerationDefinition) -> dict | None:
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
     print(f" * Input files dir : {INPUT_FILES_DIR}")
-    print(f" * Podcasts dir    : {PODCASTS_DIR}")
-    print(f" * .env loaded     : {_env_path.is_file()}")
+    print(f" * Podcasts dir    : {PODCASTS_DIR} ({audio_cache.stats()['files']} cached)")
+    print(f" * .env loaded     : {ENV_PATH.is_file()}")
     app.run(debug=True, host="127.0.0.1", port=5000)
@@ -0,0 +1,495 @@
+"""
+ASGI variant of the podcast web UI, built on Quart.
+
+Serves the same routes and template as ``app.py`` but runs every generation as
+an asyncio task on a single event loop using ``AsyncPodcastClient``, so one
+process can hold thousands of status/SSE connections and many in-flight
+generations without a thread per connection.
+
+Run with:
+    uvicorn asgi_app:app --port 5000
+"""
+
+import asyncio
+import json
+import os
+
+from quart import Quart, Request, Response, render_template, request, jsonify, send_file
+
+from web_common import (
+    INPUT_FILES_DIR,
+    PODCASTS_DIR,
+    AUDIO_MAX_AGE_SECONDS,
+    ENV_PATH,
+    ENV_DEFAULTS,
+    JOB_TTL_SECONDS,
+    JOB_MAX_TERMINAL,
+    AUDIO_CACHE_MAX_BYTES,
+    configure_rate_limiter,
+    create_scheduler,
+    create_result_cache,
+    create_generation_cache,
+    cache_key_for,
+    scheduling_from_form,
+    use_cache_from_form,
+    load_locales,
+    parse_page_args,
+    new_job_id,
+    podcast_options_from_form,
+    build_generation_body,
+    safe_gen_dict,
+)
+from microsoft_client_podcast.podcast_async_client import AsyncPodcastClient
+from microsoft_client_podcast.podcast_const import MAX_CONTENT_FILE_SIZE
+from microsoft_client_podcast.podcast_dataclass import PodcastContent
+from microsoft_client_podcast.podcast_scheduler import Ticket
+from microsoft_speech_client_common.client_common_enum import OperationStatus
+
+from audio_cache import AudioCache, AsyncAudioDownload
+from content_encoder import ContentEncoder, encoder_stream_factory, encode_file
+from input_index import InputFileIndex
+from job_store import JobStore, TERMINAL_STATUSES
+from metrics import WebMetrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from static_assets import StaticAssets, CachedPage, CompressedBody, IMMUTABLE_CACHE_CONTROL
+
+POLL_INTERVAL_SECONDS = 5
+SSE_KEEPALIVE_SECONDS = 15
+
+
+class StreamingUploadRequest(Request):
+    """Request whose uploaded files are encoded on the fly instead of spooled."""
+
+    def make_form_data_parser(self):
+        parser = super().make_form_data_parser()
+        parser.stream_factory = encoder_stream_factory
+        return parser
+
+
+# ---------------------------------------------------------------------------
+# App initialisation
+# ---------------------------------------------------------------------------
+app = Quart(__name__)
+app.request_class = StreamingUploadRequest
+app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_FILE_SIZE
+
+metrics = WebMetrics()
+AsyncPodcastClient.add_global_request_hook(metrics)
+configure_rate_limiter()
+jobs = JobStore(ttl_seconds=JOB_TTL_SECONDS, max_terminal_jobs=JOB_MAX_TERMINAL, on_transition=metrics.on_transition)
+scheduler = create_scheduler()
+result_cache = create_result_cache()
+generation_cache = create_generation_cache()
+audio_cache = AudioCache(PODCASTS_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES, on_download=metrics.on_download)
+input_index = InputFileIndex(INPUT_FILES_DIR)
+static_assets = StaticAssets(app.static_folder)
+app.add_template_global(static_assets.url, "asset_url")
+index_pages = CachedPage()
+
+# One client (and connection pool) per resource, shared by all jobs.
+_clients: dict[tuple[str, str, str], AsyncPodcastClient] = {}
+# Running generation tasks and per-job change notifications for SSE.
+_tasks: dict[str, asyncio.Task] = {}
+_job_changed: dict[str, asyncio.Event] = {}
+
+
+def _get_client(region: str, sub_key: str, api_version: str) -> AsyncPodcastClient:
+    key = (region, sub_key, api_version)
+    client = _clients.get(key)
+    if client is None:
+        client = AsyncPodcastClient(
+            region=region, sub_key=sub_key, api_version=api_version, generation_cache=generation_cache)
+        _clients[key] = client
+    return client
+
+
+async def _compressed_response(body: CompressedBody, cache_control: str) -> Response:
+    """Serve the best precompressed variant the client accepts, with 304 support."""
+    payload, encoding = body.negotiate(request.headers.get("Accept-Encoding"))
+    response = Response(payload, content_type=body.mimetype, headers=body.headers(encoding))
+    response.headers["Cache-Control"] = cache_control
+    await response.make_conditional(request)
+    return response
+
+
+def _update_job(job_id: str, **fields) -> None:
+    """Update a job and wake up any SSE listeners."""
+    jobs.update(job_id, **fields)
+    event = _job_changed.pop(job_id, None)
+    if event is not None:
+        event.set()
+
+
+@app.after_serving
+async def _shutdown():
+    for task in list(_tasks.values()):
+        task.cancel()
+    for client in _clients.values():
+        await client.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+@app.route("/")
+async def index():
+    """Serve the single-page UI."""
+    locales = load_locales()
+    key = (tuple(ENV_DEFAULTS.items()), locales)
+    page = index_pages.get(key)
+    if page is None:
+        page = index_pages.put(key, await render_template("index.html", env=ENV_DEFAULTS, locales=locales))
+    return await _compressed_response(page, "private, no-cache")
+
+
+@app.route("/assets/<path:hashed_name>")
+async def asset(hashed_name: str):
+    """Serve a fingerprinted static file."""
+    body = static_assets.get(hashed_name)
+    if body is None:
+        return jsonify(error="Asset not found"), 404
+    return await _compressed_response(body, IMMUTABLE_CACHE_CONTROL)
+
+
+@app.route("/api/input-files")
+async def list_input_files():
+    """Return one page of PDF/TXT files in ``input_files/`` (see ``app.list_input_files``)."""
+    try:
+        offset, limit = parse_page_args(request.args)
+    except ValueError:
+        return jsonify(error="offset and limit must be integers"), 400
+    # Hashing may read files, so keep it off the event loop.
+    entries, total = await asyncio.to_thread(
+        input_index.page, offset, limit, with_hashes=request.args.get("hashes") != "0")
+    return jsonify(files=[e["name"] for e in entries], entries=entries, total=total, preselected="")
+
+
+@app.route("/api/generate", methods=["POST"])
+async def generate():
+    """Accept form data and start a podcast generation task (see ``app.generate``)."""
+    form = await request.form
+    files = await request.files
+    region = form.get("region", "").strip()
+    sub_key = form.get("sub_key", "").strip()
+    api_version = form.get("api_version", "").strip()
+    target_locale = form.get("target_locale", "").strip()
+    file_source = form.get("file_source", "server")
+    podcast_options = podcast_options_from_form(form)
+
+    if not region or not sub_key or not api_version or not target_locale:
+        return jsonify(error="Region, API Key, API Version and Target Locale are all required."), 400
+    try:
+        tenant, priority = scheduling_from_form(form, sub_key)
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+
+    content_source: PodcastContent | str
+    content_info: dict = {}
+    if file_source == "upload":
+        uploaded = files.get("file")
+        if not uploaded or uploaded.filename == "":
+            return jsonify(error="Please select a file to upload."), 400
+        file_ext = os.path.splitext(uploaded.filename)[1].lower()
+        if file_ext not in (".txt", ".pdf"):
+            return jsonify(error="Only .txt and .pdf files are supported."), 400
+        encoder: ContentEncoder = uploaded.stream
+        try:
+            content_source = encoder.content()
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+        content_info = {"content_sha256": encoder.sha256, "content_size": encoder.size}
+    else:
+        server_file = form.get("server_file", "").strip()
+        if not server_file:
+            return jsonify(error="Please select a server file."), 400
+        if input_index.get(server_file) is None:
+            return jsonify(error=f"File not found: {server_file}"), 404
+        content_source = str(INPUT_FILES_DIR / server_file)
+
+    job_id = new_job_id(target_locale)
+    jobs.create(
+        job_id,
+        status="Queued",
+        error=None,
+        audio_url=None,
+        generation=None,
+        client_info={"region": region, "sub_key": sub_key, "api_version": api_version},
+        tenant=tenant,
+        priority=priority,
+        **content_info,
+    )
+    ticket = scheduler.submit(tenant, priority, job_id)
+    client = _get_client(region, sub_key, api_version)
+    task = asyncio.create_task(_run_generation(
+        job_id, client, target_locale, content_source, podcast_options, ticket, use_cache_from_form(form)))
+    _tasks[job_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(job_id, None))
+    return jsonify(job_id=job_id)
+
+
+def _status_payload(job: dict) -> dict:
+    return {"status": job["status"], "error": job["error"], "has_audio": job["audio_url"] is not None}
+
+
+@app.route("/api/status/<job_id>")
+async def job_status(job_id: str):
+    """Return the current status of a generation job."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify(error="Job not found"), 404
+    return jsonify(**_status_payload(job))
+
+
+@app.route("/api/events/<job_id>")
+async def job_events(job_id: str):
+    """Server-sent events stream of a job's status until it is terminal."""
+    if jobs.get(job_id) is None:
+        return jsonify(error="Job not found"), 404
+
+    async def stream():
+        while True:
+            job = jobs.get(job_id)
+            if job is None:
+                return
+            payload = _status_payload(job)
+            yield f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+            if payload["status"] in TERMINAL_STATUSES:
+                return
+            event = _job_changed.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+
+    response = Response(stream(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.timeout = None
+    return response
+
+
+@app.route("/api/cancel/<job_id>", methods=["POST"])
+async def cancel_job(job_id: str):
+    """Cancel a running generation job."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify(error="Job not found"), 404
+
+    # A finished job keeps its outcome (and its generation).
+    if job["status"] in TERMINAL_STATUSES:
+        return jsonify(status=job["status"])
+
+    task = _tasks.get(job_id)
+    if task is not None:
+        task.cancel()
+
+    info = job.get("client_info", {})
+    if job["status"] != "Queued" and info.get("region") and info.get("sub_key") and info.get("api_version"):
+        try:
+            client = _get_client(info["region"], info["sub_key"], info["api_version"])
+            await client.request_delete_generation(job_id)
+        except Exception:
+            pass  # best-effort
+
+    _update_job(job_id, status="Cancelled")
+    return jsonify(status="Cancelled")
+
+
+async def _open_audio(job_id: str):
+    job = jobs.get(job_id)
+    info = job.get("client_info", {}) if job else {}
+    http = _get_client(info["region"], info["sub_key"], info["api_version"]).http if info else None
+    return audio_cache.open_async(job_id, job["audio_url"] if job and http else None, http)
+
+
+def _stream_download(audio: AsyncAudioDownload, headers: dict) -> Response:
+    """Proxy an in-flight audio download to the client."""
+    if audio.content_length is not None:
+        headers["Content-Length"] = str(audio.content_length)
+    response = Response(audio.iter_chunks(), mimetype="audio/mpeg", headers=headers)
+    response.timeout = None
+    return response
+
+
+@app.route("/api/download/<job_id>")
+async def download(job_id: str):
+    """Serve the completed podcast audio file as an attachment."""
+    audio = await _open_audio(job_id)
+    if audio is None:
+        return jsonify(error="Audio not available"), 404
+    if not isinstance(audio, AsyncAudioDownload):
+        return await send_file(audio, as_attachment=True, attachment_filename=f"{job_id}.mp3", conditional=True)
+    if not await audio.wait_started(timeout=30):
+        return jsonify(error="Audio not available"), 404
+    return _stream_download(audio, {"Content-Disposition": f'attachment; filename="{job_id}.mp3"'})
+
+
+@app.route("/api/play/<job_id>")
+async def play(job_id: str):
+    """Serve podcast audio inline with range and conditional request support."""
+    audio = await _open_audio(job_id)
+    if audio is None:
+        return jsonify(error="Audio not available"), 404
+    if not isinstance(audio, AsyncAudioDownload):
+        response = await send_file(audio, mimetype="audio/mpeg", add_etags=False, cache_timeout=AUDIO_MAX_AGE_SECONDS)
+        response.set_etag(f"podcast-{job_id}")
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.immutable = True
+        await response.make_conditional(request, accept_ranges=True, complete_length=response.content_length)
+        return response
+    if not await audio.wait_started(timeout=30):
+        return jsonify(error="Audio not available"), 404
+    return _stream_download(audio, {"Accept-Ranges": "none", "Cache-Control": "no-cache"})
+
+
+@app.route("/api/jobs/stats")
+async def job_stats():
+    """Return the size of the in-memory job store and the audio cache."""
+    return jsonify(jobs=jobs.stats(), audio_cache=audio_cache.stats(), tasks=len(_tasks))
+
+
+@app.route("/api/queue")
+async def queue_state():
+    """Return the scheduler state: slots in use and waiting jobs per priority and tenant."""
+    return jsonify(scheduler.snapshot())
+
+
+@app.route("/metrics")
+async def prometheus_metrics():
+    """Expose job, HTTP client and audio cache metrics in Prometheus text format."""
+    body = metrics.render(jobs, audio_cache, queue_depth=len(_tasks), scheduler=scheduler.snapshot())
+    return Response(body, content_type=METRICS_CONTENT_TYPE)
+
+
+@app.route("/api/delete-generation/<job_id>", methods=["POST"])
+async def delete_generation(job_id: str):
+    """Delete a podcast generation from the Azure server (best-effort)."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify(error="Job not found"), 404
+
+    info = job.get("client_info", {})
+    if not (info.get("region") and info.get("sub_key") and info.get("api_version")):
+        return jsonify(error="Missing client credentials for deletion"), 400
+
+    try:
+        client = _get_client(info["region"], info["sub_key"], info["api_version"])
+        success, error = await client.request_delete_generation(job_id)
+        if not success:
+            return jsonify(error=f"Delete failed: {error}"), 500
+        return jsonify(status="Deleted")
+    except Exception as exc:
+        return jsonify(error=str(exc)), 500
+
+
+# ---------------------------------------------------------------------------
+# Background generation logic
+# ---------------------------------------------------------------------------
+
+async def _run_generation(
+    job_id: str,
+    client: AsyncPodcastClient,
+    target_locale: str,
+    content_source: PodcastContent | str,
+    podcast_options: dict | None = None,
+    ticket: Ticket | None = None,
+    use_cache: bool = True,
+):
+    """Run the full generation lifecycle as a task; cancellation stops it between awaits."""
+    try:
+        if isinstance(content_source, PodcastContent):
+            content = content_source
+            content_sha256 = jobs.get(job_id)["content_sha256"]
+        else:
+            encoder = await asyncio.to_thread(encode_file, content_source)
+            content = encoder.content()
+            content_sha256 = encoder.sha256
+            _update_job(job_id, content_sha256=encoder.sha256, content_size=encoder.size)
+
+        body = build_generation_body(target_locale, content, podcast_options)
+
+        # An identical podcast generated before needs no scheduler slot.
+        cache_key = None
+        if result_cache is not None and use_cache:
+            cache_key = cache_key_for(body, content_sha256)
+            cached, _ = await result_cache.find_generation_async(client, cache_key)
+            if cached is not None:
+                await _finish_generation(job_id, client, cached, cached_generation_id=cached.id)
+                return
+
+        if ticket is not None:
+            await ticket.wait_async()
+        _update_job(job_id, status="Creating")
+        success, error, _, _ = await client.request_create_generation(
+            generation_id=job_id,
+            request_body=body,
+        )
+        if not success:
+            _update_job(job_id, status="Failed", error=error)
+            return
+
+        _update_job(job_id, status="Running")
+        while True:
+            try:
+                success_poll, _, op = await client.request_get_generation(job_id)
+                if success_poll and op and op.status in (
+                    OperationStatus.Succeeded, OperationStatus.Failed
+                ):
+                    break
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+        success, error, generation = await client.request_get_generation(job_id)
+        if not success:
+            _update_job(job_id, status="Failed", error=error)
+            return
+
+        if generation.status != OperationStatus.Succeeded:
+            _update_job(
+                job_id,
+                status="Failed",
+                error=generation.failureReason or "Generation did not succeed.",
+                generation=safe_gen_dict(generation),
+            )
+            return
+
+        if cache_key is not None:
+            result_cache.put(client, cache_key, generation.id)
+        await _finish_generation(job_id, client, generation)
+
+    except asyncio.CancelledError:
+        _update_job(job_id, status="Cancelled")
+    except Exception as exc:
+        _update_job(job_id, status="Failed", error=str(exc))
+    finally:
+        if ticket is not None:
+            scheduler.release(ticket)
+
+
+async def _finish_generation(job_id: str, client: AsyncPodcastClient, generation, **fields) -> None:
+    """Start downloading the audio of a succeeded generation and mark the job Succeeded."""
+    audio_url = None
+    if generation.output and generation.output.audioFileUrl:
+        audio_url = generation.output.audioFileUrl
+
+    if audio_url:
+        audio = audio_cache.open_async(job_id, audio_url, client.http)
+        if not isinstance(audio, AsyncAudioDownload) or await audio.wait_started(timeout=30):
+            _update_job(job_id, audio_url=audio_url)
+
+    _update_job(job_id, status="Succeeded", generation=safe_gen_dict(generation), **fields)
+
+
+# ---------------------------------------------------------------------------
+# Entry-point
+# ---------------------------------------------------------------------------
+if __name__ == "__main__":
+    import uvicorn
+
+    print(f" * Input files dir : {INPUT_FILES_DIR}")
+    print(f" * Podcasts dir    : {PODCASTS_DIR} ({audio_cache.stats()['files']} cached)")
+    print(f" * .env loaded     : {ENV_PATH.is_file()}")
+    uvicorn.run(app, host="127.0.0.1", port=5000)
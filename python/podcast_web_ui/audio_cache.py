@@ -0,0 +1,350 @@
+"""
+Disk-quota LRU cache for downloaded podcast audio.
+
+Files live in a single directory as ``<job_id>.mp3``. The directory is indexed
+once at startup; afterwards the in-memory index is the source of truth, so
+lookups never touch the file system. When the total size exceeds the quota the
+least recently downloaded files are deleted. Evicted audio can be fetched again
+from its ``audioFileUrl`` while that URL is still valid.
+
+Downloads are tee'd: chunks are appended to ``<job_id>.mp3.part`` as they
+arrive from upstream, and any number of readers can stream the same file while
+it is still being written. Concurrent requests for one job share a single
+upstream download. ``AsyncAudioDownload`` is the asyncio counterpart used by
+the ASGI web UI; it runs as a task on the event loop instead of a thread.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+import urllib3
+
+AUDIO_SUFFIX = ".mp3"
+PARTIAL_SUFFIX = ".part"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class AudioDownload:
+    """A single upstream download shared by every reader of the same job."""
+
+    def __init__(self, part_path: Path):
+        self.cond = threading.Condition()
+        self.path = part_path
+        self.size = 0
+        self.content_length: int | None = None
+        self.done = False
+        self.failed = False
+        self._started = threading.Event()
+
+    def wait_started(self, timeout: float | None = None) -> bool:
+        """Wait for the upstream response headers; ``False`` if the download failed."""
+        self._started.wait(timeout)
+        return self._started.is_set() and not self.failed
+
+    def iter_chunks(self):
+        """Yield the audio from the start, following the file while it is written."""
+        offset = 0
+        while True:
+            with self.cond:
+                while offset >= self.size and not (self.done or self.failed):
+                    self.cond.wait()
+                if self.failed:
+                    return
+                if self.done:
+                    # ``path`` now points at the final file; hold it open for the rest.
+                    f = open(self.path, "rb")
+                    break
+                # Reads of the partial file happen under the condition so the
+                # final rename never races with an open handle (Windows).
+                with open(self.path, "rb") as part:
+                    part.seek(offset)
+                    chunk = part.read(min(DOWNLOAD_CHUNK_SIZE, self.size - offset))
+            offset += len(chunk)
+            yield chunk
+        with f:
+            f.seek(offset)
+            while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+
+    def _mark_started(self, content_length: int | None) -> None:
+        self.content_length = content_length
+        self._started.set()
+
+    def _append(self, size: int) -> None:
+        with self.cond:
+            self.size += size
+            self.cond.notify_all()
+
+    def _finish(self, final_path: Path) -> None:
+        with self.cond:
+            os.replace(self.path, final_path)
+            self.path = final_path
+            self.done = True
+            self.cond.notify_all()
+
+    def _fail(self) -> None:
+        with self.cond:
+            self.failed = True
+            self.cond.notify_all()
+        self._started.set()
+        try:
+            self.path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+class AsyncAudioDownload:
+    """Asyncio variant of ``AudioDownload``; all access happens on one event loop."""
+
+    def __init__(self, part_path: Path):
+        self.changed = asyncio.Condition()
+        self.path = part_path
+        self.size = 0
+        self.content_length: int | None = None
+        self.done = False
+        self.failed = False
+        self._started = asyncio.Event()
+        self.task: asyncio.Task | None = None  # keeps the download task referenced
+
+    async def wait_started(self, timeout: float | None = None) -> bool:
+        """Wait for the upstream response headers; ``False`` if the download failed."""
+        try:
+            await asyncio.wait_for(self._started.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return not self.failed
+
+    async def iter_chunks(self):
+        """Yield the audio from the start, following the file while it is written."""
+        offset = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: offset < self.size or self.done or self.failed)
+            if self.failed or offset >= self.size:
+                return
+            # No await between open and close, so the final rename (also on
+            # the loop) can never race with this read.
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, self.size - offset))
+            offset += len(chunk)
+            yield chunk
+
+    async def _notify(self) -> None:
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def _fail(self) -> None:
+        self.failed = True
+        self._started.set()
+        await self._notify()
+        try:
+            self.path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+class AudioCache:
+    """Thread-safe, byte-bounded LRU cache of podcast audio files."""
+
+    def __init__(self,
+                 directory: Path,
+                 max_bytes: int,
+                 http: urllib3.PoolManager | None = None,
+                 on_download: Callable[[float, int, bool], None] | None = None):
+        if max_bytes <= 0:
+            raise ValueError("Audio cache quota must be positive")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.http = http or urllib3.PoolManager()
+        # on_download(elapsed_seconds, size, succeeded) after every download
+        self._on_download = on_download
+        self._lock = threading.Lock()
+        # job_id -> size in bytes, least recently downloaded first
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._inflight: dict[str, AudioDownload] = {}
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Index existing audio files, oldest first, and drop stale partial downloads."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith(PARTIAL_SUFFIX):
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+                    continue
+                if entry.name.endswith(AUDIO_SUFFIX):
+                    st = entry.stat()
+                    found.append((st.st_mtime, entry.name[:-len(AUDIO_SUFFIX)], st.st_size))
+        for _, job_id, size in sorted(found):
+            self._entries[job_id] = size
+            self._total_bytes += size
+        with self._lock:
+            self._evict_locked()
+
+    def path_for(self, job_id: str) -> Path:
+        """Return the cache file path for a job (whether or not it is cached)."""
+        return self.directory / f"{job_id}{AUDIO_SUFFIX}"
+
+    def get(self, job_id: str) -> Path | None:
+        """Return the cached file for a job and mark it as recently downloaded."""
+        with self._lock:
+            if job_id not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(job_id)
+            self.hits += 1
+            return self.path_for(job_id)
+
+    def add(self, job_id: str, size: int) -> None:
+        """Register a file that has been written to ``path_for(job_id)``."""
+        with self._lock:
+            self._total_bytes -= self._entries.pop(job_id, 0)
+            self._entries[job_id] = size
+            self._total_bytes += size
+            self._evict_locked(keep=job_id)
+
+    def open(self, job_id: str, url: str | None) -> Path | AudioDownload | None:
+        """
+        Return the cached file for a job, or a shared in-flight download of ``url``.
+
+        Returns ``None`` when the audio is neither cached nor downloadable.
+        """
+        with self._lock:
+            if job_id in self._entries:
+                self._entries.move_to_end(job_id)
+                self.hits += 1
+                return self.path_for(job_id)
+            self.misses += 1
+            download = self._inflight.get(job_id)
+            if download is not None:
+                return download
+            if not url:
+                return None
+            final_path = self.path_for(job_id)
+            download = AudioDownload(final_path.with_name(final_path.name + PARTIAL_SUFFIX))
+            self._inflight[job_id] = download
+        threading.Thread(target=self._download, args=(job_id, url, download), daemon=True).start()
+        return download
+
+    def open_async(self, job_id: str, url: str | None, http) -> Path | AsyncAudioDownload | None:
+        """
+        Asyncio variant of ``open``; the download runs as a task using ``http``
+        (an ``httpx.AsyncClient``). Must be called on the event loop.
+        """
+        with self._lock:
+            if job_id in self._entries:
+                self._entries.move_to_end(job_id)
+                self.hits += 1
+                return self.path_for(job_id)
+            self.misses += 1
+            download = self._inflight.get(job_id)
+            if download is not None:
+                return download
+            if not url:
+                return None
+            final_path = self.path_for(job_id)
+            download = AsyncAudioDownload(final_path.with_name(final_path.name + PARTIAL_SUFFIX))
+            self._inflight[job_id] = download
+        download.task = asyncio.create_task(self._download_async(job_id, url, download, http))
+        return download
+
+    async def _download_async(self, job_id: str, url: str, download: AsyncAudioDownload, http) -> None:
+        """Stream ``url`` into the partial file without blocking the event loop on the network."""
+        start = time.perf_counter()
+        try:
+            async with http.stream("GET", url) as resp:
+                if resp.status_code != 200:
+                    await download._fail()
+                    return
+                length = resp.headers.get("Content-Length")
+                download.content_length = int(length) if length else None
+                download._started.set()
+                with open(download.path, "wb") as f:
+                    async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        f.flush()
+                        download.size += len(chunk)
+                        await download._notify()
+            final_path = self.path_for(job_id)
+            os.replace(download.path, final_path)
+            download.path = final_path
+            download.done = True
+            await download._notify()
+            self.add(job_id, download.size)
+        except Exception:
+            await download._fail()
+        finally:
+            with self._lock:
+                self._inflight.pop(job_id, None)
+            if self._on_download is not None:
+                self._on_download(time.perf_counter() - start, download.size, download.done)
+
+    def _download(self, job_id: str, url: str, download: AudioDownload) -> None:
+        """Stream ``url`` into the partial file, publishing progress to readers."""
+        start = time.perf_counter()
+        try:
+            resp = self.http.request("GET", url, preload_content=False)
+            try:
+                if resp.status != 200:
+                    download._fail()
+                    return
+                length = resp.headers.get("Content-Length")
+                download._mark_started(int(length) if length else None)
+                with open(download.path, "wb") as f:
+                    for chunk in resp.stream(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        f.flush()
+                        download._append(len(chunk))
+            finally:
+                resp.release_conn()
+            download._finish(self.path_for(job_id))
+            self.add(job_id, download.size)
+        except Exception:
+            download._fail()
+        finally:
+            with self._lock:
+                self._inflight.pop(job_id, None)
+            if self._on_download is not None:
+                self._on_download(time.perf_counter() - start, download.size, download.done)
+
+    def stats(self) -> dict:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "files": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict_locked(self, keep: str | None = None) -> None:
+        for job_id in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if job_id == keep:
+                continue
+            try:
+                self.path_for(job_id).unlink(missing_ok=True)
+            except OSError:
+                # Still open elsewhere (e.g. being served on Windows); retry on the next eviction.
+                continue
+            self._total_bytes -= self._entries.pop(job_id)
+            self.evictions += 1
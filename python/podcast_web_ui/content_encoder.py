@@ -0,0 +1,137 @@
+"""
+Incremental encoding of TXT/PDF content into a ``PodcastContent`` request body.
+
+``ContentEncoder`` is a write-only file-like object: bytes are hashed, measured
+and encoded (UTF-8 decoded for .txt, base64 for .pdf) as they are written, so
+a browser upload is processed in a single pass without being spooled to disk
+or held in memory more than once. ``encoder_stream_factory`` plugs it into
+the multipart form parser (Werkzeug or Quart) as the stream for every
+uploaded file.
+"""
+
+import base64
+import codecs
+import hashlib
+import os
+
+from microsoft_client_podcast.podcast_const import MAX_PLAIN_TEXT_LENGTH, MAX_BASE64_TEXT_LENGTH
+from microsoft_client_podcast.podcast_enum import ContentSourceKind, ContentFileFormatKind
+from microsoft_client_podcast.podcast_dataclass import PodcastContent
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf")
+READ_CHUNK_SIZE = 64 * 1024
+
+# Largest raw PDF whose base64 encoding still fits in MAX_BASE64_TEXT_LENGTH
+MAX_PDF_BYTES = MAX_BASE64_TEXT_LENGTH // 4 * 3
+
+
+class ContentEncoder:
+    """Hash, measure and encode content bytes as they arrive."""
+
+    def __init__(self, filename: str | None):
+        self.filename = filename or ""
+        self.file_ext = os.path.splitext(self.filename)[1].lower()
+        self.size = 0
+        self.error: str | None = None
+        self._sha256 = hashlib.sha256()
+        self._parts: list[str] = []
+        self._text_length = 0
+        self._pending = b""  # base64 works on 3-byte groups
+        self._decoder = codecs.getincrementaldecoder("utf-8")() if self.file_ext == ".txt" else None
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        self._sha256.update(data)
+        if self.error is not None or self.file_ext not in SUPPORTED_EXTENSIONS:
+            return len(data)
+        try:
+            if self._decoder is not None:
+                self._write_text(self._decoder.decode(data))
+            else:
+                self._write_pdf(data)
+        except UnicodeDecodeError:
+            self._fail("Text file must be UTF-8 encoded.")
+        return len(data)
+
+    def _write_text(self, text: str) -> None:
+        self._text_length += len(text)
+        if self._text_length > MAX_PLAIN_TEXT_LENGTH:
+            self._fail(
+                f"Text file exceeds the {MAX_PLAIN_TEXT_LENGTH // 1024}KB limit. "
+                "Please use a shorter file."
+            )
+            return
+        self._parts.append(text)
+
+    def _write_pdf(self, data: bytes) -> None:
+        if self.size > MAX_PDF_BYTES:
+            self._fail(
+                f"PDF file exceeds the {MAX_BASE64_TEXT_LENGTH // (1024*1024)}MB base64 limit. "
+                "Please use a smaller file."
+            )
+            return
+        data = self._pending + data
+        aligned = len(data) - len(data) % 3
+        self._pending = data[aligned:]
+        if aligned:
+            self._parts.append(base64.b64encode(data[:aligned]).decode("ascii"))
+
+    def _fail(self, error: str) -> None:
+        self.error = error
+        self._parts = []
+        self._pending = b""
+
+    # Werkzeug rewinds the stream once the part is complete.
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return 0
+
+    def read(self, size: int = -1) -> bytes:
+        return b""
+
+    def close(self) -> None:
+        pass
+
+    def content(self) -> PodcastContent:
+        """Finish encoding and return the request content; raises ``ValueError`` on failure."""
+        if self.file_ext not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported file type: {self.file_ext}")
+        if self._decoder is not None and self.error is None:
+            try:
+                self._write_text(self._decoder.decode(b"", final=True))
+            except UnicodeDecodeError:
+                self._fail("Text file must be UTF-8 encoded.")
+        if self.error is not None:
+            raise ValueError(self.error)
+
+        content = PodcastContent()
+        if self.file_ext == ".txt":
+            content.kind = ContentSourceKind.PlainText
+            content.fileFormat = ContentFileFormatKind.Txt
+            content.text = "".join(self._parts)
+        else:
+            if self._pending:
+                self._parts.append(base64.b64encode(self._pending).decode("ascii"))
+                self._pending = b""
+            content.kind = ContentSourceKind.FileBase64
+            content.fileFormat = ContentFileFormatKind.Pdf
+            content.base64Text = "".join(self._parts)
+        self._parts = []
+        return content
+
+
+def encode_file(path: str) -> ContentEncoder:
+    """Feed a file on disk through a ``ContentEncoder`` in fixed-size chunks."""
+    encoder = ContentEncoder(os.path.basename(path))
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK_SIZE):
+            encoder.write(chunk)
+    return encoder
+
+
+def encoder_stream_factory(total_content_length, content_type, filename=None, content_length=None) -> ContentEncoder:
+    """Form parser stream factory returning a ``ContentEncoder`` per uploaded file."""
+    return ContentEncoder(filename)
@@ -0,0 +1,127 @@
+"""
+Cached, change-aware index of the web UI ``input_files/`` folder.
+
+The directory listing is rebuilt only when the folder changes: through
+inotify (via the optional ``watchdog`` package) where available, otherwise
+when the directory mtime changes. Content hashes are computed lazily, outside
+the index lock, for the entries actually returned and reused until a file's
+size or mtime changes.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional dependency
+    FileSystemEventHandler = object
+    Observer = None
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class _DirtyOnChange(FileSystemEventHandler):
+    def __init__(self, index: "InputFileIndex"):
+        super().__init__()
+        self._index = index
+
+    def on_any_event(self, event):
+        self._index.invalidate()
+
+
+class InputFileIndex:
+    """Thread-safe listing of supported files with size, type and sha256."""
+
+    def __init__(self, directory: Path, extensions: tuple[str, ...] = (".txt", ".pdf"), watch: bool = True):
+        self.directory = Path(directory)
+        self.extensions = extensions
+        self._lock = threading.Lock()
+        self._entries: list[dict] = []
+        self._by_name: dict[str, dict] = {}
+        self._dir_mtime_ns: int | None = None
+        self._dirty = True
+        self._observer = None
+        if watch and Observer is not None and self.directory.is_dir():
+            self._observer = Observer()
+            self._observer.schedule(_DirtyOnChange(self), str(self.directory), recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+
+    def invalidate(self) -> None:
+        """Force a rescan on the next access."""
+        self._dirty = True
+
+    def _refresh_locked(self) -> None:
+        try:
+            dir_mtime_ns = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            self._entries, self._by_name, self._dir_mtime_ns = [], {}, None
+            return
+        # Without a watcher, the directory mtime tells us about added, removed
+        # or renamed files (in-place edits are picked up by the watcher only).
+        if not self._dirty and (self._observer is not None or dir_mtime_ns == self._dir_mtime_ns):
+            return
+        self._dirty = False
+
+        entries = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                ext = os.path.splitext(item.name)[1].lower()
+                if ext not in self.extensions or not item.is_file():
+                    continue
+                st = item.stat()
+                previous = self._by_name.get(item.name)
+                sha256 = None
+                if previous and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns:
+                    sha256 = previous["sha256"]
+                entries.append({
+                    "name": item.name,
+                    "size": st.st_size,
+                    "type": ext[1:],
+                    "mtime_ns": st.st_mtime_ns,
+                    "sha256": sha256,
+                })
+        entries.sort(key=lambda e: e["name"])
+        self._entries = entries
+        self._by_name = {e["name"]: e for e in entries}
+        self._dir_mtime_ns = dir_mtime_ns
+
+    def get(self, name: str) -> dict | None:
+        """Return the entry for a file name, or ``None`` if it is not indexed."""
+        with self._lock:
+            self._refresh_locked()
+            return self._by_name.get(name)
+
+    def page(self, offset: int = 0, limit: int | None = None, with_hashes: bool = True) -> tuple[list[dict], int]:
+        """Return ``(entries, total)`` for one page of the sorted listing."""
+        with self._lock:
+            self._refresh_locked()
+            total = len(self._entries)
+            end = total if limit is None else offset + limit
+            page = [dict(e) for e in self._entries[offset:end]]
+        if with_hashes:
+            # Files are read outside the lock so other requests are not held up by hashing.
+            missing = [e for e in page if e["sha256"] is None]
+            for entry in missing:
+                entry["sha256"] = self._hash_file(self.directory / entry["name"])
+            if missing:
+                with self._lock:
+                    for entry in missing:
+                        current = self._by_name.get(entry["name"])
+                        if current and current["size"] == entry["size"] and current["mtime_ns"] == entry["mtime_ns"]:
+                            current["sha256"] = entry["sha256"]
+        return [{k: v for k, v in e.items() if k != "mtime_ns"} for e in page], total
+
+    @staticmethod
+    def _hash_file(path: Path) -> str | None:
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                while chunk := f.read(HASH_CHUNK_SIZE):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
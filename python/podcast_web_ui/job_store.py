@@ -0,0 +1,149 @@
+"""
+In-memory job store for the podcast web UI.
+
+Active jobs are kept until they reach a terminal status. Terminal jobs are
+compacted (large fields dropped) and retained in LRU order until they either
+exceed the configured TTL since their last access or push the store beyond its
+maximum number of finished jobs.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+TERMINAL_STATUSES = ("Succeeded", "Failed", "Cancelled")
+
+# Generation fields kept once a job is finished; everything else (content,
+# script and TTS configuration, ...) is dropped to bound per-job memory.
+COMPACT_GENERATION_FIELDS = (
+    "id",
+    "status",
+    "createdDateTime",
+    "lastActionDateTime",
+    "failureReason",
+    "output",
+)
+
+
+def _compact_generation(generation: dict | None) -> dict | None:
+    """Keep only the small, still useful fields of a generation dict."""
+    if not generation:
+        return generation
+    return {k: generation.get(k) for k in COMPACT_GENERATION_FIELDS if generation.get(k) is not None}
+
+
+class JobStore:
+    """Thread-safe job store with TTL and LRU eviction for terminal jobs."""
+
+    def __init__(self,
+                 ttl_seconds: float,
+                 max_terminal_jobs: int,
+                 clock: Callable[[], float] = time.monotonic,
+                 on_transition: Callable[[str, str, float], None] | None = None):
+        if ttl_seconds <= 0 or max_terminal_jobs <= 0:
+            raise ValueError("Job TTL and maximum terminal job count must be positive")
+        self.ttl_seconds = ttl_seconds
+        self.max_terminal_jobs = max_terminal_jobs
+        self._clock = clock
+        # on_transition(old_status, new_status, seconds_in_old_status)
+        self._on_transition = on_transition
+        self._status_since: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._jobs: dict[str, dict] = {}
+        # Terminal job ids in least-recently-used order -> last access time
+        self._terminal: OrderedDict[str, float] = OrderedDict()
+        self._evicted = 0
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._jobs
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def create(self, job_id: str, **fields) -> dict:
+        """Register a new job and return its record."""
+        with self._lock:
+            self._evict_locked(self._clock())
+            job = dict(fields)
+            self._jobs[job_id] = job
+            self._status_since[job_id] = self._clock()
+            self._terminal.pop(job_id, None)
+            return job
+
+    def get(self, job_id: str) -> dict | None:
+        """Return the job record, refreshing its LRU position when terminal."""
+        with self._lock:
+            now = self._clock()
+            self._evict_locked(now)
+            job = self._jobs.get(job_id)
+            if job is not None and job_id in self._terminal:
+                self._terminal[job_id] = now
+                self._terminal.move_to_end(job_id)
+            return job
+
+    def update(self, job_id: str, **fields) -> None:
+        """
+        Update a job; jobs entering a terminal status are compacted. Updates
+        changing the status of a terminal job are ignored.
+        """
+        transition = None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            old_status = job.get("status")
+            # A terminal status is final; late updates from a worker that has
+            # not yet noticed a cancellation must neither resurrect the job nor
+            # turn it into another outcome (e.g. Succeeded after Cancelled).
+            if old_status in TERMINAL_STATUSES and fields.get("status", old_status) != old_status:
+                return
+            job.update(fields)
+            new_status = job.get("status")
+            if new_status != old_status and old_status not in TERMINAL_STATUSES:
+                now = self._clock()
+                since = self._status_since.pop(job_id, now)
+                if new_status not in TERMINAL_STATUSES:
+                    self._status_since[job_id] = now
+                transition = (old_status, new_status, now - since)
+            if job.get("status") in TERMINAL_STATUSES:
+                job.pop("cancel_event", None)
+                if "generation" in job:
+                    job["generation"] = _compact_generation(job["generation"])
+                self._terminal[job_id] = self._clock()
+                self._terminal.move_to_end(job_id)
+                self._evict_locked(self._clock())
+        if transition is not None and self._on_transition is not None:
+            self._on_transition(*transition)
+
+    def status_counts(self) -> dict[str, int]:
+        """Return the number of stored jobs per status."""
+        with self._lock:
+            counts: dict[str, int] = {}
+            for job in self._jobs.values():
+                status = job.get("status")
+                counts[status] = counts.get(status, 0) + 1
+            return counts
+
+    def stats(self) -> dict:
+        """Return store size counters."""
+        with self._lock:
+            self._evict_locked(self._clock())
+            terminal = len(self._terminal)
+            return {
+                "jobs": len(self._jobs),
+                "active": len(self._jobs) - terminal,
+                "terminal": terminal,
+                "evicted": self._evicted,
+            }
+
+    def _evict_locked(self, now: float) -> None:
+        while self._terminal:
+            job_id, last_access = next(iter(self._terminal.items()))
+            if len(self._terminal) <= self.max_terminal_jobs and now - last_access < self.ttl_seconds:
+                break
+            self._terminal.popitem(last=False)
+            self._jobs.pop(job_id, None)
+            self._evicted += 1
@@ -0,0 +1,186 @@
+"""
+Prometheus text-format metrics for the podcast web UI.
+
+``WebMetrics`` collects histograms and counters from callbacks (job status
+transitions, audio downloads and client request hooks) and renders
+them, together with point-in-time gauges read from the job store, audio
+cache and scheduler, in the text exposition format served by ``/metrics``.
+"""
+
+import threading
+
+from microsoft_speech_client_common.client_common_instrumentation import RequestHook, RequestInfo
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PHASE_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+# Job statuses whose duration is recorded in the phase histogram.
+TIMED_PHASES = ("Creating", "Running")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...], labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        # labelvalues -> [bucket counts..., count, sum]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        with self._lock:
+            series = self._series.setdefault(labelvalues, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        le_names = self.labelnames + ("le",)
+        with self._lock:
+            for labelvalues, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(le_names, labelvalues + (_format_value(bound),))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(le_names, labelvalues + ("+Inf",))
+                lines.append(f"{self.name}_bucket{labels} {series[-2]}")
+                labels = _format_labels(self.labelnames, labelvalues)
+                lines.append(f"{self.name}_count{labels} {series[-2]}")
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+        return lines
+
+
+def _gauge(name: str, help_text: str, samples: list[tuple[str, float]]) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines.extend(f"{name}{labels} {_format_value(value)}" for labels, value in samples)
+    return lines
+
+
+class WebMetrics(RequestHook):
+    """
+    Metrics for one web UI process; pass its ``on_*`` methods as callbacks and
+    register it as a global request hook of the Podcast clients.
+    """
+
+    def __init__(self):
+        self.phase_seconds = Histogram(
+            "podcast_web_job_phase_seconds",
+            "Time jobs spent in each phase (Creating, Running, download).",
+            PHASE_BUCKETS, ("phase",))
+        self.http_seconds = Histogram(
+            "podcast_client_http_request_seconds",
+            "Latency of Podcast API HTTP requests, including retries.",
+            LATENCY_BUCKETS, ("method", "route", "status"))
+        self.http_retries = Counter(
+            "podcast_client_http_retries_total",
+            "Retries performed for Podcast API HTTP requests.",
+            ("method", "route"))
+        self.downloads = Counter(
+            "podcast_web_audio_downloads_total",
+            "Audio downloads into the cache by outcome.",
+            ("outcome",))
+
+    def on_transition(self, old_status: str, new_status: str, seconds: float) -> None:
+        if old_status in TIMED_PHASES:
+            self.phase_seconds.observe(seconds, old_status)
+
+    def on_download(self, seconds: float, size: int, succeeded: bool) -> None:
+        self.downloads.inc("succeeded" if succeeded else "failed")
+        if succeeded:
+            self.phase_seconds.observe(seconds, "download")
+
+    def after_request(self, info: RequestInfo) -> None:
+        status = str(info.status) if info.status is not None else "error"
+        self.http_seconds.observe(info.total_seconds, info.method, info.route, status)
+        if info.retries:
+            self.http_retries.inc(info.method, info.route, amount=info.retries)
+
+    def render(self, jobs, audio_cache, queue_depth: int, scheduler: dict) -> str:
+        """Render all series for a job store, audio cache, current queue depth and scheduler snapshot."""
+        counts = jobs.status_counts()
+        job_stats = jobs.stats()
+        cache = audio_cache.stats()
+        lookups = cache["hits"] + cache["misses"]
+
+        lines: list[str] = []
+        lines += _gauge(
+            "podcast_web_jobs", "Jobs currently held in the job store by status.",
+            [(_format_labels(("status",), (status,)), count) for status, count in sorted(counts.items())])
+        lines += _gauge(
+            "podcast_web_queue_depth", "Active jobs, queued for a scheduler slot or being processed by the service.",
+            [("", queue_depth)])
+        lines += _gauge(
+            "podcast_web_scheduler_waiting", "Jobs queued for a scheduler slot by priority.",
+            [(_format_labels(("priority",), (priority,)), count)
+             for priority, count in sorted(scheduler["waiting"].items())])
+        lines += _gauge(
+            "podcast_web_scheduler_in_flight", "Scheduler slots held by jobs being processed by the service.",
+            [("", scheduler["in_flight"])])
+        lines += _gauge(
+            "podcast_web_scheduler_slots", "Scheduler slots available in total.",
+            [("", scheduler["max_in_flight"])])
+        lines += [
+            "# HELP podcast_web_jobs_evicted_total Finished jobs evicted from the job store.",
+            "# TYPE podcast_web_jobs_evicted_total counter",
+            f"podcast_web_jobs_evicted_total {job_stats['evicted']}",
+        ]
+        lines += self.phase_seconds.render()
+        lines += self.http_seconds.render()
+        lines += self.http_retries.render()
+        lines += self.downloads.render()
+        for key in ("hits", "misses", "evictions"):
+            lines += [
+                f"# HELP podcast_web_audio_cache_{key}_total Audio cache {key}.",
+                f"# TYPE podcast_web_audio_cache_{key}_total counter",
+                f"podcast_web_audio_cache_{key}_total {cache[key]}",
+            ]
+        lines += _gauge("podcast_web_audio_cache_bytes", "Bytes of audio held in the cache.", [("", cache["bytes"])])
+        lines += _gauge(
+            "podcast_web_audio_cache_hit_ratio", "Audio cache hits over lookups since start.",
+            [("", cache["hits"] / lookups if lookups else 0)])
+        return "\n".join(lines) + "\n"
+
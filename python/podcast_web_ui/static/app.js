@@ -0,0 +1,378 @@
+// ---- Options panel toggle -----------------------------------------------
+function toggleOptions() {
+    const panel = document.getElementById('options-panel');
+    const icon = document.getElementById('collapse-icon');
+    const visible = panel.style.display !== 'none';
+    panel.style.display = visible ? 'none' : '';
+    icon.textContent = visible ? '\u25B6' : '\u25BC';
+}
+
+// ---- File source toggle ------------------------------------------------
+function toggleFileSource() {
+    const source = document.querySelector('input[name="file_source"]:checked').value;
+    document.getElementById('upload-file-group').style.display = source === 'upload' ? '' : 'none';
+    document.getElementById('server-file-group').style.display = source === 'server' ? '' : 'none';
+
+    // Reset to Single mode when switching sources
+    if (source === 'upload') {
+        const singleRadio = document.querySelector('input[name="bulk_mode"][value="single"]');
+        if (singleRadio) { singleRadio.checked = true; toggleBulkMode(); }
+    }
+    // Update button text based on current mode
+    toggleBulkMode();
+}
+
+// ---- Bulk mode toggle ---------------------------------------------------
+function toggleBulkMode() {
+    const source = document.querySelector('input[name="file_source"]:checked').value;
+    const bulk = document.querySelector('input[name="bulk_mode"]:checked')?.value === 'bulk';
+    const btn = document.getElementById('btn-generate');
+    const sel = document.getElementById('server_file');
+
+    if (source === 'server' && bulk) {
+        sel.disabled = true;
+        btn.textContent = 'Generate podcasts';
+    } else {
+        sel.disabled = false;
+        btn.textContent = 'Generate podcast';
+    }
+}
+
+// ---- Show / hide API key -----------------------------------------------
+document.getElementById('toggle-key').addEventListener('click', () => {
+    const inp = document.getElementById('sub_key');
+    const isPassword = inp.type === 'password';
+    inp.type = isPassword ? 'text' : 'password';
+    document.getElementById('toggle-key').textContent = isPassword ? '\u{1F648}' : '\u{1F441}';
+});
+
+// ---- Additional instructions counter ----------------------------------
+const additionalInstructions = document.getElementById('additional_instructions');
+const additionalInstructionsCount = document.getElementById('additional-instructions-count');
+const additionalInstructionsMax = 1000;
+
+function updateAdditionalInstructionsCounter() {
+    if (!additionalInstructions || !additionalInstructionsCount) return;
+    additionalInstructionsCount.textContent = String(additionalInstructions.value.length);
+}
+
+if (additionalInstructions) {
+    additionalInstructions.setAttribute('maxlength', String(additionalInstructionsMax));
+    updateAdditionalInstructionsCounter();
+    additionalInstructions.addEventListener('input', updateAdditionalInstructionsCounter);
+}
+
+// ---- Load server files -------------------------------------------------
+// The dropdown shows one page of names; hashes are not needed for it.
+const serverFilesLimit = 500;
+
+async function loadServerFiles() {
+    try {
+        const resp = await fetch(`/api/input-files?limit=${serverFilesLimit}&hashes=0`);
+        const data = await resp.json();
+        const sel = document.getElementById('server_file');
+        const bulkRadios = document.querySelectorAll('input[name="bulk_mode"]');
+        sel.innerHTML = '';
+        if (data.files.length === 0) {
+            sel.innerHTML = '<option value="">No files found</option>';
+            sel.disabled = true;
+            bulkRadios.forEach(r => r.disabled = true);
+            return;
+        }
+        sel.disabled = false;
+        bulkRadios.forEach(r => r.disabled = false);
+        data.files.forEach(f => {
+            const opt = document.createElement('option');
+            opt.value = f;
+            opt.textContent = f;
+            if (f === data.preselected) opt.selected = true;
+            sel.appendChild(opt);
+        });
+        if (data.total > data.files.length) {
+            const more = document.createElement('option');
+            more.disabled = true;
+            more.textContent = `… ${data.total - data.files.length} more files not shown`;
+            sel.appendChild(more);
+        }
+        toggleBulkMode();
+    } catch (e) {
+        console.error('Failed to load server files', e);
+    }
+}
+loadServerFiles();
+
+// ---- Toast helper ------------------------------------------------------
+function showToast(msg, duration = 5000) {
+    const t = document.getElementById('toast');
+    t.textContent = msg;
+    t.style.display = 'block';
+    setTimeout(() => { t.style.display = 'none'; }, duration);
+}
+
+// ---- Form submission ---------------------------------------------------
+document.getElementById('gen-form').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const fileSource = document.querySelector('input[name="file_source"]:checked').value;
+    const bulkMode = document.querySelector('input[name="bulk_mode"]:checked')?.value === 'bulk';
+
+    if (fileSource === 'server' && bulkMode) {
+        await runBulkGeneration();
+    } else {
+        await runSingleGeneration();
+    }
+});
+
+// Track the current job ID and polling interval for cancellation
+let _currentJobId = null;
+let _currentPollInterval = null;
+let _savedButtonText = 'Generate podcast';
+
+function setFormControlsDisabled(disabled) {
+    const form = document.getElementById('gen-form');
+    const controls = form.querySelectorAll('input, select, textarea, button');
+    controls.forEach(el => {
+        if (el.id === 'btn-generate') return; // managed separately
+        if (el.id === 'toggle-options') return; // keep collapsible toggle usable
+        el.disabled = disabled;
+    });
+}
+
+function switchToCancelButton() {
+    const btn = document.getElementById('btn-generate');
+    _savedButtonText = btn.textContent;
+    btn.textContent = 'Cancel';
+    btn.classList.remove('btn-primary');
+    btn.classList.add('btn-cancel');
+    btn.disabled = false;
+    btn.type = 'button';  // prevent form submit
+    setFormControlsDisabled(true);
+}
+
+function restoreGenerateButton() {
+    setFormControlsDisabled(false);
+    const btn = document.getElementById('btn-generate');
+    btn.textContent = _savedButtonText;
+    btn.classList.remove('btn-cancel');
+    btn.classList.add('btn-primary');
+    btn.disabled = false;
+    btn.type = 'submit';
+    document.getElementById('generate-spinner').style.display = 'none';
+    _currentJobId = null;
+    // Re-apply bulk mode state (may need server_file re-disabled)
+    toggleBulkMode();
+}
+
+async function cancelCurrentJob() {
+    if (!_currentJobId) return;
+    const jobId = _currentJobId;
+
+    // Stop polling immediately
+    if (_currentPollInterval) {
+        clearInterval(_currentPollInterval);
+        _currentPollInterval = null;
+    }
+
+    // Hide spinner, processing text, player
+    document.getElementById('generate-spinner').style.display = 'none';
+    document.getElementById('processing-indicator').style.display = 'none';
+    document.getElementById('persistent-player').pause();
+    document.getElementById('persistent-player').style.display = 'none';
+    document.getElementById('status-area').style.display = 'none';
+    document.getElementById('result-area').style.display = 'none';
+
+    // Resolve any pending poll promise
+    if (_currentPollResolve) {
+        _currentPollResolve('Cancelled');
+        _currentPollResolve = null;
+    }
+
+    restoreGenerateButton();
+
+    // Fire cancel request (best-effort, non-blocking)
+    fetch(`/api/cancel/${jobId}`, { method: 'POST' }).catch(() => {});
+}
+
+// Click handler on the generate/cancel button
+document.getElementById('btn-generate').addEventListener('click', (e) => {
+    const btn = document.getElementById('btn-generate');
+    if (btn.classList.contains('btn-cancel')) {
+        e.preventDefault();
+        e.stopImmediatePropagation();
+        cancelCurrentJob();
+    }
+});
+
+async function runSingleGeneration(overrideFile, currentIndex, totalCount) {
+    // Default to 1/1 for single-file generation
+    const idx = currentIndex || 1;
+    const total = totalCount || 1;
+
+    const btn = document.getElementById('btn-generate');
+    const genSpinner = document.getElementById('generate-spinner');
+    genSpinner.style.display = 'inline-block';
+
+    // Reset UI
+    document.getElementById('status-area').style.display = 'none';
+    document.getElementById('result-area').style.display = 'none';
+    document.getElementById('poll-dots').textContent = '';
+
+    const formData = new FormData(document.getElementById('gen-form'));
+    if (overrideFile) {
+        formData.set('server_file', overrideFile);
+        formData.set('file_source', 'server');
+    }
+
+    // Stop audio and show processing indicator
+    const player = document.getElementById('persistent-player');
+    const processingIndicator = document.getElementById('processing-indicator');
+    player.pause();
+    player.style.display = 'none';
+
+    // Determine the filename being processed
+    const fileSource = formData.get('file_source');
+    let processingName = '';
+    if (fileSource === 'upload') {
+        const fileInput = document.getElementById('file');
+        processingName = fileInput.files.length > 0 ? fileInput.files[0].name : 'file';
+    } else {
+        processingName = formData.get('server_file') || 'file';
+    }
+    processingIndicator.textContent = `Processing (${idx}/${total}): ${processingName}`;
+    processingIndicator.title = processingName;
+    processingIndicator.style.display = 'inline';
+
+    try {
+        const resp = await fetch('/api/generate', { method: 'POST', body: formData });
+        const data = await resp.json();
+        if (!resp.ok) {
+            showToast(data.error || 'Request failed');
+            restoreGenerateButton();
+            genSpinner.style.display = 'none';
+            processingIndicator.style.display = 'none';
+            return false;
+        }
+
+        // Switch to Cancel button now that the job is running
+        _currentJobId = data.job_id;
+        switchToCancelButton();
+
+        // Show status area and begin polling
+        document.getElementById('status-area').style.display = '';
+        const result = await pollStatusAsync(data.job_id);
+        if (result === 'Cancelled') return false;
+        return true;
+    } catch (err) {
+        showToast('Network error: ' + err.message);
+        restoreGenerateButton();
+        genSpinner.style.display = 'none';
+        processingIndicator.style.display = 'none';
+        return false;
+    }
+}
+
+async function runBulkGeneration() {
+    const sel = document.getElementById('server_file');
+    const files = Array.from(sel.options).map(o => o.value).filter(v => v);
+    if (files.length === 0) { showToast('No files available.'); return; }
+
+    const processingIndicator = document.getElementById('processing-indicator');
+    for (let i = 0; i < files.length; i++) {
+        const result = await runSingleGeneration(files[i], i + 1, files.length);
+        // If cancelled, stop the bulk loop
+        if (_currentJobId === null && !result) break;
+    }
+    restoreGenerateButton();
+}
+
+// ---- Async polling (returns a promise) ----------------------------------
+let _currentPollResolve = null;
+
+function pollStatusAsync(jobId) {
+    return new Promise((resolve) => {
+        _currentPollResolve = resolve;
+        const badge = document.getElementById('status-badge');
+        const dots = document.getElementById('poll-dots');
+        let dotCount = 0;
+
+        const interval = setInterval(async () => {
+            try {
+                const resp = await fetch(`/api/status/${jobId}`);
+                const data = await resp.json();
+
+                badge.textContent = data.status;
+                badge.className = 'status-badge ' + data.status.toLowerCase();
+
+                dotCount++;
+                dots.textContent = '.'.repeat(dotCount % 30 + 1);
+
+                if (['Succeeded', 'Failed', 'Cancelled'].includes(data.status)) {
+                    clearInterval(interval);
+                    _currentPollInterval = null;
+                    _currentPollResolve = null;
+                    dots.textContent = '';
+                    if (data.status === 'Cancelled') {
+                        restoreGenerateButton();
+                        resolve('Cancelled');
+                    } else {
+                        // If succeeded and delete-after-download is checked, delete the server generation
+                        if (data.status === 'Succeeded' && document.getElementById('delete_after_download').checked) {
+                            try {
+                                await fetch(`/api/delete-generation/${jobId}`, { method: 'POST' });
+                            } catch (e) {
+                                console.warn('Failed to delete generation from server', e);
+                            }
+                        }
+                        showResult(jobId, data);
+                        restoreGenerateButton();
+                        resolve(data.status);
+                    }
+                }
+            } catch (err) {
+                console.error('Poll error', err);
+            }
+        }, 5000);
+        _currentPollInterval = interval;
+    });
+}
+
+// ---- Polling (kept for backwards compat, but bulk uses pollStatusAsync) ----
+function pollStatus(jobId) {
+    pollStatusAsync(jobId).then(() => {
+        restoreGenerateButton();
+    });
+}
+
+// ---- Show result -------------------------------------------------------
+function showResult(jobId, data) {
+    const area = document.getElementById('result-area');
+    const content = document.getElementById('result-content');
+    area.style.display = '';
+
+    if (data.status === 'Succeeded' && data.has_audio) {
+        // Hide the processing indicator and show the persistent player
+        document.getElementById('processing-indicator').style.display = 'none';
+        const player = document.getElementById('persistent-player');
+        player.src = `/api/play/${jobId}`;
+        player.style.display = '';
+
+        content.innerHTML = `
+            <p style="color:var(--success);font-weight:600;">&#9989; Podcast generated successfully!</p>
+            <audio controls src="/api/play/${jobId}"></audio>
+            <br>
+            <a class="download-link" href="/api/download/${jobId}" download>&#11015; Download MP3</a>
+        `;
+    } else if (data.status === 'Succeeded') {
+        document.getElementById('processing-indicator').style.display = 'none';
+        content.innerHTML = `
+            <p style="color:var(--success);font-weight:600;">&#9989; Generation succeeded but no audio URL was returned.</p>
+        `;
+    } else {
+        document.getElementById('processing-indicator').style.display = 'none';
+        content.innerHTML = `
+            <div class="error-message">
+                <strong>Generation failed</strong><br>
+                ${data.error || 'Unknown error'}
+            </div>
+        `;
+    }
+}
@@ -0,0 +1,111 @@
+"""
+Precompressed, content-hashed static assets for the web UI.
+
+At startup every file in ``static/`` is read once, fingerprinted with a short
+sha256 prefix and compressed with gzip (and brotli when the optional
+``brotli`` package is installed). Templates link to the hashed URL returned by
+``StaticAssets.url`` so the response can be cached by browsers forever; a
+changed file gets a new URL. ``CachedPage`` keeps rendered HTML (with its
+compressed variants) for pages whose inputs only change on restart.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+HASH_LENGTH = 12
+# Bodies smaller than this are not worth compressing.
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@dataclass
+class CompressedBody:
+    """A response body with its precomputed encodings and strong ETag."""
+
+    data: bytes
+    mimetype: str
+    etag: str = ""
+    encodings: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, data: bytes, mimetype: str) -> "CompressedBody":
+        body = cls(data=data, mimetype=mimetype, etag=hashlib.sha256(data).hexdigest()[:HASH_LENGTH])
+        if len(data) >= MIN_COMPRESS_SIZE:
+            if brotli is not None:
+                body.encodings["br"] = brotli.compress(data, quality=11)
+            body.encodings["gzip"] = gzip.compress(data, compresslevel=9, mtime=0)
+        return body
+
+    def negotiate(self, accept_encoding: str | None) -> tuple[bytes, str | None]:
+        """Return ``(payload, content_encoding)`` for an ``Accept-Encoding`` header."""
+        accepted = {
+            token.split(";")[0].strip().lower()
+            for token in (accept_encoding or "").split(",")
+            if not token.strip().endswith(";q=0")
+        }
+        for encoding, payload in self.encodings.items():
+            if encoding in accepted and len(payload) < len(self.data):
+                return payload, encoding
+        return self.data, None
+
+    def headers(self, encoding: str | None) -> dict[str, str]:
+        # A distinct ETag per representation keeps caches from mixing them up.
+        headers = {"ETag": f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"', "Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+
+class StaticAssets:
+    """Fingerprinted, precompressed copies of the files in a static folder."""
+
+    def __init__(self, directory: Path, url_prefix: str = "/assets/"):
+        self.directory = Path(directory)
+        self.url_prefix = url_prefix
+        self._by_name: dict[str, str] = {}
+        self._assets: dict[str, CompressedBody] = {}
+        if self.directory.is_dir():
+            for path in sorted(self.directory.rglob("*")):
+                if path.is_file():
+                    self._add(path)
+
+    def _add(self, path: Path) -> None:
+        name = path.relative_to(self.directory).as_posix()
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if mimetype.startswith("text/") or mimetype in ("application/javascript", "text/javascript"):
+            mimetype += "; charset=utf-8"
+        body = CompressedBody.build(path.read_bytes(), mimetype)
+        stem, dot, suffix = name.rpartition(".")
+        hashed_name = f"{stem}.{body.etag}.{suffix}" if dot else f"{name}.{body.etag}"
+        self._by_name[name] = hashed_name
+        self._assets[hashed_name] = body
+
+    def url(self, name: str) -> str:
+        """Hashed URL of a static file, for use in templates."""
+        return self.url_prefix + self._by_name[name]
+
+    def get(self, hashed_name: str) -> CompressedBody | None:
+        return self._assets.get(hashed_name)
+
+
+class CachedPage:
+    """Rendered pages keyed by their template inputs."""
+
+    def __init__(self):
+        self._pages: dict[object, CompressedBody] = {}
+
+    def get(self, key) -> CompressedBody | None:
+        return self._pages.get(key)
+
+    def put(self, key, html: str) -> CompressedBody:
+        page = CompressedBody.build(html.encode("utf-8"), "text/html; charset=utf-8")
+        self._pages[key] = page
+        return page
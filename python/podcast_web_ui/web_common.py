@@ -0,0 +1,229 @@
+"""
+Configuration and helpers shared by the Flask (``app.py``) and ASGI
+(``asgi_app.py``) variants of the podcast web UI.
+"""
+
+import sys
+import dataclasses
+import functools
+from pathlib import Path
+from datetime import datetime
+
+from dotenv import dotenv_values
+
+# ---------------------------------------------------------------------------
+# Path setup — allow importing the existing podcast client libraries
+# located one level up in the ``python/`` directory.
+# ---------------------------------------------------------------------------
+WEB_UI_ROOT = Path(__file__).resolve().parent
+PYTHON_ROOT = WEB_UI_ROOT.parent
+if str(PYTHON_ROOT) not in sys.path:
+    sys.path.insert(0, str(PYTHON_ROOT))
+
+from microsoft_client_podcast.podcast_enum import PodcastHostKind, PodcastLengthKind, PodcastStyleKind, PodcastGenderPreferenceKind
+from microsoft_client_podcast.podcast_client import build_generation_id
+from microsoft_speech_client_common.client_common_client_base import SpeechLongRunningTaskClientBase
+from microsoft_speech_client_common.client_common_rate_limiter import RateLimiter, key_id, parse_rate_limits
+from microsoft_client_podcast.podcast_generation_cache import DEFAULT_MAX_BYTES as GENERATION_CACHE_DEFAULT_MAX_BYTES, GenerationCache
+from microsoft_client_podcast.podcast_result_cache import DEFAULT_TTL_SECONDS, ResultCache, content_digest, result_cache_key
+from microsoft_client_podcast.podcast_scheduler import GenerationScheduler, PRIORITIES, PRIORITY_INTERACTIVE, parse_tenant_weights
+from microsoft_client_podcast.podcast_dataclass import (
+    PodcastGenerationDefinition,
+    PodcastContent,
+    PodcastScriptGenerationConfig,
+    PodcastTtsConfig,
+)
+
+INPUT_FILES_DIR = WEB_UI_ROOT / "input_files"
+LOCALES_CSV = WEB_UI_ROOT / "locales.csv"
+PODCASTS_DIR = WEB_UI_ROOT / "podcasts"
+
+# Browser cache lifetime for finished podcasts served by /api/play
+AUDIO_MAX_AGE_SECONDS = 365 * 24 * 60 * 60
+
+# Page size of listing endpoints such as /api/input-files when no limit is given
+DEFAULT_PAGE_LIMIT = 500
+
+# ---------------------------------------------------------------------------
+# .env loading — look for a .env in the parent ``python/`` directory.
+# Each variable is optional; missing values become empty strings.
+# ---------------------------------------------------------------------------
+ENV_PATH = PYTHON_ROOT / ".env"
+_env: dict[str, str] = {}
+if ENV_PATH.is_file():
+    _env = dotenv_values(ENV_PATH)
+
+ENV_DEFAULTS = {
+    "REGION": _env.get("REGION", "") or "eastus",
+    "SUB_KEY": _env.get("SUB_KEY", ""),
+    "API_VERSION": _env.get("API_VERSION", "") or "2026-01-01-preview",
+}
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an optional integer setting from the .env file."""
+    value = _env.get(name, "")
+    return int(value) if value else default
+
+
+# Finished jobs are kept for JOB_TTL_SECONDS after their last access, and at
+# most JOB_MAX_TERMINAL of them are retained (least recently used go first).
+JOB_TTL_SECONDS = env_int("JOB_TTL_SECONDS", 24 * 60 * 60)
+JOB_MAX_TERMINAL = env_int("JOB_MAX_TERMINAL", 500)
+
+# Optional request rate limits shared with other processes using the same key,
+# e.g. RATE_LIMITS=create=2,poll=10,list=1 (see client_common_rate_limiter.py).
+RATE_LIMITS = _env.get("RATE_LIMITS", "")
+RATE_LIMIT_DB = _env.get("RATE_LIMIT_DB", "") or None
+
+# Generations are created through a GenerationScheduler: at most
+# SCHEDULER_MAX_IN_FLIGHT run at once, each API key (tenant) gets a fair
+# share of them and at most SCHEDULER_TENANT_CAP (0 = no cap). Optional
+# SCHEDULER_TENANT_WEIGHTS=<tenant>=<weight>,... use the tenant ids shown by
+# /api/queue. SCHEDULER_RESERVED_SLOTS are kept free of bulk jobs.
+SCHEDULER_MAX_IN_FLIGHT = env_int("SCHEDULER_MAX_IN_FLIGHT", 8)
+SCHEDULER_TENANT_CAP = env_int("SCHEDULER_TENANT_CAP", 0) or None
+SCHEDULER_RESERVED_SLOTS = env_int("SCHEDULER_RESERVED_SLOTS", 0)
+SCHEDULER_TENANT_WEIGHTS = _env.get("SCHEDULER_TENANT_WEIGHTS", "")
+
+# Succeeded generations are reused for identical settings and content for
+# RESULT_CACHE_TTL_SECONDS (0 disables the cache); RESULT_CACHE_DB defaults
+# to the command line tool's cache, so both share results.
+RESULT_CACHE_TTL_SECONDS = env_int("RESULT_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+RESULT_CACHE_DB = _env.get("RESULT_CACHE_DB", "") or None
+
+# Get generation responses are cached in memory, shared by every job's
+# client, up to GENERATION_CACHE_MAX_BYTES (0 disables the cache).
+GENERATION_CACHE_MAX_BYTES = env_int("GENERATION_CACHE_MAX_BYTES", GENERATION_CACHE_DEFAULT_MAX_BYTES)
+
+# Downloaded podcasts in PODCASTS_DIR are bounded to this many bytes on disk.
+AUDIO_CACHE_MAX_BYTES = env_int("AUDIO_CACHE_MAX_BYTES", 1024 * 1024 * 1024)
+
+
+@functools.lru_cache(maxsize=1)
+def load_locales() -> tuple[str, ...]:
+    """Read locale codes from locales.csv (one per line); parsed once per process."""
+    locales: list[str] = []
+    if LOCALES_CSV.is_file():
+        for line in LOCALES_CSV.read_text(encoding="utf-8").splitlines():
+            code = line.strip()
+            if code:
+                locales.append(code)
+    return tuple(locales)
+
+
+def configure_rate_limiter() -> None:
+    """Apply RATE_LIMITS from .env to every podcast client of this process."""
+    if RATE_LIMITS:
+        SpeechLongRunningTaskClientBase.set_rate_limiter(
+            RateLimiter(parse_rate_limits(RATE_LIMITS), database_path=RATE_LIMIT_DB))
+
+
+def create_scheduler() -> GenerationScheduler:
+    """Build the generation scheduler from the SCHEDULER_* settings in .env."""
+    return GenerationScheduler(
+        max_in_flight=SCHEDULER_MAX_IN_FLIGHT,
+        tenant_cap=SCHEDULER_TENANT_CAP,
+        reserved_slots=SCHEDULER_RESERVED_SLOTS,
+        weights=parse_tenant_weights(SCHEDULER_TENANT_WEIGHTS),
+    )
+
+
+def create_result_cache() -> ResultCache | None:
+    """Build the result cache from the RESULT_CACHE_* settings in .env."""
+    if RESULT_CACHE_TTL_SECONDS <= 0:
+        return None
+    return ResultCache(database_path=RESULT_CACHE_DB, ttl_seconds=RESULT_CACHE_TTL_SECONDS)
+
+
+def create_generation_cache() -> GenerationCache:
+    """Build the get generation cache shared by the podcast clients of this process."""
+    return GenerationCache(max_bytes=GENERATION_CACHE_MAX_BYTES)
+
+
+def cache_key_for(body: PodcastGenerationDefinition, content_sha256: str) -> str:
+    """Result cache key of a job; content is identified by the sha256 of the file."""
+    return result_cache_key(body, content_digest(content_sha256=content_sha256))
+
+
+def use_cache_from_form(form) -> bool:
+    """Jobs reuse cached results unless the form sets ``no_cache``."""
+    return form.get("no_cache", "").strip().lower() not in ("1", "true", "on", "yes")
+
+
+def scheduling_from_form(form, sub_key: str) -> tuple[str, str]:
+    """
+    Return the (tenant, priority) of a new job: jobs are grouped by API key
+    and are interactive unless the form asks for ``priority=bulk``.
+    """
+    priority = form.get("priority", "").strip() or PRIORITY_INTERACTIVE
+    if priority not in PRIORITIES:
+        raise ValueError(f"Priority must be one of: {', '.join(PRIORITIES)}.")
+    return key_id(sub_key), priority
+
+
+def parse_page_args(args, default_limit: int = DEFAULT_PAGE_LIMIT) -> tuple[int, int]:
+    """Read ``offset``/``limit`` paging query arguments (limit defaults to ``default_limit``)."""
+    offset = max(int(args.get("offset", 0) or 0), 0)
+    limit = args.get("limit")
+    return offset, (max(int(limit), 0) if limit else default_limit)
+
+
+def new_job_id(target_locale: str) -> str:
+    """Build a generation/job id for a new web UI job."""
+    return build_generation_id(target_locale)
+
+
+def podcast_options_from_form(form) -> dict:
+    """Collect the optional podcast options from the submitted form."""
+    return {
+        "voice_name": form.get("voice_name", "").strip() or None,
+        "multi_talker": form.get("multi_talker_voice_speaker_names", "").strip() or None,
+        "gender_preference": form.get("gender_preference", "").strip() or None,
+        "length": form.get("length", "").strip() or None,
+        "host": form.get("host", "").strip() or None,
+        "style": form.get("style", "").strip() or None,
+        "additional_instructions": form.get("additional_instructions", "").strip() or None,
+    }
+
+
+def build_generation_body(
+    target_locale: str,
+    content: PodcastContent,
+    podcast_options: dict | None = None,
+) -> PodcastGenerationDefinition:
+    """Build the generation request body from encoded content and form options."""
+    opts = podcast_options or {}
+
+    script_cfg = PodcastScriptGenerationConfig(
+        additionalInstructions=opts.get("additional_instructions"),
+        length=PodcastLengthKind(opts["length"]) if opts.get("length") else None,
+        style=PodcastStyleKind(opts["style"]) if opts.get("style") else None,
+    )
+
+    tts_cfg = PodcastTtsConfig(
+        voiceName=opts.get("voice_name"),
+        genderPreference=(
+            PodcastGenderPreferenceKind(opts["gender_preference"])
+            if opts.get("gender_preference") else None
+        ),
+        multiTalkerVoiceSpeakerNames=opts.get("multi_talker"),
+    )
+
+    return PodcastGenerationDefinition(
+        displayName="Web UI Generation",
+        description=f"Generated via Web UI at {datetime.now().isoformat()}",
+        locale=target_locale,
+        host=PodcastHostKind(opts["host"]) if opts.get("host") else None,
+        content=content,
+        scriptGeneration=script_cfg,
+        tts=tts_cfg,
+    )
+
+
+def safe_gen_dict(gen: PodcastGenerationDefinition) -> dict | None:
+    """Convert a generation dataclass to a JSON-safe dict, swallowing errors."""
+    try:
+        return dataclasses.asdict(gen)
+    except Exception:
+        return None
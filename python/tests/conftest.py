@@ -0,0 +1,70 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+GENERATIONS_PATH = "/podcast/generations/"
+
+
+class FakeSpeechService:
+    """Serves GET and DELETE of podcast generations from ``generations`` (id -> definition)."""
+
+    def __init__(self):
+        self.generations: dict[str, dict] = {}
+        self.gets = 0
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _generation_id(self) -> str:
+                path = self.path.split("?", 1)[0]
+                return path[len(GENERATIONS_PATH):] if path.startswith(GENERATIONS_PATH) else None
+
+            def _send(self, status: int, body: dict = None) -> None:
+                data = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                service.gets += 1
+                generation = service.generations.get(self._generation_id())
+                self._send(200, generation) if generation is not None else self._send(404, {})
+
+            def do_DELETE(self):
+                service.generations.pop(self._generation_id(), None)
+                self._send(204)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def add_generation(self, generation_id: str, status: str = "Succeeded") -> None:
+        self.generations[generation_id] = {
+            "id": generation_id,
+            "locale": "en-US",
+            "status": status,
+            "output": {"audioFileUrl": f"{self.url}/audio/{generation_id}.mp3"},
+        }
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def speech_service():
+    service = FakeSpeechService()
+    yield service
+    service.close()
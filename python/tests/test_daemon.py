@@ -0,0 +1,87 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import podcast_daemon
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix domain sockets")
+
+ARGV = ["--region", "r", "--sub_key", "secret", "--api_version", "v", "get", "--id", "x"]
+
+
+@pytest.fixture
+def listener(tmp_path, monkeypatch):
+    """A listening socket standing in for the daemon, with an owner-only mode."""
+    socket_path = str(tmp_path / "daemon.sock")
+    monkeypatch.setenv(podcast_daemon.SOCKET_PATH_ENV, socket_path)
+    old_umask = os.umask(0o177)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    server.listen(1)
+    server.settimeout(2)
+    yield server, socket_path
+    server.close()
+
+
+def _reply_once(server: socket.socket, received: list) -> threading.Thread:
+    def serve():
+        connection, _ = server.accept()
+        with connection:
+            received.append(json.loads(connection.makefile("rb").readline()))
+            connection.sendall(json.dumps({"stdout": "", "stderr": "", "exit_code": 3}).encode("utf-8") + b"\n")
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread
+
+
+def _assert_not_contacted(server: socket.socket) -> None:
+    server.settimeout(0.2)
+    with pytest.raises(socket.timeout):
+        server.accept()
+
+
+def test_forwards_to_private_socket(listener):
+    server, _ = listener
+    received = []
+    thread = _reply_once(server, received)
+    assert podcast_daemon.try_forward(ARGV) == 3
+    thread.join()
+    assert received[0]["argv"] == ARGV
+
+
+def test_refuses_socket_with_open_permissions(listener):
+    server, socket_path = listener
+    os.chmod(socket_path, 0o666)
+    assert podcast_daemon.try_forward(ARGV) is None
+    _assert_not_contacted(server)
+
+
+def test_refuses_socket_of_another_user(listener, monkeypatch):
+    server, _ = listener
+    other_uid = os.getuid() + 1
+    monkeypatch.setattr(podcast_daemon.os, "getuid", lambda: other_uid)
+    assert podcast_daemon.try_forward(ARGV) is None
+    _assert_not_contacted(server)
+
+
+def test_refuses_non_socket(tmp_path, monkeypatch):
+    socket_path = tmp_path / "daemon.sock"
+    socket_path.write_text("")
+    os.chmod(socket_path, 0o600)
+    monkeypatch.setenv(podcast_daemon.SOCKET_PATH_ENV, str(socket_path))
+    assert podcast_daemon.try_forward(ARGV) is None
+
+
+def test_default_socket_is_not_directly_in_tmp(monkeypatch):
+    monkeypatch.delenv(podcast_daemon.SOCKET_PATH_ENV, raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    assert os.path.dirname(podcast_daemon.default_socket_path()) == f"/tmp/podcast_client-{os.getuid()}"
@@ -0,0 +1,61 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from microsoft_client_podcast.podcast_client import PodcastClient
+from microsoft_client_podcast.podcast_generation_cache import GenerationCache
+
+PYTHON_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_terminal_generation_is_served_from_memory_until_max_age(speech_service):
+    speech_service.add_generation("g1")
+    client = PodcastClient(region=speech_service.url, sub_key="k", api_version="v",
+                           generation_cache=GenerationCache(terminal_max_age_seconds=0.2))
+    assert client.request_get_generation("g1")[2].status == "Succeeded"
+    gets = speech_service.gets
+
+    speech_service.generations.pop("g1")  # deleted by another process
+    assert client.request_get_generation("g1")[2] is not None
+    assert speech_service.gets == gets
+
+    time.sleep(0.3)
+    assert client.request_get_generation("g1") == (True, None, None)
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix domain sockets")
+def test_delete_outside_daemon_drops_its_cached_generation(speech_service, tmp_path):
+    speech_service.add_generation("g1")
+    env = dict(os.environ, PODCAST_DAEMON_SOCKET=str(tmp_path / "daemon.sock"), XDG_CACHE_HOME=str(tmp_path))
+    common = [sys.executable, "main_podcast.py", "--region", speech_service.url, "--sub_key", "k",
+              "--api_version", "v"]
+
+    def run(*args) -> subprocess.CompletedProcess:
+        return subprocess.run([*common, *args], cwd=PYTHON_ROOT, env=env, capture_output=True, text=True,
+                              timeout=30)
+
+    daemon = subprocess.Popen([sys.executable, "podcast_daemon.py"], cwd=PYTHON_ROOT, env=env,
+                              stderr=subprocess.PIPE, text=True)
+    try:
+        assert "listening" in daemon.stderr.readline()
+        assert '"Succeeded"' in run("get", "--id", "g1").stdout
+        gets = speech_service.gets
+        # Served by the daemon's warm client from memory.
+        assert '"Succeeded"' in run("get", "--id", "g1").stdout
+        assert speech_service.gets == gets
+
+        assert run("--no_daemon", "delete", "--id", "g1").returncode == 0
+        result = run("get", "--id", "g1")
+        assert "Generation not found" in result.stderr
+        assert '"Succeeded"' not in result.stdout
+    finally:
+        daemon.terminate()
+        daemon.wait(timeout=10)
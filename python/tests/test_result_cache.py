@@ -0,0 +1,42 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+from microsoft_client_podcast.podcast_client import PodcastClient
+from microsoft_client_podcast.podcast_generation_cache import GenerationCache
+from microsoft_client_podcast.podcast_result_cache import ResultCache
+
+
+def _client(speech_service, generation_cache: GenerationCache) -> PodcastClient:
+    return PodcastClient(region=speech_service.url, sub_key="k", api_version="v",
+                         generation_cache=generation_cache)
+
+
+def test_hit_is_dropped_once_generation_is_deleted_behind_the_cache(speech_service, tmp_path):
+    speech_service.add_generation("g1")
+    generation_cache = GenerationCache()
+    client = _client(speech_service, generation_cache)
+    result_cache = ResultCache(database_path=str(tmp_path / "results.sqlite3"))
+    result_cache.put(client, "key", "g1")
+
+    generation, _ = result_cache.find_generation(client, "key")
+    assert generation.id == "g1"
+    # The succeeded generation is now memoized by the client's generation cache.
+    assert client.request_get_generation("g1")[2] is not None
+
+    # Deleted by another process: neither this client nor its cache saw it.
+    _client(speech_service, GenerationCache(max_bytes=0)).request_delete_generation("g1")
+    assert client.request_get_generation("g1")[2] is not None
+
+    assert result_cache.find_generation(client, "key") == (None, None)
+    assert result_cache.stats()["entries"] == 0
+
+
+def test_hit_on_another_resource_is_ignored(speech_service, tmp_path):
+    speech_service.add_generation("g1")
+    client = _client(speech_service, GenerationCache())
+    other = PodcastClient(region=speech_service.url, sub_key="other", api_version="v")
+    result_cache = ResultCache(database_path=str(tmp_path / "results.sqlite3"))
+    result_cache.put(client, "key", "g1")
+
+    assert result_cache.find_generation(other, "key") == (None, None)
+    assert result_cache.find_generation(client, "key")[0].id == "g1"
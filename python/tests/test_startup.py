@@ -0,0 +1,83 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PYTHON_ROOT = Path(__file__).resolve().parent.parent
+
+# Wall time of "main_podcast.py ... get --help" with no daemon running (imports,
+# argument parsing and the daemon probe), and import time of main_podcast.py plus
+# the client "get" runs, each excluding interpreter startup. Override with
+# PODCAST_IMPORT_BUDGET_MS on slow machines.
+IMPORT_BUDGET_MS = float(os.environ.get("PODCAST_IMPORT_BUDGET_MS", 150))
+
+# Startup time is noisy; the best of this many runs is compared to the budget.
+IMPORT_RUNS = 3
+
+# Modules a quick subcommand such as "get" must not load.
+HEAVY_MODULES = ("microsoft_client_podcast.tempfile_client", "sqlite3")
+
+
+GET_HELP_ARGS = ["main_podcast.py", "--region", "r", "--sub_key", "k", "--api_version", "v", "get", "--help"]
+
+
+def _no_daemon_env(tmp_path: Path) -> dict[str, str]:
+    """Environment in which the daemon probe of main_podcast.py finds no socket."""
+    return dict(os.environ, PODCAST_DAEMON_SOCKET=str(tmp_path / "missing" / "podcast_client.sock"))
+
+
+def _imported_modules(code_or_args: list[str], env: dict[str, str] = None) -> dict[str, tuple[int, bool]]:
+    """Modules imported by a python run -> (cumulative import time in microseconds, imported at top level)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *code_or_args],
+        cwd=PYTHON_ROOT, env=env, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = (int(cumulative), not name[1:].startswith(" "))
+    return modules
+
+
+def _import_ms(modules: dict, baseline: dict) -> float:
+    return sum(cumulative for name, (cumulative, top_level) in modules.items()
+               if top_level and name not in baseline) / 1000
+
+
+def _run_ms(args: list[str], env: dict[str, str] = None) -> float:
+    """Wall time of a python run in milliseconds."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=PYTHON_ROOT, env=env, capture_output=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def test_get_help_does_not_load_heavy_modules(tmp_path):
+    modules = _imported_modules(GET_HELP_ARGS, _no_daemon_env(tmp_path))
+    assert "podcast_daemon" in modules
+    for heavy in HEAVY_MODULES:
+        assert heavy not in modules
+
+
+def test_get_startup_time_within_budget(tmp_path):
+    env = _no_daemon_env(tmp_path)
+    startup_ms = (min(_run_ms(GET_HELP_ARGS, env) for _ in range(IMPORT_RUNS))
+                  - min(_run_ms(["-c", "pass"]) for _ in range(IMPORT_RUNS)))
+    assert startup_ms < IMPORT_BUDGET_MS, f"startup took {startup_ms:.0f} ms, budget {IMPORT_BUDGET_MS:.0f} ms"
+
+
+def test_get_import_time_within_budget():
+    baseline = _imported_modules(["-c", "pass"])
+    import_ms = float("inf")
+    for _ in range(IMPORT_RUNS):
+        modules = _imported_modules([
+            "-c", "import main_podcast; main_podcast.build_parser(['get']); "
+                  "import microsoft_client_podcast.podcast_client"])
+        for heavy in HEAVY_MODULES:
+            assert heavy not in modules
+        import_ms = min(import_ms, _import_ms(modules, baseline))
+    assert import_ms < IMPORT_BUDGET_MS, f"imports took {import_ms:.0f} ms, budget {IMPORT_BUDGET_MS:.0f} ms"